@@ -0,0 +1,149 @@
+"""
+Microbenchmarks for the hot paths of Flask-Presst.
+
+Benchmarks are registered with the :func:`benchmark` decorator. A benchmark is a generator function that performs
+any setup, yields the callable to be timed and cleans up afterwards. Results are collected by :func:`run_benchmarks`
+and can be written as JSON for comparison across versions.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import datetime
+import math
+import platform
+import re
+import sys
+import timeit
+
+_benchmarks = OrderedDict()
+
+BENCHMARK_MODULES = (
+    'benchmarks.bench_fields',
+    'benchmarks.bench_parse',
+    'benchmarks.bench_filters',
+    'benchmarks.bench_resources',
+    'benchmarks.bench_queries',
+    'benchmarks.bench_principal',
+)
+
+
+class Benchmark(object):
+    """
+    :param str name: unique name of the benchmark, e.g. ``'fields.String.validate'``
+    :param setup: generator function yielding the callable to be timed
+    :param dict params: keyword arguments passed to ``setup``
+    :param int number: number of calls per repetition; if ``None``, calibrated to take at least ``min_time``
+    """
+
+    def __init__(self, name, setup, params=None, number=None):
+        self.name = name
+        self.setup = setup
+        self.params = params or {}
+        self.number = number
+
+    def _calibrate(self, timer, min_time):
+        number = 1
+
+        while True:
+            if timer.timeit(number) >= min_time:
+                return number
+            number *= 10
+
+    def run(self, repeat=5, min_time=0.2):
+        """
+        :returns: dictionary with the per-call timings of the benchmark in seconds.
+        """
+        with contextmanager(self.setup)(**self.params) as fn:
+            timer = timeit.Timer(fn)
+            number = self.number or self._calibrate(timer, min_time)
+            times = sorted(t / number for t in timer.repeat(repeat, number))
+
+        mean = sum(times) / len(times)
+        return OrderedDict((
+            ('name', self.name),
+            ('params', self.params),
+            ('number', number),
+            ('repeat', repeat),
+            ('min', times[0]),
+            ('median', times[len(times) // 2]),
+            ('mean', mean),
+            ('stdev', math.sqrt(sum((t - mean) ** 2 for t in times) / len(times))),
+        ))
+
+
+def benchmark(name, params=None, number=None):
+    """
+    Registers a benchmark.
+
+    :param str name: name of the benchmark
+    :param list params: optional list of parameter dictionaries. One benchmark is registered for each, with the
+        parameters appended to the name, e.g. ``'parse.items[size=100]'``.
+    :param int number: fixed number of calls per repetition
+    """
+    def decorator(setup):
+        for p in params or [None]:
+            full_name = name
+
+            if p:
+                full_name += '[{}]'.format(','.join('{}={}'.format(k, v) for k, v in sorted(p.items())))
+
+            if full_name in _benchmarks:
+                raise KeyError('Duplicate benchmark: {}'.format(full_name))
+            _benchmarks[full_name] = Benchmark(full_name, setup, p, number)
+        return setup
+    return decorator
+
+
+def load_benchmarks(modules=BENCHMARK_MODULES):
+    """
+    Imports the benchmark modules. Modules with missing optional dependencies are skipped.
+
+    :returns: list of ``(module, error)`` tuples for skipped modules
+    """
+    skipped = []
+
+    for module in modules:
+        try:
+            __import__(module)
+        except ImportError as e:
+            skipped.append((module, str(e)))
+    return skipped
+
+
+def get_environment():
+    try:
+        import pkg_resources
+        version = pkg_resources.get_distribution('Flask-Presst').version
+    except Exception:
+        version = None
+
+    return OrderedDict((
+        ('flask_presst', version),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+        ('timestamp', datetime.datetime.utcnow().isoformat() + 'Z'),
+    ))
+
+
+def run_benchmarks(pattern=None, repeat=5, min_time=0.2, out=sys.stderr):
+    """
+    Runs all registered benchmarks whose name matches the regular expression ``pattern``.
+
+    :returns: dictionary with ``environment`` and ``benchmarks`` keys, suitable for writing as JSON.
+    """
+    results = []
+
+    for name, bench in _benchmarks.items():
+        if pattern and not re.search(pattern, name):
+            continue
+
+        result = bench.run(repeat=repeat, min_time=min_time)
+        results.append(result)
+
+        if out is not None:
+            out.write('{:<60} {:>12.2f} us\n'.format(name, result['median'] * 1e6))
+
+    return OrderedDict((
+        ('environment', get_environment()),
+        ('benchmarks', results),
+    ))
@@ -0,0 +1,35 @@
+"""
+Runs the benchmarks and optionally writes the results as JSON::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --filter '^parse\.' --repeat 10
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import load_benchmarks, run_benchmarks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the Flask-Presst microbenchmarks.')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('-k', '--filter', help='only run benchmarks whose name matches this regular expression')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='number of repetitions (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum duration of each repetition in seconds (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    for module, error in load_benchmarks():
+        sys.stderr.write('Skipping {}: {}\n'.format(module, error))
+
+    results = run_benchmarks(args.filter, repeat=args.repeat, min_time=args.min_time)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+import datetime
+
+from flask_presst import fields
+from benchmarks import benchmark
+from benchmarks.fixtures import get_app
+
+# (name, field factory, JSON value, Python value)
+FIELDS = (
+    ('Arbitrary', lambda: fields.Arbitrary(), {'a': [1, 2]}, {'a': [1, 2]}),
+    ('String', lambda: fields.String(max_length=60), 'Gravity\'s Rainbow', 'Gravity\'s Rainbow'),
+    ('Integer', lambda: fields.Integer(), 1973, 1973),
+    ('PositiveInteger', lambda: fields.PositiveInteger(), 1973, 1973),
+    ('Number', lambda: fields.Number(), 4.5, 4.5),
+    ('Boolean', lambda: fields.Boolean(), True, True),
+    ('Date', lambda: fields.Date(), '1973-02-28', datetime.date(1973, 2, 28)),
+    ('DateTime', lambda: fields.DateTime(), '1973-02-28T12:30:00', datetime.datetime(1973, 2, 28, 12, 30)),
+    ('Uri', lambda: fields.Uri(), 'http://example.com/book/1', 'http://example.com/book/1'),
+    ('Email', lambda: fields.Email(), 'author@example.com', 'author@example.com'),
+    ('Nested', lambda: fields.Nested({'title': fields.String(), 'year': fields.Integer()}),
+     {'title': 'V.', 'year': 1963}, {'title': 'V.', 'year': 1963}),
+    ('List', lambda: fields.List(fields.Integer), list(range(20)), list(range(20))),
+    ('KeyValue', lambda: fields.KeyValue(fields.String), {'en': 'V.', 'de': 'V.'}, {'en': 'V.', 'de': 'V.'}),
+)
+
+FIELD_PARAMS = [{'field': name} for name, _, _, _ in FIELDS]
+
+_fields = {name: (factory, json_value, python_value) for name, factory, json_value, python_value in FIELDS}
+
+
+@contextmanager
+def _field_setup(name, method):
+    factory, json_value, python_value = _fields[name]
+    bench = get_app()
+
+    with bench.request_context():
+        field = factory()
+        field.validate(json_value)  # build the validator outside of the timed loop
+
+        if method == 'format':
+            yield lambda: field.format(python_value)
+        else:
+            fn = getattr(field, method)
+            yield lambda: fn(json_value)
+
+
+@benchmark('fields.validate', params=FIELD_PARAMS)
+def validate(field):
+    with _field_setup(field, 'validate') as fn:
+        yield fn
+
+
+@benchmark('fields.convert', params=FIELD_PARAMS)
+def convert(field):
+    with _field_setup(field, 'convert') as fn:
+        yield fn
+
+
+@benchmark('fields.format', params=FIELD_PARAMS)
+def format(field):
+    with _field_setup(field, 'format') as fn:
+        yield fn
+
+
+@benchmark('fields.ToOne.convert')
+def to_one_convert():
+    bench = get_app()
+
+    with bench.request_context():
+        field = bench.BookResource._fields['author']
+        yield lambda: field.convert('/author/1')
+
+
+@benchmark('fields.ToOne.format')
+def to_one_format():
+    bench = get_app()
+
+    with bench.request_context():
+        field = bench.BookResource._fields['author']
+        author = bench.Author.query.get(1)
+        yield lambda: field.format(author)
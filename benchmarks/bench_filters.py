@@ -0,0 +1,37 @@
+from benchmarks import benchmark
+from benchmarks.fixtures import get_app
+
+WHERE_PARAMS = [
+    {'where': 'eq'},
+    {'where': 'in'},
+    {'where': 'range'},
+    {'where': 'compound'},
+]
+
+_where_clauses = {
+    'eq': {'title': 'Book 1-1'},
+    'in': {'year_published': {'$in': [1901, 1902, 1903]}},
+    'range': {'rating': {'$gte': 2.0}},
+    'compound': {'title': {'$startswith': 'Book'}, 'rating': {'$lt': 4}},
+}
+
+
+@benchmark('filters.where_expression', params=WHERE_PARAMS)
+def where_expression(where):
+    bench = get_app()
+    filter_ = bench.BookResource._filter
+    clause = _where_clauses[where]
+
+    with bench.request_context():
+        yield lambda: filter_._where_expression(clause)
+
+
+@benchmark('filters.apply')
+def apply():
+    bench = get_app()
+    filter_ = bench.BookResource._filter
+    clause = _where_clauses['compound']
+
+    with bench.request_context():
+        query = bench.Book.query
+        yield lambda: filter_.apply(query, clause, {'rating': -1})
@@ -0,0 +1,42 @@
+from flask_presst import SchemaParser, fields
+from benchmarks import benchmark
+from benchmarks.fixtures import get_app
+
+SIZE_PARAMS = [{'size': 1}, {'size': 100}, {'size': 10000}]
+
+
+def _make_payload(size):
+    return {
+        'title': 'Collected Works',
+        'items': [{'title': 'Book {}'.format(i), 'year': 1900 + i % 100, 'rating': 2.5} for i in range(size)]
+    }
+
+
+@benchmark('parse.items', params=SIZE_PARAMS)
+def parse_items(size):
+    bench = get_app()
+
+    with bench.request_context():
+        parser = SchemaParser({
+            'title': fields.String(),
+            'items': fields.List(fields.Nested({
+                'title': fields.String(),
+                'year': fields.Integer(),
+                'rating': fields.Number()
+            }))
+        }, required_fields=['title'])
+
+        payload = _make_payload(size)
+        parser.parse(payload)
+        yield lambda: parser.parse(payload)
+
+
+@benchmark('parse.resource_item')
+def parse_resource_item():
+    bench = get_app()
+
+    with bench.request_context():
+        parser = bench.BookResource.item_parser
+        payload = {'title': 'Book', 'year_published': 1973, 'rating': 4.5, 'in_print': True, 'author': None}
+        parser.parse(payload)
+        yield lambda: parser.parse(payload)
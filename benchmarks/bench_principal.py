@@ -0,0 +1,57 @@
+from flask import g
+from flask_principal import Identity, ItemNeed, RoleNeed, UserNeed
+
+from flask_presst.principal.needs import HybridItemNeed
+from flask_presst.principal.permission import HybridPermission
+from benchmarks import benchmark
+from benchmarks.fixtures import get_app
+
+IDENTITY_PARAMS = [{'identity': 'role'}, {'identity': 'item'}, {'identity': 'none'}]
+
+
+def _identity(kind):
+    identity = Identity(1)
+    identity.provides.add(UserNeed(1))
+
+    if kind == 'role':
+        identity.provides.add(RoleNeed('admin'))
+    elif kind == 'item':
+        for id_ in range(1, 21):
+            identity.provides.add(ItemNeed('update', id_, 'book'))
+    return identity
+
+
+def _permission(bench):
+    return HybridPermission(RoleNeed('admin'), HybridItemNeed('update', bench.BookResource))
+
+
+@benchmark('principal.can', params=IDENTITY_PARAMS)
+def can(identity):
+    bench = get_app()
+
+    with bench.request_context():
+        g.identity = _identity(identity)
+        permission = _permission(bench)
+        yield permission.can
+
+
+@benchmark('principal.can_item', params=IDENTITY_PARAMS)
+def can_item(identity):
+    bench = get_app()
+
+    with bench.request_context():
+        g.identity = _identity(identity)
+        permission = _permission(bench)
+        book = bench.Book.query.get(10)
+        yield lambda: permission.can(book)
+
+
+@benchmark('principal.apply_filters', params=IDENTITY_PARAMS)
+def apply_filters(identity):
+    bench = get_app()
+
+    with bench.request_context():
+        g.identity = _identity(identity)
+        permission = _permission(bench)
+        query = bench.Book.query
+        yield lambda: permission.apply_filters(query)
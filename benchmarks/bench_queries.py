@@ -0,0 +1,91 @@
+"""
+Compares the baked queries of :class:`ModelResource` with equivalent ordinary queries, which are compiled on every
+call. The session is cleared before each call so that every lookup emits SQL.
+
+``queries.marshal_item_list`` compares marshalling a list of 1000 items in read-only sessions, which loads rows, with
+marshalling model instances.
+"""
+from benchmarks import benchmark
+from benchmarks.fixtures import BenchmarkApp, get_app
+
+BAKED = [{'baked': True}, {'baked': False}]
+
+
+@benchmark('queries.get_item_for_id', params=BAKED)
+def get_item_for_id(baked):
+    bench = get_app()
+
+    with bench.request_context():
+        session = bench.db.session
+
+        if baked:
+            get = lambda: bench.BookResource.get_item_for_id(1)
+        else:
+            get = lambda: bench.Book.query.get(1)
+
+        def fn():
+            session.expunge_all()
+            get()
+
+        yield fn
+
+
+@benchmark('queries.get_item_from_uri', params=BAKED)
+def get_item_from_uri(baked):
+    bench = get_app()
+
+    with bench.request_context():
+        session = bench.db.session
+
+        if baked:
+            get = lambda: bench.BookResource.get_item_from_uri('/book/1')
+        else:
+            get = lambda: bench.Book.query.filter(bench.Book.id == 1).one()
+
+        def fn():
+            session.expunge_all()
+            get()
+
+        yield fn
+
+
+@benchmark('queries.relationship.paginate', params=BAKED)
+def relationship_paginate(baked):
+    bench = get_app()
+
+    with bench.request_context():
+        session = bench.db.session
+        author = bench.Author.query.get(1)
+
+        if baked:
+            get = lambda: bench.AuthorResource.get_relationship(author, 'books').paginate(2, 5)
+        else:
+            get = lambda: author.books.paginate(2, 5)
+
+        def fn():
+            session.expunge_all()
+            session.add(author)
+            get()
+
+        yield fn
+
+
+_large_app = None
+
+
+@benchmark('queries.marshal_item_list', params=[{'read_only': True}, {'read_only': False}])
+def marshal_item_list(read_only):
+    global _large_app
+
+    if _large_app is None:
+        _large_app = BenchmarkApp(n_authors=1000, n_books=0)
+
+    bench = _large_app
+    router = bench.api.session_router
+    router.read_only = read_only
+
+    with bench.request_context('/author'):
+        resource = bench.AuthorResource
+        yield lambda: resource.marshal_item_list(resource.get_item_list(), paginate=False)
+
+    router.read_only = False
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import joinedload
+
+from flask_presst.utils.marshal import clear_marshal_memo
+from benchmarks import benchmark
+from benchmarks.fixtures import get_app
+
+
+@benchmark('resources.item_get_uri')
+def item_get_uri():
+    bench = get_app()
+
+    with bench.request_context():
+        book = bench.Book.query.get(1)
+        yield lambda: bench.BookResource.item_get_uri(book)
+
+
+@benchmark('resources.marshal_item')
+def marshal_item():
+    bench = get_app()
+
+    with bench.request_context():
+        book = bench.Book.query.get(1)
+        book.author  # load the relationship outside of the timed loop
+
+        def run():
+            clear_marshal_memo()  # otherwise every iteration after the first is a memo lookup
+            return bench.BookResource.marshal_item(book)
+
+        yield run
+
+
+@benchmark('resources.marshal_item_list')
+def marshal_item_list():
+    bench = get_app()
+
+    with bench.request_context():
+        books = bench.Book.query.options(joinedload('author')).all()
+        yield lambda: bench.BookResource.marshal_item_list(books)
@@ -0,0 +1,100 @@
+"""
+A small application with in-memory SQLite models and resources shared by the benchmarks.
+"""
+from contextlib import contextmanager
+import datetime
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import backref
+
+from flask_presst import PresstApi, ModelResource, Relationship, fields
+
+
+class BenchmarkApp(object):
+    """
+    :param int n_authors: number of authors to create
+    :param int n_books: number of books to create for each author
+    """
+
+    def __init__(self, n_authors=10, n_books=10):
+        self.app = app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        app.config['TESTING'] = True
+
+        self.db = db = SQLAlchemy(app)
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            email = db.Column(db.String(120))
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            year_published = db.Column(db.Integer)
+            rating = db.Column(db.Float)
+            in_print = db.Column(db.Boolean, default=True)
+            date_created = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+
+        class AuthorResource(ModelResource):
+            books = Relationship('book')
+
+            class Meta:
+                model = Author
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author')
+
+            class Meta:
+                model = Book
+                read_only_fields = ['date_created']
+
+        self.api = api = PresstApi(app)
+        api.add_resource(AuthorResource)
+        api.add_resource(BookResource)
+
+        self.Author, self.Book = Author, Book
+        self.AuthorResource, self.BookResource = AuthorResource, BookResource
+
+        with app.app_context():
+            db.create_all()
+
+            for a in range(n_authors):
+                author = Author(name='Author {}'.format(a), email='author{}@example.com'.format(a))
+                db.session.add(author)
+
+                for b in range(n_books):
+                    db.session.add(Book(title='Book {}-{}'.format(a, b),
+                                        year_published=1900 + b,
+                                        rating=b / 2.0,
+                                        author=author))
+            db.session.commit()
+
+    @contextmanager
+    def request_context(self, *args, **kwargs):
+        """
+        Pushes a test request context and removes the session afterwards.
+        """
+        with self.app.test_request_context(*args, **kwargs):
+            try:
+                yield
+            finally:
+                self.db.session.remove()
+
+
+_app = None
+
+
+def get_app():
+    """
+    :returns: the shared :class:`BenchmarkApp`, created on first use.
+    """
+    global _app
+
+    if _app is None:
+        _app = BenchmarkApp()
+    return _app
@@ -0,0 +1,219 @@
+"""
+End-to-end scaling benchmark using the models and resources from ``examples/quickstart_api_relationship.py``.
+
+The example database is seeded with a growing number of books (one author per ten books) and a set of scenarios is
+driven through the Flask test client at each size. For every scenario the median latency, the number of SQL statements
+per request and the peak memory allocated during a request are recorded::
+
+    python -m benchmarks.scaling --sizes 1000,10000,100000 --output scaling.json
+
+Results can be compared against a stored baseline. The command exits with status 1 if any scenario is slower, issues
+more queries or allocates more memory than the baseline by more than the threshold::
+
+    python -m benchmarks.scaling --compare scaling.json --threshold 0.25
+"""
+import argparse
+from collections import OrderedDict
+import json
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from flask_presst.queries import init_query_counter
+from benchmarks import get_environment
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+METRICS = ('latency', 'queries', 'peak_memory')
+
+
+def _scenarios(size):
+    """
+    :returns: list of ``(name, method, url, data)`` tuples. ``data`` may be a callable that returns a fresh payload.
+    """
+    n_authors = max(size // 10, 1)
+    middle = size // 2 or 1
+
+    return [
+        ('list', 'GET', '/book?per_page=100', None),
+        ('list_last_page', 'GET', '/book?per_page=100&page={}'.format(max(size // 100, 1)), None),
+        ('filter', 'GET', '/book?per_page=100&where={"year_published": {"$gte": 1990}}', None),
+        ('sort', 'GET', '/book?per_page=100&sort={"year_published": -1}', None),
+        ('item_embedded', 'GET', '/book/{}'.format(middle), None),
+        ('relationship', 'GET', '/author/{}/books'.format(n_authors // 2 or 1), None),
+        ('bulk_post', 'POST', '/book',
+         lambda: [{'title': 'New book {}'.format(i), 'year_published': 2000, 'author': '/author/1'}
+                  for i in range(100)]),
+        ('patch', 'PATCH', '/book/{}'.format(middle), lambda: {'title': 'Changed'}),
+    ]
+
+
+class ScalingBenchmark(object):
+    """
+    :param int iterations: number of timed requests per scenario
+    """
+
+    def __init__(self, iterations=20):
+        from examples import quickstart_api_relationship as example
+
+        self.iterations = iterations
+        self.example = example
+        self.app = app = example.app
+        self.db = example.db
+
+        app.config['TESTING'] = True
+        app.config['PRESST_QUERY_COUNTER'] = True
+        init_query_counter(app)
+
+        self.client = app.test_client()
+
+    def seed(self, size):
+        db, example = self.db, self.example
+        db.drop_all()
+        db.create_all()
+
+        n_authors = max(size // 10, 1)
+        chunk = 10000
+
+        db.engine.execute(example.Author.__table__.insert(),
+                          [{'id': i, 'first_name': 'First {}'.format(i), 'last_name': 'Last {}'.format(i)}
+                           for i in range(1, n_authors + 1)])
+
+        for start in range(1, size + 1, chunk):
+            db.engine.execute(example.Book.__table__.insert(),
+                              [{'id': i,
+                                'title': 'Book {}'.format(i),
+                                'year_published': 1900 + i % 120,
+                                'author_id': 1 + i % n_authors}
+                               for i in range(start, min(start + chunk, size + 1))])
+
+    def _request(self, method, url, data):
+        kwargs = {}
+
+        if data is not None:
+            kwargs = {'data': json.dumps(data() if callable(data) else data), 'content_type': 'application/json'}
+
+        response = self.client.open(url, method=method, **kwargs)
+
+        if response.status_code != 200:
+            raise RuntimeError('{} {} failed with status {}'.format(method, url, response.status_code))
+
+        return response
+
+    def run_scenario(self, method, url, data):
+        self._request(method, url, data)  # warm up
+
+        latencies = []
+
+        for _ in range(self.iterations):
+            start = timeit.default_timer()
+            response = self._request(method, url, data)
+            latencies.append(timeit.default_timer() - start)
+
+        latencies.sort()
+        result = OrderedDict((
+            ('latency', latencies[len(latencies) // 2]),
+            ('queries', int(response.headers['X-Query-Count'])),
+        ))
+
+        if tracemalloc is not None:
+            tracemalloc.start()
+            try:
+                self._request(method, url, data)
+                result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        return result
+
+    def run(self, sizes, out=sys.stderr):
+        results = []
+
+        for size in sizes:
+            with self.app.app_context():
+                self.seed(size)
+
+            for name, method, url, data in _scenarios(size):
+                result = OrderedDict((('scenario', name), ('size', size)))
+                result.update(self.run_scenario(method, url, data))
+                results.append(result)
+
+                if out is not None:
+                    out.write('{:<16} {:>9} {:>10.2f} ms {:>5} queries {:>10} bytes\n'.format(
+                        name, size, result['latency'] * 1000, result['queries'], result.get('peak_memory', '-')))
+
+        return OrderedDict((
+            ('environment', get_environment()),
+            ('iterations', self.iterations),
+            ('scenarios', results),
+        ))
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares two sets of scaling results.
+
+    :param float threshold: maximum allowed relative increase, e.g. ``0.25`` for 25%
+    :returns: list of ``(scenario, size, metric, baseline_value, value)`` tuples for each regression
+    """
+    baseline_by_key = {(r['scenario'], r['size']): r for r in baseline['scenarios']}
+    regressions = []
+
+    for result in results['scenarios']:
+        base = baseline_by_key.get((result['scenario'], result['size']))
+
+        if base is None:
+            continue
+
+        for metric in METRICS:
+            if metric not in result or metric not in base:
+                continue
+
+            if result[metric] > base[metric] * (1 + threshold):
+                regressions.append((result['scenario'], result['size'], metric, base[metric], result[metric]))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.scaling',
+                                     description='Run the Flask-Presst end-to-end scaling benchmark.')
+    parser.add_argument('-s', '--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='comma-separated numbers of rows to seed (default: {})'.format(
+                            ','.join(str(s) for s in DEFAULT_SIZES)))
+    parser.add_argument('-n', '--iterations', type=int, default=20,
+                        help='number of timed requests per scenario (default: 20)')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('-c', '--compare', metavar='BASELINE', help='compare results with a baseline JSON file')
+    parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                        help='maximum allowed relative regression when comparing (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = ScalingBenchmark(iterations=args.iterations).run(sizes)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.threshold)
+
+        for scenario, size, metric, base, value in regressions:
+            sys.stderr.write('REGRESSION {} [size={}] {}: {} -> {} (+{:.0%})\n'.format(
+                scenario, size, metric, base, value, (value - base) / float(base) if base else float('inf')))
+
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
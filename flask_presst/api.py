@@ -2,13 +2,22 @@ from importlib import import_module
 import inspect
 from itertools import chain
 
+from flask import current_app, has_app_context
 from flask_restful import Api, abort
 from jsonschema import RefResolver
 import six
-from werkzeug.utils import cached_property
-
-from flask_presst.schema import HyperSchema
+from sqlalchemy.orm import configure_mappers
+
+from flask_presst.batch import BatchView
+from flask_presst.jobs import JobQueue, JobView
+from flask_presst.fields import Raw, EmbeddedBase, List, KeyValue, Nested
+from flask_presst.metrics import init_metrics
+from flask_presst.queries import init_query_counter
+from flask_presst.schema import HyperSchema, schema_etag
+from flask_presst.sessions import SessionRouter
 from flask_presst.resources import Resource, ModelResource
+from flask_presst.routes import Relationship, ResourceMultiRoute
+from flask_presst.timing import timed, start_request_timings, add_server_timing_header
 from flask_presst.utils.routes import route_from
 
 
@@ -21,33 +30,93 @@ class PresstApi(Api):
     def __init__(self, *args, **kwargs):
         self.pagination_max_per_page = None
         self.pagination_default_per_page = None
-        super(PresstApi, self).__init__(*args, **kwargs)
+        self.metrics = None
+        self.jobs = None
+        self.session_router = None
         self._presst_resources = {}
+        self._schema_cache = {}
+        self._resolved_schemas = {}
+        self._cache_dependents = None
 
         def resolve_resource_schema(uri):
+            try:
+                return self._resolved_schemas[uri]
+            except KeyError:
+                pass
+
             endpoint, args = route_from(uri, method='GET')
             if endpoint.endswith(':schema'):
                 resource_name, _ = endpoint.split(':')
                 resource = self._presst_resources[resource_name]
-                return self.get_resource_schema(resource)
+                self._resolved_schemas[uri] = schema = self.get_resource_schema(resource)
+                return schema
 
-        self.resolver_instance = RefResolver('/', referrer={}, handlers={
+        # resolved resource schemas are memoized in `_resolved_schemas` rather than in the resolver store, so that
+        # they can be invalidated without dropping documents that were preloaded into the store.
+        self.resolver_instance = RefResolver('/', referrer={}, cache_remote=False, handlers={
             '': resolve_resource_schema
         })
 
+        super(PresstApi, self).__init__(*args, **kwargs)
+
     def _init_app(self, app):
         super(PresstApi, self)._init_app(app)
         app.presst = self
 
+        self.resolver_instance.store.update(app.config.get('PRESST_SCHEMA_STORE', {}))
+
+        if app.config.get('PRESST_SERVER_TIMING', False):
+            app.before_request(start_request_timings)
+            app.after_request(add_server_timing_header)
+
+        init_query_counter(app)
+        init_metrics(self, app)
+
         self.pagination_max_per_page = app.config.get('PRESST_MAX_PER_PAGE', 100)
         self.pagination_default_per_page = app.config.get('PRESST_DEFAULT_PER_PAGE', 20)
 
+        self.session_router = app.config.get('PRESST_SESSION_ROUTER') or \
+            SessionRouter(read_only=app.config.get('PRESST_READ_ONLY_SESSIONS', False))
+        self.session_router.init_app(app)
+
         # Add Schema URL rule
         self.app.add_url_rule(self._complete_url('/schema', ''),
                       view_func=self.output(HyperSchema.as_view('schema', self)),
                       endpoint='schema',
                       methods=['GET'])
 
+        if app.config.get('PRESST_BATCH', False):
+            self.app.add_url_rule(self._complete_url(app.config.get('PRESST_BATCH_URL', '/batch'), ''),
+                                  view_func=self.output(BatchView.as_view('batch', self)),
+                                  endpoint='batch',
+                                  methods=['POST'])
+            self.endpoints.add('batch')
+
+    def _init_jobs(self):
+        if self.jobs is not None:
+            return
+
+        self.jobs = JobQueue(self.app)
+        url = '{}/<string:id>'.format(self.app.config.get('PRESST_JOBS_URL', '/jobs'))
+
+        self.app.add_url_rule(self._complete_url(url, ''),
+                              view_func=self.output(JobView.as_view('jobs', self)),
+                              endpoint='jobs',
+                              methods=['GET'])
+        self.endpoints.add('jobs')
+
+    def _invalidate_schemas(self):
+        self._schema_cache.clear()
+        self._resolved_schemas.clear()
+
+        # jsonschema>=2.5 keeps its own cache of resolved URLs:
+        remote_cache = getattr(self.resolver_instance, '_remote_cache', None)
+        if hasattr(remote_cache, 'cache_clear'):
+            remote_cache.cache_clear()
+
+    def make_response(self, data, *args, **kwargs):
+        with timed('encode'):
+            return super(PresstApi, self).make_response(data, *args, **kwargs)
 
     def get_resource_class(self, reference, module_name=None):
         """
@@ -140,8 +209,30 @@ class PresstApi(Api):
 
         return schema
 
-    @cached_property
+    def get_cached_schema(self, resource=None):
+        """
+        Returns the JSON Hyper-Schema of the API, or of ``resource`` if given, together with its entity tag.
+
+        Schemas are built on first use and kept until another resource is added to the API.
+
+        :returns: a ``(schema, etag)`` tuple
+        """
+        try:
+            return self._schema_cache[resource]
+        except KeyError:
+            if resource is None:
+                schema = self._build_schema()
+            else:
+                schema = resource.build_schema()
+
+            self._schema_cache[resource] = cached = schema, schema_etag(schema)
+            return cached
+
+    @property
     def schema(self):
+        return self.get_cached_schema()[0]
+
+    def _build_schema(self):
         definitions = {
             '_pagination': {
                 'type': 'object',
@@ -171,6 +262,60 @@ class PresstApi(Api):
             }
         }
 
+    def _warmup_field(self, field):
+        field.schema
+        field._validator
+
+        if isinstance(field, EmbeddedBase):
+            field.resource
+        if isinstance(field, (List, KeyValue)):
+            self._warmup_field(field.container)
+        elif isinstance(field, Nested):
+            for nested_field in field.fields.values():
+                self._warmup_field(nested_field)
+
+    def warmup(self, app=None):
+        """
+        Eagerly performs the work that otherwise happens during the first requests to each resource: configuring the
+        SQLAlchemy mappers, building field schemas and validators, resolving resource references and building the
+        resource schemas.
+
+        In pre-fork deployments, call this method in the master process after all resources have been added, so that
+        the work is shared with the worker processes.
+
+        :param app: the :class:`flask.Flask` application; defaults to the application the API was created with, or
+            the current application if the API was set up with :meth:`init_app`
+        """
+        app = app or self.app
+
+        if app is None:
+            if not has_app_context():
+                raise RuntimeError('PresstApi.warmup() requires an application when the API was set up with init_app()')
+            app = current_app._get_current_object()
+
+        configure_mappers()
+
+        with app.test_request_context():
+            for resource in list(self._presst_resources.values()):
+                for field in resource._fields.values():
+                    self._warmup_field(field)
+
+                for route in resource.routes.values():
+                    if isinstance(route, Relationship):
+                        route.resource
+                    elif isinstance(route, ResourceMultiRoute):
+                        for view in route._view_methods.values():
+                            for field in view._schema_parser.fields.values():
+                                self._warmup_field(field)
+
+                            if isinstance(view._response_property, Raw):
+                                self._warmup_field(view._response_property)
+
+                self.get_cached_schema(resource)
+                self.resolver_instance.resolve(self._complete_url('{}/schema#'.format(resource.route_prefix), ''))
+
+            self.get_cached_schema()
+
     def add_resource(self, resource, *urls, **kwargs):
 
         # fallback to Flask-RESTful `add_resource` implementation with regular resources:
@@ -182,6 +327,8 @@ class PresstApi(Api):
             return
 
         resource.api = self
+        self._invalidate_schemas()
+        self._cache_dependents = None
 
         resource_name = resource.resource_name
 
@@ -213,6 +360,9 @@ class PresstApi(Api):
                                   endpoint=child_endpoint,
                                   methods=child.methods, **kwargs)
 
+            if isinstance(child, ResourceMultiRoute) and any(view._async for view in child._view_methods.values()):
+                self._init_jobs()
+
         super(PresstApi, self).add_resource(resource, *urls, endpoint=resource_name, **kwargs)
 
 
@@ -0,0 +1,164 @@
+import json
+
+from flask import request, current_app, _request_ctx_stack
+from flask.views import View
+from flask_restful import abort
+from werkzeug.test import EnvironBuilder
+
+# request headers that are not passed on from the batch request to its sub-requests:
+_EXCLUDED_HEADERS = frozenset(('content-type', 'content-length'))
+
+
+def in_atomic_batch():
+    """
+    Returns ``True`` if the current request is part of an atomic batch. Resources should not commit the changes
+    they make in such requests, as the batch commits all of them at once.
+    """
+    return getattr(_request_ctx_stack.top, 'presst_batch_atomic', False)
+
+
+def queue_batch_signal(signal, sender, kwargs):
+    """
+    Holds back a signal sent within an atomic batch until the batch has been committed.
+
+    :returns: ``True`` if the signal was queued, ``False`` if it should be sent right away
+    """
+    queued = getattr(_request_ctx_stack.top, 'presst_batch_signals', None)
+
+    if queued is None:
+        return False
+
+    queued.append((signal, sender, kwargs))
+    return True
+
+
+class BatchView(View):
+    """
+    Dispatches a list of sub-requests of the form ``{"method": "PATCH", "path": "/book/1", "body": {..}}`` through
+    the application's URL map and returns a list of ``{"status": .., "headers": {..}, "body": ..}`` responses.
+
+    Sub-requests are executed in order, with the headers of the batch request. When the batch request is an object of
+    the form ``{"requests": [..], "atomic": true}``, all changes are made in a single transaction. If any of the
+    sub-requests fails, the transaction is rolled back, no further sub-requests are executed and the batch request
+    fails with the status code and message of the failed sub-request. The ``after_*`` signals of an atomic batch are
+    sent once the transaction has been committed, and not at all if it is rolled back.
+    """
+    methods = ['POST']
+
+    def __init__(self, api):
+        self.api = api
+
+    def _parse_batch(self):
+        data = request.json
+        atomic = False
+
+        if isinstance(data, dict):
+            atomic = bool(data.get('atomic', False))
+            data = data.get('requests')
+
+        if not isinstance(data, list):
+            abort(400, message='JSON array of requests required')
+
+        max_requests = current_app.config.get('PRESST_BATCH_MAX_REQUESTS', 50)
+
+        if len(data) > max_requests:
+            abort(400, message='Batch exceeds the maximum of {} requests'.format(max_requests))
+
+        for sub_request in data:
+            if not isinstance(sub_request, dict) or 'path' not in sub_request:
+                abort(400, message='Batch requests must be objects with "method", "path" and optional "body"')
+
+        return data, atomic
+
+    def _get_resource(self, ctx):
+        rule = ctx.request.url_rule
+
+        if rule is None:
+            return None
+        return self.api._presst_resources.get(rule.endpoint.split(':', 1)[0])
+
+    def _dispatch(self, sub_request, atomic, resources, signals):
+        app = current_app._get_current_object()
+        headers = [(key, value) for key, value in request.headers if key.lower() not in _EXCLUDED_HEADERS]
+        method = sub_request.get('method', 'GET').upper()
+        kwargs = {}
+
+        if 'body' in sub_request:
+            kwargs = {'data': json.dumps(sub_request['body']), 'content_type': 'application/json'}
+
+        batch_endpoint = request.url_rule.endpoint
+        builder = EnvironBuilder(sub_request['path'],
+                                 base_url=request.url_root,
+                                 method=method,
+                                 headers=headers,
+                                 environ_base={'REMOTE_ADDR': request.remote_addr},
+                                 **kwargs)
+
+        with app.request_context(builder.get_environ()) as ctx:
+            ctx.presst_batch_atomic = atomic
+            ctx.presst_batch_signals = signals if atomic else None
+
+            if ctx.request.url_rule is not None and ctx.request.url_rule.endpoint == batch_endpoint:
+                abort(400, message='Batch requests cannot be nested')
+
+            resource = self._get_resource(ctx)
+
+            if atomic and resource is not None and resource not in resources:
+                resource.begin()
+                resources.append(resource)
+
+            try:
+                response = app.full_dispatch_request()
+            except Exception as e:
+                response = app.make_response(app.handle_exception(e))
+
+        body = response.get_data(as_text=True)
+
+        if response.mimetype == 'application/json' and body:
+            body = json.loads(body)
+
+        return {
+            'status': response.status_code,
+            'headers': {key: value for key, value in response.headers if key.lower() not in _EXCLUDED_HEADERS},
+            'body': body or None
+        }
+
+    def _rollback(self, resources):
+        for resource in resources:
+            resource.rollback()
+
+        # cached items may have been marshalled from changes that have now been rolled back:
+        for resource in self.api._presst_resources.values():
+            if resource._item_cache is not None:
+                resource._item_cache.clear()
+
+    def dispatch_request(self):
+        batch, atomic = self._parse_batch()
+        resources = []
+        responses = []
+        signals = []
+
+        for i, sub_request in enumerate(batch):
+            response = self._dispatch(sub_request, atomic, resources, signals)
+
+            if atomic and response['status'] >= 400:
+                self._rollback(resources)
+
+                body = response['body']
+                message = body.get('message') if isinstance(body, dict) else body
+                abort(response['status'], message=message, index=i)
+
+            responses.append(response)
+
+        try:
+            for resource in resources:
+                resource.commit()
+        except Exception:
+            current_app.logger.exception('Failed to commit atomic batch')
+            self._rollback(resources)
+            abort(500, message='The changes of the batch could not be committed')
+
+        for signal, sender, kwargs in signals:
+            signal.send(*sender, **kwargs)
+
+        return responses, 200
@@ -0,0 +1,204 @@
+from collections import OrderedDict
+import threading
+import time
+
+from flask_presst.fields import ToOne, One, List, KeyValue, Nested
+from flask_presst.utils.marshal import clear_marshal_memo
+
+
+class ItemCache(object):
+    """
+    Interface for stores of marshalled resource items.
+
+    Keys are strings in the form ``'{resource_name}:{id}'``, values are the JSON-compatible dictionaries returned by
+    :meth:`Resource.marshal_item`. Implementations for external stores (e.g. Memcached or Redis) need to serialize
+    values themselves.
+    """
+
+    def get(self, key):  # pragma: no cover
+        """
+        :returns: the cached value or ``None`` on a cache miss
+        """
+        raise NotImplementedError()
+
+    def set(self, key, value):  # pragma: no cover
+        raise NotImplementedError()
+
+    def delete(self, key):  # pragma: no cover
+        raise NotImplementedError()
+
+    def clear(self):  # pragma: no cover
+        raise NotImplementedError()
+
+
+class LRUItemCache(ItemCache):
+    """
+    Default in-process :class:`ItemCache` that evicts the least recently used items.
+
+    :param int max_size: maximum number of items kept in the cache
+    :param float timeout: optional number of seconds after which an item expires
+    """
+
+    def __init__(self, max_size=1000, timeout=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._items.pop(key)
+            except KeyError:
+                return None
+
+            if expires is not None and expires < time.time():
+                return None
+
+            self._items[key] = value, expires
+            return value
+
+    def set(self, key, value):
+        expires = time.time() + self.timeout if self.timeout else None
+
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value, expires
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def make_item_cache(option):
+    """
+    Returns an :class:`ItemCache` for the ``Meta.cache`` option of a resource.
+
+    :param option: ``True`` for the default :class:`LRUItemCache`, an :class:`ItemCache` instance, or a false value.
+    """
+    if not option:
+        return None
+    if isinstance(option, ItemCache):
+        return option
+    return LRUItemCache()
+
+
+def _referenced_resources(field):
+    if isinstance(field, (ToOne, One)):
+        return [field.resource]
+    if isinstance(field, (List, KeyValue)):
+        return _referenced_resources(field.container)
+    return []
+
+
+def _field_embeds(field):
+    if isinstance(field, ToOne):
+        return field.embedded
+    if isinstance(field, One):
+        return True
+    if isinstance(field, (List, KeyValue)):
+        return _field_embeds(field.container)
+    if isinstance(field, Nested):
+        return any(_field_embeds(nested) for nested in field.fields.values())
+    return False
+
+
+def embeds_items(resource):
+    """
+    Returns ``True`` if items of ``resource`` may embed other items, in which case their marshalled output depends on
+    the items they are embedded in, which can only be embedded up to ``PRESST_MAX_EMBED_DEPTH`` and not in
+    themselves.
+    """
+    return any(_field_embeds(field) for field in resource._fields.values())
+
+
+def _get_cache_dependents(api):
+    """
+    Returns a dictionary of resources and the cached resources with fields that reference them, directly or through
+    other resources. The dictionary is built on first use, since references are resolved lazily, and discarded
+    whenever a resource is added to the API.
+    """
+    dependents = api._cache_dependents
+
+    if dependents is not None:
+        return dependents
+
+    resources = list(api._presst_resources.values())
+    referencing = {}
+
+    for other in resources:
+        for field in other._fields.values():
+            for target in _referenced_resources(field):
+                referencing.setdefault(target, set()).add(other)
+
+    dependents = {}
+
+    for resource in resources:
+        found = set()
+        pending = [resource]
+
+        while pending:
+            for other in referencing.get(pending.pop(), ()):
+                if other not in found:
+                    found.add(other)
+                    pending.append(other)
+
+        dependents[resource] = [other for other in found if other._item_cache is not None]
+
+    api._cache_dependents = dependents
+    return dependents
+
+
+def _invalidate_referencing(resource):
+    """
+    Clears the caches of all resources with fields that reference ``resource``, directly or through other resources,
+    since their marshalled items may embed or list items of ``resource``. This includes ``resource`` itself if it
+    references itself, e.g. through a ``ToOne('self')`` field.
+    """
+    if resource.api is None:
+        return
+
+    for other in _get_cache_dependents(resource.api).get(resource, ()):
+        other._item_cache.clear()
+
+
+def invalidate_item(resource, item):
+    """
+    Removes ``item`` from the item cache of ``resource`` and clears the caches of resources that reference it, along
+    with the marshalled items of the current request. Called by the methods of :class:`ModelResource` that make
+    changes; other resources with an item cache need to call it themselves.
+    """
+    clear_marshal_memo()
+
+    if getattr(resource, '_item_cache', None) is not None:
+        resource._item_cache.delete(resource.item_cache_key(resource.item_get_id(item)))
+
+    _invalidate_referencing(resource)
+
+
+def invalidate_created(resource):
+    """
+    Clears the caches of resources that reference ``resource`` after an item of ``resource`` has been created.
+    """
+    clear_marshal_memo()
+    _invalidate_referencing(resource)
+
+
+def invalidate_relationship(resource, item, relationship, children):
+    """
+    Invalidates ``item`` and the ``children`` added to or removed from one of its relationships.
+    """
+    invalidate_item(resource, item)
+
+    route = resource.routes.get(relationship)
+
+    if route is not None and hasattr(route, 'resource'):
+        for child in children:
+            invalidate_item(route.resource, child)
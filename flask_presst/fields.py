@@ -6,6 +6,7 @@ from jsonschema import Draft4Validator, ValidationError, FormatChecker
 from werkzeug.utils import cached_property
 
 from flask_presst.references import ResourceRef, resolve_item
+from flask_presst.utils.marshal import can_embed
 
 
 def skip_none(fn):
@@ -430,6 +431,93 @@ class KeyValue(Raw):
 class EmbeddedBase(object):
     pass
 
+
+class CollectionLimit(object):
+    """
+    Limits the number of items a collection field outputs. When there are more items, the field outputs an object
+    with the first items in ``_items`` and a link to the next page of the collection's :class:`Relationship` route
+    in ``_next``. The page size of the link is the largest divisor of the limit that does not exceed
+    ``PRESST_MAX_PER_PAGE``, so that the page starts right after the output items.
+
+    :param int max_items: maximum number of items to output
+    :param int embedded_page_size: maximum number of items to output when they are embedded; defaults to
+        ``max_items``
+    """
+    def __init__(self, *args, **kwargs):
+        self.max_items = kwargs.pop('max_items', None)
+        self.embedded_page_size = kwargs.pop('embedded_page_size', None)
+        super(CollectionLimit, self).__init__(*args, **kwargs)
+
+        if self.limit is not None:
+            collection_schema = self._schema
+            self._schema = lambda: self._truncated_schema(collection_schema)
+
+    @staticmethod
+    def _truncated_schema(collection_schema):
+        schema = collection_schema() if callable(collection_schema) else dict(collection_schema)
+        return {
+            "oneOf": [
+                schema,
+                {
+                    "type": "object",
+                    "properties": {
+                        "_items": schema,
+                        "_next": {"type": ["string", "null"]}
+                    },
+                    "required": ["_items", "_next"],
+                    "additionalProperties": False
+                }
+            ]
+        }
+
+    @property
+    def limit(self):
+        limits = [self.max_items]
+
+        if getattr(self.container, 'embedded', True):
+            limits.append(self.embedded_page_size)
+
+        limits = [limit for limit in limits if limit is not None]
+        return min(limits) if limits else None
+
+    def output(self, key, obj):
+        limit = self.limit
+        binding = getattr(self, 'binding', None)
+
+        if limit is None or binding is None:
+            return super(CollectionLimit, self).output(key, obj)
+
+        attribute = key if self.attribute is None else self.attribute
+        value, truncated = binding.get_collection_slice(obj, attribute, limit)
+
+        if value is None:
+            return self.default
+
+        formatted = self.format(value)
+
+        if not truncated:
+            return formatted
+
+        uri = binding.get_relationship_uri(obj, attribute)
+        return {
+            '_items': formatted,
+            '_next': '{}?page={}&per_page={}'.format(uri, *self._next_page(limit)) if uri else None
+        }
+
+    def validate(self, value):
+        if isinstance(value, dict) and set(value) == {'_items', '_next'}:
+            raise ValueError('Truncated collections are read-only')
+        super(CollectionLimit, self).validate(value)
+
+    @staticmethod
+    def _next_page(limit):
+        # the page size of the relationship route is capped at PRESST_MAX_PER_PAGE; the page that follows the
+        # first ``limit`` items must not overlap them, so the page size must divide ``limit``.
+        max_per_page = current_app.config.get('PRESST_MAX_PER_PAGE', 100)
+        per_page = next(size for size in range(min(limit, max_per_page), 0, -1) if limit % size == 0)
+        return limit // per_page + 1, per_page
+
+
 class ToOne(Raw, EmbeddedBase):
     """
     Accept a reference to an item of a ``resource``.
@@ -474,7 +562,7 @@ class ToOne(Raw, EmbeddedBase):
 
     @skip_none
     def format(self, item):
-        if not self.embedded:
+        if not self.embedded or not can_embed(self.resource, item):
             return self.resource.item_get_uri(item)
         return self.resource.marshal_item(item)
 
@@ -483,17 +571,21 @@ class ToOne(Raw, EmbeddedBase):
         return resolve_item(self.resource, value, create=True, update=False, commit=commit)
 
 
-class ToMany(List, EmbeddedBase):
+class ToMany(CollectionLimit, List, EmbeddedBase):
     """
     Accept a list of items of a resource.
+
+    Takes the ``max_items`` and ``embedded_page_size`` arguments of :class:`CollectionLimit`.
     """
     def __init__(self, resource, embedded=False, **kwargs):
         super(ToMany, self).__init__(ToOne(resource, embedded=embedded, nullable=False), **kwargs)
 
 
-class ToManyKV(KeyValue, EmbeddedBase):
+class ToManyKV(CollectionLimit, KeyValue, EmbeddedBase):
     """
     Accept a dictionary mapping to items of a resource.
+
+    Takes the ``max_items`` and ``embedded_page_size`` arguments of :class:`CollectionLimit`.
     """
     def __init__(self, resource, embedded=False, **kwargs):
         super(ToManyKV, self).__init__(ToOne(resource, embedded=embedded, nullable=False), **kwargs)
@@ -523,6 +615,8 @@ class One(Raw, EmbeddedBase):
 
     @skip_none
     def format(self, item):
+        if not can_embed(self.resource, item):
+            return self.resource.item_get_uri(item)
         return self.resource.marshal_item(item)
 
     @skip_none
@@ -530,10 +624,12 @@ class One(Raw, EmbeddedBase):
         return resolve_item(self.resource, value, create=True, update=False, commit=commit)
 
 
-class Many(List, EmbeddedBase):
+class Many(CollectionLimit, List, EmbeddedBase):
     """
     Like :class:`ToMany`, except that embedding is required for both input and output. Uri references
     are not valid and the field is not nullable by default.
+
+    Takes the ``max_items`` and ``embedded_page_size`` arguments of :class:`CollectionLimit`.
     """
     def __init__(self, resource, nullable=False, **kwargs):
         super(Many, self).__init__(One(resource, nullable=False), nullable=nullable, **kwargs)
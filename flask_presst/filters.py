@@ -4,6 +4,7 @@ from flask.ext.restful import abort
 from jsonschema import validate, ValidationError
 from sqlalchemy import func
 from . import fields
+from .timing import timed
 
 __author__ = 'lyschoening'
 
@@ -193,9 +194,11 @@ class Filter(object):
                 yield column.asc()
 
     def apply(self, query, where, sort):
-        if where:
-            query = query.filter(self._where_expression(where))
-        if sort:
-            query = query.order_by(*self._sort_criteria(sort))
-        return query
+        with timed('filter'):
+            if where:
+                query = query.filter(self._where_expression(where))
+            if sort:
+                # the requested sort replaces any default ordering, such as the order_by of a relationship:
+                query = query.order_by(None).order_by(*self._sort_criteria(sort))
+            return query
 
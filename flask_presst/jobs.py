@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+import json
+import threading
+import uuid
+
+from flask import request, url_for, _request_ctx_stack
+from flask.views import View
+from flask_restful import abort
+from werkzeug.test import EnvironBuilder
+
+
+def get_current_job():
+    """
+    :returns: the :class:`Job` being executed in the current request, or ``None`` outside of asynchronous jobs.
+    """
+    return getattr(_request_ctx_stack.top, 'presst_job', None)
+
+
+class Job(object):
+    """
+    An asynchronous request to an ``async_`` route.
+
+    .. attribute:: status
+
+        One of ``'pending'``, ``'running'``, ``'completed'`` or ``'failed'``.
+    """
+
+    def __init__(self, id_, uri):
+        self.id = id_
+        self.uri = uri
+        self.status = 'pending'
+        self.status_code = None
+        self.result = None
+        self.future = None
+        self.date_created = datetime.utcnow()
+        self.date_finished = None
+
+    @property
+    def done(self):
+        return self.status in ('completed', 'failed')
+
+    def marshal(self):
+        marshaled = {'_uri': self.uri, 'status': self.status}
+
+        if self.done:
+            marshaled['status_code'] = self.status_code
+            marshaled['result'] = self.result
+        return marshaled
+
+
+class JobQueue(object):
+    """
+    Executes requests to ``async_`` routes in the background and keeps track of their results.
+
+    Each job replays the original request, with the same method, path, headers and body, in a new request context
+    on an executor thread. Results of finished jobs are kept for ``PRESST_JOB_TTL`` seconds.
+
+    :param executor: a :class:`concurrent.futures.Executor`. Defaults to the ``PRESST_JOB_EXECUTOR`` configuration
+        variable or a thread pool with ``PRESST_JOB_WORKERS`` threads. Process pools are not supported, as jobs need
+        the application.
+    """
+
+    def __init__(self, app, executor=None):
+        self.app = app
+        self.ttl = timedelta(seconds=app.config.get('PRESST_JOB_TTL', 3600))
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+        if executor is None:
+            executor = app.config.get('PRESST_JOB_EXECUTOR')
+
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=app.config.get('PRESST_JOB_WORKERS', 4))
+        elif isinstance(executor, ProcessPoolExecutor):
+            raise RuntimeError('Jobs cannot be executed with a ProcessPoolExecutor, as they need the application')
+
+        self.executor = executor
+
+    def get(self, id_):
+        with self._lock:
+            return self._jobs.get(id_)
+
+    def _expire(self):
+        now = datetime.utcnow()
+
+        with self._lock:
+            for id_, job in list(self._jobs.items()):
+                if job.done and job.date_finished + self.ttl < now:
+                    del self._jobs[id_]
+
+    def submit(self):
+        """
+        Schedules the current request to be executed in the background.
+
+        :returns: the new :class:`Job`
+        """
+        self._expire()
+
+        id_ = uuid.uuid4().hex
+        job = Job(id_, url_for('jobs', id=id_))
+        environ = EnvironBuilder(request.path,
+                                 base_url=request.url_root,
+                                 query_string=request.query_string,
+                                 method=request.method,
+                                 headers=[(key, value) for key, value in request.headers
+                                          if key.lower() not in ('content-type', 'content-length')],
+                                 data=request.get_data(),
+                                 content_type=request.content_type,
+                                 environ_base={'REMOTE_ADDR': request.remote_addr}).get_environ()
+
+        with self._lock:
+            self._jobs[id_] = job
+
+        job.future = future = self.executor.submit(self._run, job, environ)
+        future.add_done_callback(lambda future: self._check_future(job, future))
+        return job
+
+    def _check_future(self, job, future):
+        # e.g. the executor failed to run the job, or the job was cancelled:
+        if not job.done and (future.cancelled() or future.exception() is not None):
+            if not future.cancelled():
+                self.app.logger.error('Job {} could not be executed: {!r}'.format(job.id, future.exception()))
+            job.status_code = 500
+            job.status = 'failed'
+            job.date_finished = datetime.utcnow()
+
+    def _run(self, job, environ):
+        app = self.app
+        job.status = 'running'
+
+        try:
+            with app.request_context(environ) as ctx:
+                ctx.presst_job = job
+                response = app.full_dispatch_request()
+
+            body = response.get_data(as_text=True)
+
+            if response.mimetype == 'application/json' and body:
+                body = json.loads(body)
+
+            job.status_code = response.status_code
+            job.result = body or None
+            job.status = 'completed' if response.status_code < 400 else 'failed'
+        except Exception:
+            app.logger.exception('Job {} failed'.format(job.id))
+            job.status_code = 500
+            job.status = 'failed'
+        finally:
+            job.date_finished = datetime.utcnow()
+
+
+class JobView(View):
+    """
+    Reports the status of a :class:`Job` and, once it is done, the status code and marshalled result of its request.
+    """
+    methods = ['GET']
+
+    def __init__(self, api):
+        self.api = api
+
+    def dispatch_request(self, id):
+        job = self.api.jobs.get(id)
+
+        if job is None:
+            abort(404)
+        return job.marshal(), 200
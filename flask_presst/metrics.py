@@ -0,0 +1,198 @@
+from bisect import bisect_left
+from collections import defaultdict
+import itertools
+import threading
+from timeit import default_timer
+
+from flask import request, _request_ctx_stack
+from werkzeug.wrappers import Response
+
+DEFAULT_LATENCY_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class _Shard(object):
+    """
+    Metrics recorded by the threads assigned to one stripe.
+    """
+
+    def __init__(self, n_buckets):
+        self.lock = threading.Lock()
+        self.n_buckets = n_buckets
+        self.requests = defaultdict(int)
+        self.latency_buckets = defaultdict(lambda: [0] * n_buckets)
+        self.latency_sum = defaultdict(float)
+        self.latency_count = defaultdict(int)
+        self.response_size_sum = defaultdict(int)
+        self.response_size_count = defaultdict(int)
+        self.items_sum = defaultdict(int)
+        self.items_count = defaultdict(int)
+
+
+class MetricsRegistry(object):
+    """
+    Records request counts, latencies, response sizes and item counts per API endpoint.
+
+    Metrics are recorded into a fixed number of shards, each with its own lock. Threads are assigned to shards in
+    turn, so that concurrent requests rarely wait for the same lock, and the number of shards does not grow with the
+    number of threads a server has started over its lifetime. Shards are merged when the metrics are exported.
+
+    :param tuple latency_buckets: upper bounds of the latency histogram buckets, in seconds
+    :param int n_shards: number of shards
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS, n_shards=16):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._shards = [_Shard(len(self.latency_buckets)) for _ in range(n_shards)]
+        self._next_shard = itertools.count()
+        self._local = threading.local()
+
+    def _get_shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            # itertools.count() is atomic in CPython:
+            self._local.shard = shard = self._shards[next(self._next_shard) % len(self._shards)]
+            return shard
+
+    def record(self, endpoint, method, status, duration, response_size=None, items=None):
+        shard = self._get_shard()
+        key = (endpoint, method)
+        bucket = bisect_left(self.latency_buckets, duration)
+
+        with shard.lock:
+            shard.requests[(endpoint, method, status)] += 1
+
+            if bucket < len(self.latency_buckets):
+                shard.latency_buckets[key][bucket] += 1
+
+            shard.latency_sum[key] += duration
+            shard.latency_count[key] += 1
+
+            if response_size is not None:
+                shard.response_size_sum[key] += response_size
+                shard.response_size_count[key] += 1
+
+            if items is not None:
+                shard.items_sum[key] += items
+                shard.items_count[key] += 1
+
+    def _merge(self, attribute):
+        merged = defaultdict(int)
+
+        for shard in self._shards:
+            with shard.lock:
+                for key, value in getattr(shard, attribute).items():
+                    merged[key] += value
+        return merged
+
+    def _merge_buckets(self):
+        merged = {}
+
+        for shard in self._shards:
+            with shard.lock:
+                for key, counts in shard.latency_buckets.items():
+                    total = merged.setdefault(key, [0] * len(self.latency_buckets))
+                    for i, count in enumerate(counts):
+                        total[i] += count
+        return merged
+
+    def export(self):
+        """
+        :returns: the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def labels(**kwargs):
+            return '{' + ','.join('{}="{}"'.format(k, v) for k, v in sorted(kwargs.items())) + '}'
+
+        lines.append('# HELP presst_requests_total Number of requests by endpoint, method and status code.')
+        lines.append('# TYPE presst_requests_total counter')
+        for (endpoint, method, status), count in sorted(self._merge('requests').items()):
+            lines.append('presst_requests_total{} {}'.format(labels(endpoint=endpoint, method=method, status=status),
+                                                             count))
+
+        lines.append('# HELP presst_request_duration_seconds Request latency by endpoint and method.')
+        lines.append('# TYPE presst_request_duration_seconds histogram')
+        latency_sum = self._merge('latency_sum')
+        latency_count = self._merge('latency_count')
+        buckets = self._merge_buckets()
+
+        for key in sorted(latency_count):
+            endpoint, method = key
+            cumulative = 0
+            for bound, count in zip(self.latency_buckets, buckets.get(key, [0] * len(self.latency_buckets))):
+                cumulative += count
+                lines.append('presst_request_duration_seconds_bucket{} {}'.format(
+                    labels(endpoint=endpoint, method=method, le=repr(float(bound))), cumulative))
+            lines.append('presst_request_duration_seconds_bucket{} {}'.format(
+                labels(endpoint=endpoint, method=method, le='+Inf'), latency_count[key]))
+            lines.append('presst_request_duration_seconds_sum{} {!r}'.format(
+                labels(endpoint=endpoint, method=method), latency_sum[key]))
+            lines.append('presst_request_duration_seconds_count{} {}'.format(
+                labels(endpoint=endpoint, method=method), latency_count[key]))
+
+        for name, attribute, description in (
+                ('presst_response_size_bytes', 'response_size', 'Response body size by endpoint and method.'),
+                ('presst_response_items', 'items', 'Number of items in item list responses by endpoint and method.')):
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} summary'.format(name))
+            sums = self._merge('{}_sum'.format(attribute))
+            counts = self._merge('{}_count'.format(attribute))
+
+            for key in sorted(counts):
+                endpoint, method = key
+                lines.append('{}_sum{} {}'.format(name, labels(endpoint=endpoint, method=method), sums[key]))
+                lines.append('{}_count{} {}'.format(name, labels(endpoint=endpoint, method=method), counts[key]))
+
+        return '\n'.join(lines) + '\n'
+
+
+def count_response_items(count):
+    """
+    Records the number of items marshalled into the response of the current request.
+    """
+    ctx = _request_ctx_stack.top
+
+    if ctx is not None and hasattr(ctx, 'presst_metrics_start'):
+        ctx.presst_response_items = getattr(ctx, 'presst_response_items', 0) + count
+
+
+def init_metrics(api, app):
+    """
+    Sets up ``api.metrics`` and the metrics route if the ``PRESST_METRICS`` configuration variable is set.
+    """
+    if not app.config.get('PRESST_METRICS', False):
+        return
+
+    api.metrics = metrics = MetricsRegistry(app.config.get('PRESST_METRICS_LATENCY_BUCKETS', DEFAULT_LATENCY_BUCKETS))
+
+    def is_api_endpoint(endpoint):
+        return endpoint == 'schema' or endpoint.split(':', 1)[0] in api._presst_resources
+
+    @app.before_request
+    def start_metrics():
+        _request_ctx_stack.top.presst_metrics_start = default_timer()
+
+    @app.after_request
+    def record_metrics(response):
+        ctx = _request_ctx_stack.top
+        rule = request.url_rule
+
+        if rule is None or not is_api_endpoint(rule.endpoint):
+            return response
+
+        metrics.record(rule.endpoint,
+                       request.method,
+                       response.status_code,
+                       default_timer() - ctx.presst_metrics_start,
+                       response_size=response.calculate_content_length(),
+                       items=getattr(ctx, 'presst_response_items', None))
+        return response
+
+    def export_metrics():
+        return Response(metrics.export(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule(api._complete_url(app.config.get('PRESST_METRICS_URL', '/metrics'), ''),
+                     view_func=export_metrics,
+                     endpoint='metrics',
+                     methods=['GET'])
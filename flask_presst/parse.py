@@ -2,6 +2,8 @@
 from flask import request
 from flask_restful import abort
 
+from flask_presst.timing import timed
+
 
 class ParsingException(Exception):
 
@@ -62,6 +64,10 @@ class SchemaParser(object):
         :param bool partial: Whether to allow omitting required fields
         :param dict resolve: An optional dictionary of properties to pre-fill rather than load from fields.
         """
+        with timed('parse'):
+            return self._parse(obj, partial, resolve, strict)
+
+    def _parse(self, obj, partial, resolve, strict):
         converted = dict(resolve) if resolve else {}
 
         try:
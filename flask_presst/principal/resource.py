@@ -159,6 +159,13 @@ class PrincipalResource(six.with_metaclass(PrincipalResourceMeta, ModelResource)
         permission = cls._permissions['delete']
         return permission.can(item)
 
+    @classmethod
+    def get_cached_item(cls, id_):
+        """
+        Always returns ``None``, so that read permissions are evaluated before a cached item is returned.
+        """
+        return None
+
     @classmethod
     def get_item_list(cls):
         """
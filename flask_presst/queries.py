@@ -0,0 +1,108 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import random
+
+from flask import _request_ctx_stack, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter(object):
+    """
+    Counts the SQL statements executed during a request and attributes them to the resource field being marshalled
+    at the time.
+
+    :param int n_plus_one_threshold: minimum number of items of a resource that have to be marshalled before a field
+        issuing one or more queries per item is reported
+    """
+
+    def __init__(self, n_plus_one_threshold=2):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.total = 0
+        self.by_field = defaultdict(int)
+        self.items_marshalled = defaultdict(int)
+        self._path = []
+
+    def count_statement(self):
+        self.total += 1
+
+        if self._path:
+            self.by_field[self._path[-1]] += 1
+
+    def count_item(self, resource):
+        self.items_marshalled[resource.resource_name] += 1
+
+    @contextmanager
+    def marshalling(self, resource, field_name):
+        self._path.append((resource.resource_name, field_name))
+        try:
+            yield
+        finally:
+            self._path.pop()
+
+    def find_n_plus_one(self):
+        """
+        :returns: a list of ``(resource_name, field_name, query_count, item_count)`` tuples for fields that issued at
+            least one query for each marshalled item.
+        """
+        suspects = []
+
+        for (resource_name, field_name), count in sorted(self.by_field.items()):
+            items = self.items_marshalled[resource_name]
+
+            if items >= self.n_plus_one_threshold and count >= items:
+                suspects.append((resource_name, field_name, count, items))
+        return suspects
+
+
+def get_query_counter():
+    """
+    :returns: the :class:`QueryCounter` of the current request, or ``None`` if queries are not being counted.
+    """
+    return getattr(_request_ctx_stack.top, 'presst_query_counter', None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    ctx = _request_ctx_stack.top
+
+    if ctx is not None:
+        counter = getattr(ctx, 'presst_query_counter', None)
+
+        if counter is not None:
+            counter.count_statement()
+
+
+def init_query_counter(app):
+    """
+    Registers the query counter with ``app`` if either of the ``PRESST_QUERY_COUNTER`` (count all requests) or
+    ``PRESST_QUERY_COUNTER_SAMPLE_RATE`` (count a fraction of requests) configuration variables is set.
+    """
+    debug = app.config.get('PRESST_QUERY_COUNTER', False)
+    sample_rate = app.config.get('PRESST_QUERY_COUNTER_SAMPLE_RATE', 0)
+    threshold = app.config.get('PRESST_N_PLUS_ONE_THRESHOLD', 2)
+
+    if not (debug or sample_rate):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+
+    @app.before_request
+    def start_query_counter():
+        if debug or random.random() < sample_rate:
+            _request_ctx_stack.top.presst_query_counter = QueryCounter(threshold)
+
+    @app.after_request
+    def report_query_counter(response):
+        counter = get_query_counter()
+
+        if counter is None:
+            return response
+
+        for resource_name, field_name, count, items in counter.find_n_plus_one():
+            current_app.logger.warning('Possible N+1 queries: field "{}" of resource "{}" issued {} queries while '
+                                       'marshalling {} items'.format(field_name, resource_name, count, items))
+
+        if debug:
+            response.headers['X-Query-Count'] = str(counter.total)
+        return response
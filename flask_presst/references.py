@@ -7,6 +7,10 @@ from flask import current_app, request
 from flask_restful import Resource, abort
 import six
 
+from flask_presst.signals import after_create_items, after_add_relationships, after_remove_relationships
+from flask_presst.timing import timed
+from flask_presst.utils.marshal import clear_marshal_memo
+
 
 class ResourceRef(object):
     def __init__(self, reference):
@@ -42,6 +46,11 @@ class ResourceRef(object):
         return "<ResourceRef '{}'>".format(self.resolve().resource_name)
 
 
+def _signal_sender(resource):
+    # per-item signals are sent from resource classmethods; bulk signals use the same sender:
+    return resource if isinstance(resource, type) else type(resource)
+
+
 class EmbeddedJob(object):
     def __init__(self, resource, data, item=None, **kwargs):
         self.resource = resource
@@ -109,6 +118,7 @@ class ItemWrapper(object):
             abort(400, message='JSON dictionary or string required')
 
         item = resolve_item(resource, properties, commit=commit, **kwargs)
+        clear_marshal_memo()
         return ItemWrapper(resource, item)
 
     @classmethod
@@ -123,18 +133,29 @@ class ItemWrapper(object):
     def update(self, changes, resolved_properties=None, partial=False, commit=True):
         item_changes = self.resource.item_parser.parse(changes, resolve=resolved_properties, partial=partial)
         self.item = self.resource.update_item(self.item, EmbeddedJob.complete(item_changes), commit=commit, partial=partial)
+        clear_marshal_memo()
         return self
 
     def get_relationship(self, relationship, target_resource):
         return ItemListWrapper(target_resource, self.resource.get_relationship(self.item, relationship))
 
     def add_to_relationship(self, relationship, wrapped_items, commit=True):
+        clear_marshal_memo()
+
         if isinstance(wrapped_items, ItemListWrapper):
-            child_items = [self.resource.add_to_relationship(self.item, relationship, child)
-                           for child in wrapped_items.items]
+            child_items = self.resource.add_items_to_relationship(self.item, relationship, list(wrapped_items.items))
+
             if commit:
                 self.resource.commit()
 
+            sender = _signal_sender(self.resource)
+
+            if after_add_relationships.has_receivers_for(sender):
+                after_add_relationships.send(sender,
+                                             item=self.item,
+                                             relationship=relationship,
+                                             children=child_items)
+
             return ItemListWrapper(wrapped_items.resource, child_items)
         elif isinstance(wrapped_items, ItemWrapper):
             child = self.resource.add_to_relationship(self.item, relationship, wrapped_items.item)
@@ -148,15 +169,25 @@ class ItemWrapper(object):
 
     def remove_from_relationship(self, relationship, wrapped_items, commit=True):
         if isinstance(wrapped_items, ItemListWrapper):
-            for child in wrapped_items.items:
-                self.resource.remove_from_relationship(self.item, relationship, child)
+            self.resource.remove_items_from_relationship(self.item, relationship, list(wrapped_items.items))
         elif isinstance(wrapped_items, ItemWrapper):
             self.resource.remove_from_relationship(self.item, relationship, wrapped_items.item)
         if commit:
             self.resource.commit()
 
+        clear_marshal_memo()
+
+        sender = _signal_sender(self.resource)
+
+        if isinstance(wrapped_items, ItemListWrapper) and after_remove_relationships.has_receivers_for(sender):
+            after_remove_relationships.send(sender,
+                                            item=self.item,
+                                            relationship=relationship,
+                                            children=list(wrapped_items.items))
+
     def delete(self, commit=True):
         self.resource.delete_item(self.item)
+        clear_marshal_memo()
 
     @property
     def id(self):
@@ -170,7 +201,17 @@ class ItemWrapper(object):
         return self.item
 
     def marshal(self):
-        return self.resource.marshal_item(self.item)
+        embedded = self.resource._load_embedded([self.item])
+
+        with timed('marshal', self.resource):
+            marshaled = self.resource.marshal_item(self.item)
+
+        if embedded is None:
+            return marshaled
+
+        (marshaled,), included = self.resource._marshal_included(embedded, [marshaled])
+        marshaled['_included'] = included
+        return marshaled
 
 
 class ItemListWrapper(object):
@@ -185,12 +226,20 @@ class ItemListWrapper(object):
             abort(400, message='JSON dictionary, string, or array required')
 
         if isinstance(properties, list):
-            # TODO handle commit in here (commit once after list operation)
-            items = [resolve_item(resource, p, commit=False, **kwargs) for p in properties]
-            items = EmbeddedJob.complete(items)
+            resolved = [resolve_item(resource, p, commit=False, **kwargs) for p in properties]
+            created = [i for i, job in enumerate(resolved) if isinstance(job, EmbeddedJob) and job.item is None]
+            items = EmbeddedJob.complete(resolved)
 
             if commit:
                 resource.commit()
+
+            clear_marshal_memo()
+
+            sender = _signal_sender(resource)
+
+            if created and after_create_items.has_receivers_for(sender):
+                after_create_items.send(sender, items=[items[i] for i in created])
+
             return ItemListWrapper(resource, items)
 
         item = EmbeddedJob.complete(resolve_item(resource, properties, commit=commit, **kwargs))
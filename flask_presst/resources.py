@@ -4,24 +4,40 @@ import collections
 
 from flask import request, current_app
 from flask_restful import reqparse, Resource as RestfulResource, abort, marshal
+from flask_restful.fields import get_value
 from flask_sqlalchemy import BaseQuery, Pagination, get_state
 from flask.views import MethodViewType
 import itertools
 import sqlalchemy.types as sa_types
+from sqlalchemy import and_, bindparam, func, inspect, select
 from sqlalchemy.dialects import postgres
-from sqlalchemy.orm import class_mapper
-from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext import baked
+from sqlalchemy.orm import aliased, class_mapper, RelationshipProperty
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import NoResultFound, UnmappedColumnError
+from sqlalchemy.orm.util import join as orm_join
 from sqlalchemy.util import classproperty, OrderedDict
 import six
 
-from flask_presst.routes import ResourceRoute, route
+from flask_presst.batch import in_atomic_batch
+from flask_presst.cache import make_item_cache, embeds_items, invalidate_created, invalidate_item, invalidate_relationship
+from flask_presst.routes import ResourceRoute, Relationship, route
 from flask_presst.filters import Filter
 from flask_presst.fields import String, Integer, Boolean, List, DateTime, EmbeddedBase, Raw, KeyValue, Arbitrary, \
-    Date, Number
+    Date, Number, ToOne, ToMany
 from flask_presst.references import EmbeddedJob, ItemListWrapper, ItemWrapper
 from flask_presst.signals import *
 from flask_presst.routes import ResourceRoute
+from flask_presst.metrics import count_response_items
 from flask_presst.parse import SchemaParser
+from flask_presst.queries import get_query_counter
+from flask_presst.schema import schema_response
+from flask_presst.timing import timed, timed_method
+from flask_presst.utils.baked import BakedRelationshipQuery, get_real_session, get_relationship_order_by, \
+    make_relationship_criterion
+from flask_presst.utils.marshal import clear_marshal_memo, get_embed_depth, get_marshal_memo, marshalling, \
+    safe_item_id
 
 
 LINK_HEADER_FORMAT_STR = '<{0}?page={1}&per_page={2}>; rel="{3}"'
@@ -43,6 +59,7 @@ class ResourceMeta(MethodViewType):
             class_._required_fields = meta.get('required_fields', [])
             class_._fields = fields = dict()
             class_._read_only_fields = set(meta.get('read_only_fields', []))
+            class_._item_cache = make_item_cache(meta.get('cache', None))
             class_._meta = meta
 
             for name, m in six.iteritems(members):
@@ -91,6 +108,9 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
                            and `PATCH` requests. Useful for e.g. timestamps.
     title                  JSON-schema title declaration
     description            JSON-schema description declaration
+    cache                  ``True`` to cache marshalled items in an in-process LRU cache, or an instance of
+                           :class:`flask_presst.cache.ItemCache` for an external store. The cache is
+                           invalidated by the methods that make changes. *Default: no cache*
     =====================  ==============================================================================
 
     .. rubric:: Footnotes
@@ -110,53 +130,62 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
     _relationships = None
     _read_only_fields = None
     _required_fields = None
+    _item_cache = None
 
     #schema = ResourceSchema()
 
     @route('GET')
     def schema(self):
         # TODO enforce Content-Type: application/schema+json (overwritten by Flask-RESTful)
+        return schema_response(*self.api.get_cached_schema(self.__class__))
 
+    @classmethod
+    def build_schema(cls):
+        """
+        Builds the JSON Hyper-Schema of the resource served at ``/{resource}/schema``.
+
+        .. seealso:: :meth:`PresstApi.get_cached_schema`
+        """
         schema = OrderedDict()
 
         for schema_property in ('title', 'description'):
-            if schema_property in self._meta:
-                schema[schema_property] = self._meta[schema_property]
+            if schema_property in cls._meta:
+                schema[schema_property] = cls._meta[schema_property]
 
         links = [
             {
                 'rel': 'self',
-                'href': self.api._complete_url('{}/{{id}}'.format(self.route_prefix), ''),
+                'href': cls.api._complete_url('{}/{{id}}'.format(cls.route_prefix), ''),
                 'method': 'GET',
             },
             {
                 'rel': 'instances',
-                'href': self.api._complete_url('{}'.format(self.route_prefix), ''),
+                'href': cls.api._complete_url('{}'.format(cls.route_prefix), ''),
                 'method': 'GET',
                 'schema': {
-                    '$ref': self.api._complete_url('/schema#/definitions/_pagination', '')
+                    '$ref': cls.api._complete_url('/schema#/definitions/_pagination', '')
                 }
             }
         ]
 
-        links = itertools.chain(links, *[route.get_links(self) for name, route in sorted(self.routes.items())
+        links = itertools.chain(links, *[route.get_links(cls) for name, route in sorted(cls.routes.items())
                                          if name != 'schema'])
 
         schema['type'] = 'object'
         schema['definitions'] = definitions = {}
         schema['properties'] = properties = {}
-        schema['required'] = self._required_fields
+        schema['required'] = cls._required_fields
         schema['links'] = list(links)
 
         # fields:
-        for name, field in sorted(self._fields.items()):
+        for name, field in sorted(cls._fields.items()):
             definition = field.schema
 
             if '$ref' in definition:
                 properties[name] = definition
                 continue
 
-            if name in self._read_only_fields:
+            if name in cls._read_only_fields:
                 definition['readOnly'] = True
 
             definitions[name] = definition
@@ -172,6 +201,15 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
             '$ref': '#/definitions/_uri'
         }
 
+        # relationship counts:
+        for name, route in sorted(cls.routes.items()):
+            if getattr(route, 'count', False):
+                properties['{}_count'.format(name)] = {
+                    'type': 'integer',
+                    'minimum': 0,
+                    'readOnly': True
+                }
+
         return schema
 
     def get(self, id=None, **kwargs):
@@ -180,6 +218,10 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
                 .get_list(self)\
                 .apply_filter(request=request).marshal()
         else:
+            marshaled = self.get_cached_item(id) if 'embed' not in request.args else None
+
+            if marshaled is not None:
+                return marshaled
             return ItemWrapper.read(self, id).marshal()
 
     def post(self, id=None, *args, **kwargs):
@@ -232,6 +274,14 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
         """
         pass
 
+    @classmethod
+    def rollback(cls):
+        """
+        Called when a batch of operations started with :meth:`begin` fails.
+        Should discard all changes made since then. May be a no-op.
+        """
+        pass
+
     def _request_get_data(self):
         # TODO upcoming in Flask 0.11: 'is_json':
         # if not request.is_json:
@@ -310,6 +360,31 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def add_items_to_relationship(cls, item, relationship, children):
+        """
+        Add a list of child items to a relationship. Calls :meth:`add_to_relationship` for each child by default.
+
+        :param item: instance of the item from the parent resource
+        :param str relationship: name of the relationship from the parent resource
+        :param list children: items to add to the relationship
+        :returns: list of added items
+        """
+        return [cls.add_to_relationship(item, relationship, child) for child in children]
+
+    @classmethod
+    def remove_items_from_relationship(cls, item, relationship, children):
+        """
+        Delete a list of child items from a relationship. Calls :meth:`remove_from_relationship` for each child by
+        default.
+
+        :param item: instance of the item from the parent resource
+        :param str relationship: name of the relationship from the parent resource
+        :param list children: items to remove from the relationship
+        """
+        for child in children:
+            cls.remove_from_relationship(item, relationship, child)
+
     @classmethod
     def create_item(cls, dct, commit=True):  # pragma: no cover
         """
@@ -350,13 +425,90 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
             raise RuntimeError("{} has not been registered as an API endpoint.".format(cls.__name__))
         return cls.api.url_for(cls, id=cls.item_get_id(item))
 
+    @classmethod
+    def item_cache_key(cls, id_):
+        """
+        Returns the key of an item in the resource's item cache.
+        """
+        return '{}:{}'.format(cls.resource_name, id_)
+
+    @classmethod
+    def get_cached_item(cls, id_):
+        """
+        Returns the marshalled item from the item cache, or ``None`` if the resource is not cached or the item is
+        not in the cache.
+
+        .. seealso:: ``Meta.cache``
+        """
+        if cls._item_cache is None:
+            return None
+        return cls._item_cache.get(cls.item_cache_key(id_))
+
     @classmethod
     def marshal_item(cls, item):
         """
         Marshals the item using the resource fields and returns a JSON-compatible dictionary.
+
+        If the resource has an item cache, marshalled items are read from and written to the cache. Items that embed
+        other items only use the cache where they are not embedded themselves, e.g. in ``GET /resource/{id}``.
+        Within a request, each item is marshalled only once at each embedding depth, unless its output depends on the
+        items it is embedded in. Changes clear the marshalled items of the request.
         """
+        id_ = safe_item_id(cls, item)
+        memo = get_marshal_memo()
+
+        if memo is None:
+            return cls._marshal_cached_item(item, id_)
+
+        marshaled = memo.get(cls, id_) if id_ is not None else None
+
+        if marshaled is None:
+            with marshalling(cls, id_) as frame:
+                marshaled = cls._marshal_cached_item(item, id_, frame)
+
+            if id_ is not None:
+                memo.set(cls, id_, marshaled, frame)
+        return marshaled
+
+    @classmethod
+    def _marshal_cached_item(cls, item, id_, frame=None):
+        if cls._item_cache is None or id_ is None:
+            return cls._marshal_item(item)
+
+        # the output of embedded items that embed other items depends on the items they are embedded in:
+        if get_embed_depth() > 1 and embeds_items(cls):
+            return cls._marshal_item(item)
+
+        key = cls.item_cache_key(id_)
+        marshaled = cls._item_cache.get(key)
+
+        if marshaled is None:
+            marshaled = cls._marshal_item(item)
+
+            # items read from a replica may be out of date:
+            router = getattr(cls.api, 'session_router', None)
+
+            # changes made within an atomic batch are not committed yet; items with references that fell back to a
+            # URI to break a cycle depend on the items they are embedded in:
+            if not in_atomic_batch() and (router is None or not router.reads_from_replica(cls)) \
+                    and (frame is None or not frame.uses_ancestors):
+                cls._item_cache.set(key, marshaled)
+        return marshaled
+
+    @classmethod
+    def _marshal_item(cls, item):
         marshaled = {'_uri': cls.item_get_uri(item)}
-        marshaled.update(marshal(item, cls._fields))
+        counter = get_query_counter()
+
+        if counter is None:
+            marshaled.update(marshal(item, cls._fields))
+            return marshaled
+
+        counter.count_item(cls)
+
+        for key, field in six.iteritems(cls._fields):
+            with counter.marshalling(cls, key):
+                marshaled[key] = field.output(key, item)
         return marshaled
 
     @classmethod
@@ -364,9 +516,187 @@ class Resource(six.with_metaclass(ResourceMeta, RestfulResource)):
         """
         Marshals a list of items from the resource.
 
+        When references are side-loaded using the ``embed`` query argument, returns an object with the marshalled
+        items in ``_items`` and the referenced items in ``_included``.
+
         .. seealso:: :meth:`marshal_item`
         """
-        return list(cls.marshal_item(item) for item in items)
+        items = list(items)
+        embedded = cls._load_embedded(items)
+        marshaled = cls._marshal_item_list(items)
+
+        if embedded is None:
+            return marshaled
+
+        marshaled, included = cls._marshal_included(embedded, marshaled)
+        return {'_items': marshaled, '_included': included}
+
+    @classmethod
+    def _marshal_item_list(cls, items):
+        with timed('marshal', cls):
+            marshaled = list(cls.marshal_item(item) for item in items)
+
+        count_response_items(len(marshaled))
+        return marshaled
+
+    @classmethod
+    def get_collection_slice(cls, item, attribute, limit):
+        """
+        Returns up to ``limit`` items of the collection ``attribute`` of ``item``, and whether the collection has more
+        items. Used by fields with a :class:`fields.CollectionLimit`. Dictionaries are sliced by sorted key.
+
+        :returns: a ``(collection, truncated)`` tuple
+        """
+        value = get_value(attribute, item)
+
+        if value is None:
+            return None, False
+
+        if isinstance(value, dict):
+            keys = sorted(value)
+            return dict((key, value[key]) for key in keys[:limit]), len(keys) > limit
+
+        items = list(itertools.islice(value, limit + 1))
+        return items[:limit], len(items) > limit
+
+    @classmethod
+    def get_relationship_uri(cls, item, attribute):
+        """
+        Returns the URI of the :class:`Relationship` route for ``attribute`` of ``item``, or ``None`` if the resource
+        does not have such a route.
+        """
+        for route in cls.routes.values():
+            if isinstance(route, Relationship) and route.attribute == attribute:
+                return '{}/{}'.format(cls.item_get_uri(item), route.attribute)
+        return None
+
+    @classmethod
+    def _get_embed_reference(cls, name):
+        # returns the target resource, the attribute, and the kind of reference: 'one', 'many' or 'relationship'
+        field = cls._fields.get(name)
+
+        if isinstance(field, ToOne):
+            return field.resource, field.attribute or name, 'one'
+        if isinstance(field, ToMany):
+            return field.container.resource, field.attribute or name, 'many'
+
+        route = cls.routes.get(name)
+
+        if isinstance(route, Relationship):
+            return route.resource, route.attribute, 'relationship'
+
+        abort(400, message='Cannot embed "{}": not a ToOne, ToMany or Relationship'.format(name))
+
+    @classmethod
+    def get_embedded_items(cls, items, name):
+        """
+        Returns a list with the list of items referenced through the field or :class:`Relationship` ``name`` for each
+        of ``items``. Used for side-loading references requested with the ``embed`` query argument.
+
+        Items referenced through a :class:`Relationship` are capped at ``PRESST_MAX_PER_PAGE`` for each item, like a
+        page of the relationship route.
+
+        The default implementation reads the references one item at a time. It should be overridden to load them
+        for all items at once.
+        """
+        _, attribute, kind = cls._get_embed_reference(name)
+
+        if kind == 'relationship':
+            limit = current_app.config.get('PRESST_MAX_PER_PAGE', 100)
+            return [list(itertools.islice(cls.get_relationship(item, attribute), limit)) for item in items]
+
+        values = [get_value(attribute, item) for item in items]
+
+        if kind == 'one':
+            return [[value] if value is not None else [] for value in values]
+        return [list(value or ()) for value in values]
+
+    @classmethod
+    def _load_embedded(cls, items):
+        """
+        Loads the references named in the comma-separated ``embed`` query argument, before the items themselves are
+        marshalled so that references loaded in bulk do not have to be loaded again.
+
+        :returns: a list of ``(name, resource, kind, embedded_items)`` tuples, or ``None`` if nothing is embedded
+        """
+        names = [name.strip() for name in request.args.get('embed', '').split(',') if name.strip()]
+
+        if not names:
+            return None
+
+        embedded = []
+
+        for name in names:
+            resource, _, kind = cls._get_embed_reference(name)
+
+            with timed('query', resource):
+                embedded.append((name, resource, kind, cls.get_embedded_items(items, name)))
+        return embedded
+
+    @classmethod
+    def _marshal_included(cls, embedded, marshaled):
+        """
+        Marshals each distinct embedded item once into a dictionary keyed by ``_uri``. Items embedded through a
+        :class:`Relationship` are linked from the marshalled items with a list of URIs.
+
+        :returns: a tuple of the updated marshalled items and the included items
+        """
+        included = {}
+
+        # marshalled items may be shared with the item cache, so any links are added to a copy:
+        marshaled = [dict(item) for item in marshaled]
+
+        for name, resource, kind, embedded_items in embedded:
+            with timed('marshal', resource):
+                for item, children in zip(marshaled, embedded_items):
+                    uris = []
+
+                    for child in children:
+                        uri = resource.item_get_uri(child)
+
+                        if uri not in included:
+                            included[uri] = resource.marshal_item(child)
+                        uris.append(uri)
+
+                    if kind == 'relationship':
+                        item[name] = uris
+        return marshaled, included
+
+
+def _get_bind_key(mapper):
+    return mapper.local_table.info.get('bind_key')
+
+
+def _is_unfiltered(query):
+    # a query with neither filters nor joins selects every item of its model:
+    return query.whereclause is None and not query._from_obj
+
+
+def _get_row_columns(resource, mapper):
+    """
+    Returns the columns to select for marshalling items of ``resource`` from rows instead of model instances, or
+    ``None`` if any of its fields is not a plain column.
+    """
+    if mapper.inherits is not None or mapper.polymorphic_on is not None \
+            or resource._marshal_item.__func__ is not Resource._marshal_item.__func__ \
+            or resource.item_get_id.__func__ is not Resource.item_get_id.__func__:
+        return None
+
+    attributes = [resource._id_field]
+
+    for name, field in six.iteritems(resource._fields):
+        attributes.append(field.attribute or name)
+
+        if isinstance(field, EmbeddedBase):
+            return None
+
+    columns = OrderedDict()
+
+    for attribute in attributes:
+        if attribute not in mapper.column_attrs:
+            return None
+        columns[attribute] = getattr(mapper.class_, attribute).label(attribute)
+    return list(columns.values())
 
 
 class ModelResourceMeta(ResourceMeta):
@@ -389,8 +719,17 @@ class ModelResourceMeta(ResourceMeta):
 
             if 'id_field' in meta:
                 class_._model_id_column = getattr(model, meta['id_field'])
+                class_._model_id_is_primary_key = False
             else:
                 class_._model_id_column = mapper.primary_key[0]
+                class_._model_id_is_primary_key = True
+
+            # the session routes statements by the bind key of each table, which is set by __bind_key__ on the model:
+            class_._bind_key = _get_bind_key(mapper)
+
+            # compiled statements of frequent lookups, see get_item_for_id() and get_relationship():
+            class_._bakery = baked.bakery()
+            class_._relationship_criteria = {}
 
             class_._field_types = field_types = {}
 
@@ -439,6 +778,7 @@ class ModelResourceMeta(ResourceMeta):
                             required_fields.append(name)
 
             class_._filter = Filter(model, fields, meta.get('allowed_filters', '*'))
+            class_._row_columns = _get_row_columns(class_, mapper)
 
         return class_
 
@@ -474,7 +814,12 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
     """
     _model = None
     _model_id_column = None
+    _model_id_is_primary_key = False
     _filter = None
+    _bind_key = None
+    _row_columns = None
+    _bakery = None
+    _relationship_criteria = None
 
     @staticmethod
     def _get_field_from_python_type(python_type):
@@ -491,8 +836,28 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
         }[python_type]
 
     @classmethod
-    def _get_session(cls):
-        return get_state(current_app).db.session
+    def _get_session(cls, write=False):
+        api = getattr(current_app, 'presst', None)
+
+        if api is None or api.session_router is None:
+            return get_state(current_app).db.session
+        return api.session_router.get_session(cls, write)
+
+    @classmethod
+    def _load_rows(cls):
+        """
+        Returns ``True`` if item lists should be loaded as rows of the columns of the resource's fields, which is
+        the case in read-only sessions for resources with only plain column fields.
+        """
+        if cls._row_columns is None or 'embed' in request.args:
+            return False
+
+        api = getattr(current_app, 'presst', None)
+        return api is not None and api.session_router is not None and api.session_router.is_read_only()
+
+    @classmethod
+    def _get_query(cls, model):
+        return model.query_class(model, session=get_real_session(cls._get_session()))
 
     @classmethod
     def get_model(cls):
@@ -500,81 +865,314 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
 
     @classmethod
     def begin(cls):
-        cls._get_session()
+        cls._get_session(write=True)
 
     @classmethod
     def commit(cls):
+        """
+        Commits the session. With the ``PRESST_EXPIRE_ON_COMMIT`` configuration variable set to ``False``, items are
+        not expired by the commit, so that created and updated items can be marshalled without being loaded again.
+        """
         # TODO handle errors
-        cls._get_session().commit()
+        with timed('write', cls):
+            session = cls._get_session(write=True)
+
+            # changes made within an atomic batch are committed by the batch once all of its requests have succeeded:
+            if in_atomic_batch():
+                session.flush()
+            elif current_app.config.get('PRESST_EXPIRE_ON_COMMIT', True):
+                session.commit()
+            else:
+                cls._commit_without_expiry(get_real_session(session))
+
+        clear_marshal_memo()
+
+        api = getattr(current_app, 'presst', None)
+
+        if api is not None and api.session_router is not None:
+            api.session_router.record_write(cls)
+
+    @classmethod
+    def _commit_without_expiry(cls, session):
+        changed = list(session.new) + list(session.dirty)
+        session.flush()
+
+        # values generated by the database, e.g. server defaults, are expired by the flush unless the mapper has
+        # eager_defaults=True, in which case they are fetched along with the INSERT or UPDATE, using RETURNING if
+        # available:
+        for item in changed:
+            state = inspect(item)
+            expired = [key for key in state.expired_attributes if key in state.mapper.column_attrs]
+
+            if expired and state.persistent:
+                session.refresh(item, expired)
+
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
+
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = expire_on_commit
 
     @classmethod
     def rollback(cls):
-        cls._get_session().rollback()
+        cls._get_session(write=True).rollback()
 
     @classmethod
     def get_item_list(cls):
-        """
-        Pagination is only supported for resources accessed through :class:`Relationship` if
-        the relationship to the parent is `lazy='dynamic'`.
-        """
-        query = cls._model.query
-
-        if isinstance(query, list):
-            abort(500, message='Nesting not supported for this resource.')
-
-        return query
+        return cls._get_query(cls._model)
 
     @classmethod
     def get_relationship(cls, item, relationship):
-        query = getattr(item, relationship)
+        """
+        Returns a query for the items in a relationship, built from the relationship's mapper property so that
+        relationships of any ``lazy`` type can be paginated, filtered and sorted without loading the collection. The
+        items are ordered by the relationship's ``order_by``, or else by primary key.
 
-        if isinstance(query, list):
+        One-to-many and many-to-many relationships that are not self-referential return a
+        :class:`BakedRelationshipQuery`, which pages through the items using statements that are compiled only once.
+        """
+        try:
+            prop = class_mapper(item.__class__).get_property(relationship)
+        except InvalidRequestError:
             abort(500, message='Nesting not supported for this resource.')
 
-        # FIXME build dynamic query with backref
+        if not isinstance(prop, RelationshipProperty) or not prop.uselist:
+            abort(500, message='Nesting not supported for this resource.')
+
+        if cls._bakery is not None:
+            try:
+                criterion = cls._relationship_criteria[prop]
+            except KeyError:
+                criterion = cls._relationship_criteria[prop] = make_relationship_criterion(prop)
+
+            if criterion is not None:
+                return BakedRelationshipQuery(cls._bakery, get_real_session(cls._get_session()), item, prop, *criterion)
 
-        return query
+        query = cls._get_query(prop.mapper.class_).with_parent(item, relationship)
+        return query.order_by(*get_relationship_order_by(prop))
 
     @classmethod
+    @timed_method('write')
     def add_to_relationship(cls, item, relationship, child):
-
-        before_add_relationship.send(cls,
-                                     item=item,
-                                     relationship=relationship,
-                                     child=child)
+        if before_add_relationship.has_receivers_for(cls):
+            before_add_relationship.send(cls,
+                                         item=item,
+                                         relationship=relationship,
+                                         child=child)
 
         getattr(item, relationship).append(child)
+        invalidate_relationship(cls, item, relationship, [child])
 
-        after_add_relationship.send(cls,
-                                    item=item,
-                                    relationship=relationship,
-                                    child=child)
+        if after_add_relationship.has_receivers_for(cls):
+            after_add_relationship.send(cls,
+                                        item=item,
+                                        relationship=relationship,
+                                        child=child)
 
         return child
 
     @classmethod
+    @timed_method('write')
     def remove_from_relationship(cls, item, relationship, child):
-
-        before_remove_relationship.send(cls,
-                                        item=item,
-                                        relationship=relationship,
-                                        child=child)
+        if before_remove_relationship.has_receivers_for(cls):
+            before_remove_relationship.send(cls,
+                                            item=item,
+                                            relationship=relationship,
+                                            child=child)
 
         getattr(item, relationship).remove(child)
+        invalidate_relationship(cls, item, relationship, [child])
+
+        if after_remove_relationship.has_receivers_for(cls):
+            after_remove_relationship.send(cls,
+                                           item=item,
+                                           relationship=relationship,
+                                           child=child)
+
+    @classmethod
+    def _get_association(cls, item, relationship):
+        """
+        Returns the relationship property and the parent and child foreign key columns of its association table, or
+        ``None`` if the relationship does not have a plain association table.
+        """
+        prop = class_mapper(item.__class__).get_property(relationship)
+
+        if not isinstance(prop, RelationshipProperty) or prop.secondary is None or prop.viewonly \
+                or len(prop.synchronize_pairs) != 1 or len(prop.secondary_synchronize_pairs) != 1:
+            return None
+
+        (_, parent_fk), = prop.synchronize_pairs
+        (_, child_fk), = prop.secondary_synchronize_pairs
+        return prop, parent_fk, child_fk
+
+    @classmethod
+    def _get_association_ids(cls, prop, item, children):
+        (parent_column, _), = prop.synchronize_pairs
+        (child_column, _), = prop.secondary_synchronize_pairs
+
+        # children may be pending; their primary keys are needed for the association rows:
+        cls._get_session(write=True).flush()
+
+        parent_id = getattr(item, prop.parent.get_property_by_column(parent_column).key)
+        child_key = prop.mapper.get_property_by_column(child_column).key
+        child_ids = []
+
+        for child in children:
+            child_id = getattr(child, child_key)
+            if child_id not in child_ids:
+                child_ids.append(child_id)
+        return parent_id, child_ids
+
+    @classmethod
+    def _expire_association(cls, prop, item, children):
+        # the association table was changed directly, so any loaded collections are now out of date:
+        session = cls._get_session(write=True)
+        session.expire(item, [prop.key])
+
+        for reverse_prop in prop._reverse_property:
+            for child in children:
+                session.expire(child, [reverse_prop.key])
+
+    @classmethod
+    def get_collection_slice(cls, item, attribute, limit):
+        """
+        Truncates relationships in SQL, using the query from :meth:`get_relationship` with a ``LIMIT``, unless the
+        collection has already been loaded.
+        """
+        mapper = class_mapper(cls._model)
+        prop = mapper.get_property(attribute) if mapper.has_property(attribute) else None
+        state = inspect(item)
+
+        if not isinstance(prop, RelationshipProperty) or not prop.uselist or state.key is None \
+                or (attribute in state.dict and prop.lazy != 'dynamic'):
+            return super(ModelResource, cls).get_collection_slice(item, attribute, limit)
+
+        query = cls.get_relationship(item, attribute)
+
+        with timed('query', cls):
+            children = list(query[:limit + 1]) if isinstance(query, list) else query.limit(limit + 1).all()
+
+        truncated = len(children) > limit
+        children = children[:limit]
+
+        if prop.collection_class is not None:
+            collection = prop.collection_class()
 
-        after_remove_relationship.send(cls,
-                                       item=item,
-                                       relationship=relationship,
-                                       child=child)
+            if isinstance(collection, dict):
+                # e.g. attribute_mapped_collection(); set() adds a child under the key of the collection
+                for child in children:
+                    collection.set(child)
+                return dict(collection), truncated
+
+        return children, truncated
+
+    @classmethod
+    def _bulk_relationship_supported(cls, item, relationship, method_name):
+        # overridden per-item methods would be bypassed by the set-based implementation:
+        if getattr(cls, method_name).__func__ is not getattr(ModelResource, method_name).__func__:
+            return None
+        return cls._get_association(item, relationship)
+
+    @classmethod
+    def add_items_to_relationship(cls, item, relationship, children):
+        """
+        For many-to-many relationships, adds all children with a single multi-row ``INSERT`` into the association
+        table, skipping children that are already in the relationship.
+        """
+        association = cls._bulk_relationship_supported(item, relationship, 'add_to_relationship')
+
+        if association is None or not children:
+            return super(ModelResource, cls).add_items_to_relationship(item, relationship, children)
+
+        prop, parent_fk, child_fk = association
+
+        with timed('write', cls):
+            if before_add_relationship.has_receivers_for(cls):
+                for child in children:
+                    before_add_relationship.send(cls, item=item, relationship=relationship, child=child)
+
+            session = cls._get_session(write=True)
+            parent_id, child_ids = cls._get_association_ids(prop, item, children)
+
+            existing = set(row[0] for row in session.execute(
+                select([child_fk]).where(and_(parent_fk == parent_id, child_fk.in_(child_ids))), mapper=prop.parent))
+
+            rows = [{parent_fk.key: parent_id, child_fk.key: child_id}
+                    for child_id in child_ids if child_id not in existing]
+
+            if rows:
+                session.execute(prop.secondary.insert().values(rows), mapper=prop.parent)
+
+            cls._expire_association(prop, item, children)
+            invalidate_relationship(cls, item, relationship, children)
+
+            if after_add_relationship.has_receivers_for(cls):
+                for child in children:
+                    after_add_relationship.send(cls, item=item, relationship=relationship, child=child)
+
+            return list(children)
+
+    @classmethod
+    def remove_items_from_relationship(cls, item, relationship, children):
+        """
+        For many-to-many relationships, removes all children with a single ``DELETE`` from the association table.
+        """
+        association = cls._bulk_relationship_supported(item, relationship, 'remove_from_relationship')
+
+        if association is None or not children:
+            return super(ModelResource, cls).remove_items_from_relationship(item, relationship, children)
+
+        prop, parent_fk, child_fk = association
+
+        with timed('write', cls):
+            if before_remove_relationship.has_receivers_for(cls):
+                for child in children:
+                    before_remove_relationship.send(cls, item=item, relationship=relationship, child=child)
+
+            session = cls._get_session(write=True)
+            parent_id, child_ids = cls._get_association_ids(prop, item, children)
+
+            session.execute(prop.secondary.delete().where(and_(parent_fk == parent_id, child_fk.in_(child_ids))),
+                            mapper=prop.parent)
+
+            cls._expire_association(prop, item, children)
+            invalidate_relationship(cls, item, relationship, children)
+
+            if after_remove_relationship.has_receivers_for(cls):
+                for child in children:
+                    after_remove_relationship.send(cls, item=item, relationship=relationship, child=child)
 
     @classmethod
+    @timed_method('query')
     def get_item_for_id(cls, id_):
+        """
+        When :meth:`get_item_list` has not been overridden, the item is looked up using a baked query, which is
+        compiled once per resource. If ``id_field`` is the primary key, items that are already in the session's
+        identity map are returned without emitting a query.
+        """
+        if cls.get_item_list.__func__ is ModelResource.get_item_list.__func__:
+            session = get_real_session(cls._get_session())
+            bq = cls._bakery(lambda s: s.query(cls._model))
+
+            if cls._model_id_is_primary_key:
+                item = bq(session).get(id_)
+            else:
+                bq += lambda q: q.filter(cls._model_id_column == bindparam('id'))
+                item = bq(session).params(id=id_).one_or_none()
+
+            if item is None:
+                abort(404)
+            return item
+
         try:  # SQLAlchemy's .get() does not work well with .filter()
             return cls.get_item_list().filter(cls._model_id_column == id_).one()
         except NoResultFound:
             abort(404)
 
     @classmethod
+    @timed_method('write')
     def create_item(cls, properties, commit=True):
         # noinspection PyCallingNonCallable
         item = cls._model()
@@ -582,49 +1180,59 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
         for key, value in six.iteritems(properties):
             setattr(item, key, value)
 
-        before_create_item.send(cls, item=item)
+        if before_create_item.has_receivers_for(cls):
+            before_create_item.send(cls, item=item)
 
-        session = cls._get_session()
+        session = cls._get_session(write=True)
 
         try:
             session.add(item)
             if commit:
-                session.commit()
+                cls.commit()
         except:
-            session.rollback()
+            cls.rollback()
             raise
 
-        after_create_item.send(cls, item=item)
+        invalidate_created(cls)
+
+        if after_create_item.has_receivers_for(cls):
+            after_create_item.send(cls, item=item)
         return item
 
     @classmethod
+    @timed_method('write')
     def update_item(cls, item, changes, partial=False, commit=True):
-        session = cls._get_session()
-
         try:
-            before_update_item.send(cls, item=item, changes=changes, partial=partial)
+            if before_update_item.has_receivers_for(cls):
+                before_update_item.send(cls, item=item, changes=changes, partial=partial)
 
             for key, value in six.iteritems(changes):
                 setattr(item, key, value)
 
             if commit:
-                session.commit()
+                cls.commit()
         except:
-            session.rollback()
+            cls.rollback()
             raise
 
-        after_update_item.send(cls, item=item, changes=changes, partial=partial)
+        invalidate_item(cls, item)
+
+        if after_update_item.has_receivers_for(cls):
+            after_update_item.send(cls, item=item, changes=changes, partial=partial)
         return item
 
     @classmethod
+    @timed_method('write')
     def delete_item(cls, item):
-        before_delete_item.send(cls, item=item)
+        if before_delete_item.has_receivers_for(cls):
+            before_delete_item.send(cls, item=item)
 
-        session = cls._get_session()
-        session.delete(item)
-        session.commit()
+        cls._get_session(write=True).delete(item)
+        cls.commit()
+        invalidate_item(cls, item)
 
-        after_delete_item.send(cls, item=item)
+        if after_delete_item.has_receivers_for(cls):
+            after_delete_item.send(cls, item=item)
 
     @classmethod
     def _parse_request_pagination(cls):
@@ -643,18 +1251,243 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
 
         return page, per_page
 
+    @classmethod
+    def _get_count_columns(cls):
+        """
+        Returns a list of ``(name, column)`` tuples with a correlated subquery counting the items of each
+        ``Relationship(count=True)`` of the resource.
+        """
+        columns = []
+
+        for name, route in sorted(cls.routes.items()):
+            if not getattr(route, 'count', False):
+                continue
+
+            prop = class_mapper(cls._model).get_property(route.attribute)
+
+            # the target is aliased so that self-referential relationships are not correlated to the outer query:
+            join = orm_join(cls._model, aliased(prop.mapper.class_), getattr(cls._model, prop.key))
+
+            if prop.secondary is not None:
+                criterion = and_(join.left.onclause, join.onclause)
+            else:
+                criterion = join.onclause
+
+            name = '{}_count'.format(name)
+            columns.append((name, select([func.count()]).where(criterion).as_scalar().label(name)))
+        return columns
+
+    @classmethod
+    def _select_counts(cls, items, count_columns):
+        # counts for a list of items that were not loaded through a query, e.g. items that have just been created:
+        if not items:
+            return []
+
+        id_column = class_mapper(cls._model).primary_key[0]
+        id_key = class_mapper(cls._model).get_property_by_column(id_column).key
+        ids = [getattr(item, id_key) for item in items]
+
+        with timed('query', cls):
+            counts = dict((row[0], row[1:]) for row in cls._get_session()
+                          .query(id_column, *(column for _, column in count_columns))
+                          .filter(id_column.in_(ids)))
+
+        return [(item,) + tuple(counts.get(id_, (0,) * len(count_columns))) for item, id_ in zip(items, ids)]
+
+    @classmethod
+    def _marshal_rows(cls, rows, count_names):
+        items = [row[0] for row in rows] if count_names else list(rows)
+        embedded = cls._load_embedded(items)
+        cls._prefetch_references(items)
+        marshaled = cls._marshal_item_list(items)
+
+        if count_names:
+            # marshalled items may be shared with the item cache, so the counts are added to a copy:
+            marshaled = [dict(item, **dict(zip(count_names, row[1:]))) for item, row in zip(marshaled, rows)]
+
+        if embedded is None:
+            return marshaled
+
+        marshaled, included = cls._marshal_included(embedded, marshaled)
+        return {'_items': marshaled, '_included': included}
+
+    @classmethod
+    def _select_related_by_key(cls, items, prop, target_query):
+        """
+        Loads the items of a relationship for all of ``items`` without a join, by selecting them with an ``IN`` clause
+        on the column the relationship is defined by. This is used for models in different databases.
+
+        :returns: a list of related items for each of ``items``, or ``None`` if the relationship is not supported
+        """
+        if prop.secondary is not None or len(prop.local_remote_pairs) != 1:
+            return None
+
+        (local_column, remote_column), = prop.local_remote_pairs
+
+        try:
+            local_key = prop.parent.get_property_by_column(local_column).key
+            remote_key = prop.mapper.get_property_by_column(remote_column).key
+        except UnmappedColumnError:
+            return None
+
+        keys = [getattr(item, local_key) for item in items]
+        related = dict((key, []) for key in keys if key is not None)
+
+        if related:
+            query = target_query.filter(remote_column.in_(related.keys()))
+
+            if prop.order_by:
+                query = query.order_by(*prop.order_by)
+
+            for child in query:
+                related[getattr(child, remote_key)].append(child)
+
+        return [related.get(key, []) for key in keys]
+
+    @classmethod
+    def _prefetch_references(cls, items):
+        """
+        Loads the items of :class:`ToOne` fields that reference models in a different database with one query per
+        field, rather than one query per item.
+        """
+        mapper = class_mapper(cls._model)
+        bind_key = _get_bind_key(mapper)
+
+        for name, field in six.iteritems(cls._fields):
+            attribute = field.attribute or name
+
+            if not isinstance(field, ToOne) or not mapper.has_property(attribute):
+                continue
+
+            prop = mapper.get_property(attribute)
+
+            if not isinstance(prop, RelationshipProperty) or prop.uselist or _get_bind_key(prop.mapper) == bind_key:
+                continue
+
+            pending = [item for item in items if attribute not in inspect(item).dict]
+
+            if not pending or not issubclass(field.resource, ModelResource):
+                continue
+
+            target_query = field.resource.get_item_list()
+
+            # loaded items are set as the value of the relationship, which must not depend on the target's filters:
+            if not isinstance(target_query, BaseQuery) or not _is_unfiltered(target_query):
+                continue
+
+            with timed('query', cls):
+                related = cls._select_related_by_key(pending, prop, target_query)
+
+            if related is not None:
+                for item, children in zip(pending, related):
+                    set_committed_value(item, attribute, next(iter(children), None))
+
+    @classmethod
+    def get_embedded_items(cls, items, name):
+        """
+        Loads the items referenced through a relationship for all of ``items`` with a single query that joins the
+        relationship and selects the items with an ``IN`` clause. Items of models in a different database are
+        selected by key instead. The query is built from the target resource's :meth:`get_item_list`, so its joins and
+        filters apply. When there are no such joins or filters, and no items were left out, the loaded items are also
+        set as the value of the relationship, so that they are not loaded again when the items are marshalled.
+        """
+        resource, attribute, kind = cls._get_embed_reference(name)
+        mapper = class_mapper(cls._model)
+        prop = mapper.get_property(attribute) if mapper.has_property(attribute) else None
+
+        if not items or not isinstance(prop, RelationshipProperty) or prop.mapper is mapper \
+                or not issubclass(resource, ModelResource):
+            return super(ModelResource, cls).get_embedded_items(items, name)
+
+        target_query = resource.get_item_list()
+
+        if not isinstance(target_query, BaseQuery):
+            return [[] for _ in items]
+
+        if _get_bind_key(prop.mapper) != _get_bind_key(mapper):
+            # the models are in different databases and cannot be joined:
+            embedded = cls._select_related_by_key(items, prop, target_query)
+
+            if embedded is None:
+                return super(ModelResource, cls).get_embedded_items(items, name)
+        else:
+            id_key = mapper.get_property_by_column(mapper.primary_key[0]).key
+            ids = [getattr(item, id_key) for item in items]
+
+            # the parent is joined to the target resource's query, keeping any joins and filters of that query:
+            parent = aliased(cls._model)
+            parent_id = getattr(parent, id_key)
+            join = orm_join(parent, prop.mapper.class_, getattr(parent, attribute))
+
+            if prop.secondary is not None:
+                # join.left joins the parent to an alias of the association table:
+                query = target_query.join(join.left.right, join.onclause).join(parent, join.left.onclause)
+            else:
+                query = target_query.join(parent, join.onclause)
+
+            query = query\
+                .add_columns(parent_id)\
+                .filter(parent_id.in_(set(ids)))\
+                .order_by(*get_relationship_order_by(prop))
+
+            children_by_id = dict((id_, []) for id_ in ids)
+
+            for row in query:
+                children_by_id[row[-1]].append(row[0])
+
+            embedded = [children_by_id[id_] for id_ in ids]
+
+        if kind == 'relationship':
+            limit = current_app.config.get('PRESST_MAX_PER_PAGE', 100)
+            truncated = any(len(children) > limit for children in embedded)
+            embedded = [children[:limit] for children in embedded]
+        else:
+            truncated = False
+
+        if not truncated and _is_unfiltered(target_query) and prop.lazy != 'dynamic':
+            for item, children in zip(items, embedded):
+                set_committed_value(item, attribute, children if prop.uselist else next(iter(children), None))
+
+        return embedded
+
     @classmethod
     def marshal_item_list(cls, item_list, paginate=True):
         """
         Like :meth:`PrestoResource.marshal_item_list()` except that :attr:`object_list`
         can be a :class:`Pagination` object, in which case a paginated result will be returned.
+
+        When :attr:`object_list` is a query, the counts of any ``Relationship(count=True)`` are selected along with the
+        items in the same query. In read-only sessions, resources with only plain column fields select just these
+        columns and marshal the rows without loading model instances.
         """
-        if isinstance(item_list, BaseQuery):
-            if paginate:
-                page, per_page = cls._parse_request_pagination()
-                item_list = item_list.paginate(page=page, per_page=per_page)
+        count_columns = cls._get_count_columns()
+        count_names = [name for name, _ in count_columns]
+
+        if isinstance(item_list, (BaseQuery, BakedRelationshipQuery)):
+            as_rows = not count_columns and cls._load_rows()
+
+            if count_columns:
+                item_list = item_list.add_columns(*(column for _, column in count_columns))
+            elif as_rows:
+                item_list = item_list.with_entities(*cls._row_columns)
+
+            with timed('query', cls):
+                if paginate:
+                    page, per_page = cls._parse_request_pagination()
+                    item_list = item_list.paginate(page=page, per_page=per_page)
+                else:
+                    item_list = item_list.all()
+
+            # rows are marshalled as dictionaries, since marshal() would treat them as lists:
+            if as_rows and isinstance(item_list, Pagination):
+                item_list.items = [row._asdict() for row in item_list.items]
+            elif as_rows:
+                item_list = [row._asdict() for row in item_list]
+        elif count_columns:
+            if isinstance(item_list, Pagination):
+                item_list.items = cls._select_counts(item_list.items, count_columns)
             else:
-                item_list = item_list.all()
+                item_list = cls._select_counts(list(item_list), count_columns)
 
         if isinstance(item_list, Pagination):
             links = [(request.path, item_list.page, item_list.per_page, 'self')]
@@ -667,7 +1500,8 @@ class ModelResource(six.with_metaclass(ModelResourceMeta, Resource)):
                 links.append((request.path, item_list.page + 1, item_list.per_page, 'next'))
 
             headers = {'Link': ','.join((LINK_HEADER_FORMAT_STR.format(*link) for link in links))}
-            return super(ModelResource, cls).marshal_item_list(item_list.items), 200, headers
+
+            return cls._marshal_rows(item_list.items, count_names), 200, headers
 
         # fallback:
-        return super(ModelResource, cls).marshal_item_list(item_list)
+        return cls._marshal_rows(item_list, count_names)
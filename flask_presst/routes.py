@@ -9,8 +9,11 @@ from flask.views import View, MethodView
 from werkzeug.utils import cached_property
 
 from flask_presst.fields import Raw
+from flask_presst.jobs import get_current_job
 from flask_presst.references import ResourceRef, ItemWrapper, ItemListWrapper, EmbeddedJob
 from flask_presst.parse import SchemaParser
+from flask_presst.timing import timed
+from flask_presst.utils.marshal import clear_marshal_memo
 
 
 def url_rule_to_uri_pattern(rule):
@@ -42,11 +45,12 @@ class ResourceRoute(object):
 
 
 class SchemaView(object):
-    def __init__(self, fn, properties=None, response_property=None):
+    def __init__(self, fn, properties=None, response_property=None, async_=False):
         annotations = getattr(fn, '__annotations__', {})
         self._response_property = annotations.get('return', response_property)
         self._schema_parser = schema = SchemaParser(properties or {})
         self._fn = fn
+        self._async = async_
 
         for name, field in annotations.items():
             if name != 'return':
@@ -90,8 +94,21 @@ class SchemaView(object):
 
     def dispatch_request(self, instance, *args, **kwargs):
         kwargs.update(self._schema_parser.parse_request())
-        response = self._fn(instance, *args, **EmbeddedJob.complete(kwargs))
-        return self._marshal_response(response)
+
+        # the request is validated before it is submitted, then executed again by the job:
+        if self._async and get_current_job() is None:
+            job = instance.api.jobs.submit()
+            return job.marshal(), 202, {'Location': job.uri}
+
+        with timed('action', instance.__class__):
+            response = self._fn(instance, *args, **EmbeddedJob.complete(kwargs))
+
+        # items marshalled earlier in the request may have been changed by the action:
+        if request.method not in ('GET', 'HEAD'):
+            clear_marshal_memo()
+
+        with timed('marshal', instance.__class__):
+            return self._marshal_response(response)
 
 
 class ItemView(SchemaView):
@@ -245,6 +262,7 @@ def route(method='GET', route=None, **view_kwargs):
     :param str attribute:
     :param dict properties:
     :param Raw response_property:
+    :param bool async_: execute requests in the background and respond with `202 Accepted` and a job URI
     """
 
     def wrapper(fn):
@@ -281,6 +299,7 @@ def action(method='POST', collection=False, **kwargs):
     :param bool collection: whether this is a collection method or item method
     :param dict properties: initial dict of fields to feed the parser
     :param Raw response_property: optional field to use as targetSchema and for marshalling the result
+    :param bool async_: execute requests in the background and respond with `202 Accepted` and a job URI
     :returns: :class:`ResourceMultiRoute` or :class:`ResourceItemMultiRoute` instance
     """
     def wrapper(fn):
@@ -297,19 +316,21 @@ class Relationship(ResourceRoute, MethodView):
     :class:`Relationship` views, when attached to a :class:`Resource`, create a route that maps from
     an item in one resource to a collection of items in another resource.
 
-    :class:`Relationship` makes use of SqlAlchemy's `relationship` attributes. To support pagination on these objects,
-    the relationship must return a query object. Therefore, the :func:`sqlalchemy.orm.relationship` must have the
-    attribute :attr:`lazy` set to ``'dynamic'``. The same goes for any :func:`backref()`.
+    :class:`Relationship` makes use of SqlAlchemy's `relationship` attributes. Items are loaded with a query built
+    from the relationship, so they can be paginated, filtered and sorted regardless of its :attr:`lazy` setting.
 
     :param resource: target resource name
     :param str backref: hint needed when there is a required `ToOne` field referencing back from the target resource
     :param str attribute: alternate attribute name in resource item
+    :param bool count: include the number of items in the relationship as a read-only ``{attribute}_count``
+        property in collection responses of the parent resource
     """
 
-    def __init__(self, resource, backref=None, attribute=None, **kwargs):
+    def __init__(self, resource, backref=None, attribute=None, count=False, **kwargs):
         super(Relationship, self).__init__(kwargs.pop('binding', None), attribute)
         self.reference_str = resource
         self.backref = backref
+        self.count = count
 
     @cached_property
     def resource(self):
@@ -1,4 +1,29 @@
+import hashlib
+import json
+
+from flask import request
 from flask.views import View
+from werkzeug.http import quote_etag
+from werkzeug.wrappers import Response
+
+
+def schema_etag(schema):
+    """
+    Returns a strong entity tag for a JSON-schema document.
+    """
+    return hashlib.md5(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def schema_response(schema, etag):
+    """
+    Returns the schema with an ``ETag`` header, or an empty `304 Not Modified` response if the entity tag matches
+    ``If-None-Match``.
+    """
+    headers = {'ETag': quote_etag(etag)}
+
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    return schema, 200, headers
 
 
 class HyperSchema(View):
@@ -14,4 +39,4 @@ class HyperSchema(View):
 
     def dispatch_request(self):
         # TODO enforce Content-Type: application/schema+json (overwritten by Flask-RESTful)
-        return self.api.schema, 200
\ No newline at end of file
+        return schema_response(*self.api.get_cached_schema())
@@ -0,0 +1,178 @@
+import math
+import threading
+import time
+
+from flask import current_app, g, request, has_request_context, _app_ctx_stack
+from flask_sqlalchemy import get_state
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from flask_presst.batch import in_atomic_batch
+
+__all__ = ('SessionRouter', 'ReplicaSessionRouter')
+
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class SessionRouter(object):
+    """
+    Chooses the SQLAlchemy session used by :class:`ModelResource`. The router of an API is set with the
+    ``PRESST_SESSION_ROUTER`` configuration variable.
+
+    The default router returns the session of `Flask-SQLAlchemy`. With ``read_only=True``, or the
+    ``PRESST_READ_ONLY_SESSIONS`` configuration variable for the default router, reads of ``GET`` and ``HEAD``
+    requests use a separate session without autoflush that is closed at the end of the request, and collections whose
+    fields are all plain columns are loaded as rows rather than as model instances.
+
+    :param bool read_only: use read-only sessions for ``GET`` and ``HEAD`` requests
+    """
+
+    def __init__(self, read_only=False):
+        self.read_only = read_only
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.teardown_appcontext(self._remove_sessions)
+
+    def _make_session_factory(self, app, name):
+        db = get_state(app).db
+        return sessionmaker(bind=db.engine, binds=db.get_binds(app), autoflush=False, expire_on_commit=False)
+
+    def _get_scoped_session(self, name):
+        app = current_app._get_current_object()
+
+        try:
+            return self._sessions[(app, name)]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if (app, name) not in self._sessions:
+                factory = self._make_session_factory(app, name)
+                self._sessions[(app, name)] = scoped_session(factory, scopefunc=_app_ctx_stack.__ident_func__)
+            return self._sessions[(app, name)]
+
+    def _remove_sessions(self, exc=None):
+        app = current_app._get_current_object()
+
+        for (session_app, _), session in list(self._sessions.items()):
+            if session_app is app:
+                session.remove()
+
+    def is_read_only(self):
+        """
+        :returns: ``True`` if reads of the current request use a read-only session.
+        """
+        return self.read_only and has_request_context() and request.method in READ_METHODS and not in_atomic_batch()
+
+    def get_session(self, resource, write=False):
+        """
+        :param resource: the :class:`ModelResource` requesting the session
+        :param bool write: ``True`` if the session is used for making or committing changes
+        """
+        if not write and self.is_read_only():
+            return self._get_scoped_session('read_only')
+        return get_state(current_app).db.session
+
+    def record_write(self, resource):
+        """
+        Called after ``resource`` has committed changes.
+        """
+        pass
+
+    def reads_from_replica(self, resource):
+        """
+        :returns: ``True`` if reads of ``resource`` in the current request may return data that is out of date, in
+            which case marshalled items are not written to the item cache.
+        """
+        return False
+
+
+class ReplicaSessionRouter(SessionRouter):
+    """
+    Routes reads of ``GET`` and ``HEAD`` requests to a read-only replica, while other requests, changes and commits use
+    the primary database.
+
+    Reads are routed to the primary for the rest of a request once it has made changes, and within atomic batches. To
+    let clients read their own writes despite replication lag, responses to requests that have made changes set a
+    cookie, and requests from the same client read from the primary for ``sticky_seconds`` afterwards.
+
+    >>> app.config['SQLALCHEMY_BINDS'] = {'replica': 'postgresql://replica.db/app'}
+    >>> app.config['PRESST_SESSION_ROUTER'] = ReplicaSessionRouter('replica', sticky_seconds=5)
+
+    Resources of models on other binds, see ``__bind_key__`` in `Flask-SQLAlchemy`, read from the primary unless
+    ``bind`` is a dictionary that maps their bind key to the key of a replica, e.g.
+    ``{None: 'replica', 'users': 'users_replica'}``.
+
+    Items read from a replica may lag behind the primary, so they are served from the item cache but never written
+    to it.
+
+    :param bind: key of the replica in ``SQLALCHEMY_BINDS``, or a dictionary of bind keys and replica keys
+    :param float sticky_seconds: duration in seconds after a write during which a client reads from the primary
+    :param str cookie_name: name of the cookie with the time of a client's last write
+    """
+
+    def __init__(self, bind='replica', sticky_seconds=5, cookie_name='presst_last_write', read_only=False):
+        super(ReplicaSessionRouter, self).__init__(read_only)
+        self.binds = bind if isinstance(bind, dict) else {None: bind}
+        self.sticky_seconds = sticky_seconds
+        self.cookie_name = cookie_name
+
+    def init_app(self, app):
+        super(ReplicaSessionRouter, self).init_app(app)
+        app.after_request(self._set_cookie)
+
+    def _make_session_factory(self, app, name):
+        if name != 'replica':
+            return super(ReplicaSessionRouter, self)._make_session_factory(app, name)
+
+        db = get_state(app).db
+        binds = {}
+
+        for bind_key, replica_key in self.binds.items():
+            engine = db.get_engine(app, bind=replica_key)
+            binds.update((table, engine) for table in db.get_tables_for_bind(bind_key))
+
+        return sessionmaker(binds=binds, autoflush=False, expire_on_commit=False)
+
+    def _get_last_write(self):
+        last_write = getattr(g, 'presst_last_write', None)
+
+        if last_write is not None:
+            return last_write
+
+        try:
+            return float(request.cookies.get(self.cookie_name, ''))
+        except ValueError:
+            return None
+
+    def use_replica(self):
+        """
+        :returns: ``True`` if reads of the current request should be routed to the replica.
+        """
+        if not has_request_context() or request.method not in READ_METHODS or in_atomic_batch():
+            return False
+
+        last_write = self._get_last_write()
+        return last_write is None or time.time() - last_write >= self.sticky_seconds
+
+    def reads_from_replica(self, resource):
+        return getattr(resource, '_bind_key', None) in self.binds and self.use_replica()
+
+    def get_session(self, resource, write=False):
+        if not write and self.reads_from_replica(resource):
+            return self._get_scoped_session('replica')
+        return super(ReplicaSessionRouter, self).get_session(resource, write)
+
+    def record_write(self, resource):
+        # stored in the application context, which is shared by the sub-requests of a batch:
+        g.presst_last_write = time.time()
+
+    def _set_cookie(self, response):
+        last_write = getattr(g, 'presst_last_write', None)
+
+        if last_write is not None:
+            response.set_cookie(self.cookie_name, '{:.3f}'.format(last_write),
+                                max_age=int(math.ceil(self.sticky_seconds)),
+                                httponly=True)
+        return response
@@ -1,4 +1,15 @@
+import logging
+import threading
+
+from blinker import ANY, NamedSignal
+from flask import current_app
 from flask.signals import Namespace
+from six.moves import queue
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import Session
+
+from flask_presst.batch import queue_batch_signal
 
 __all__ = (
     'before_create_item', 'after_create_item',
@@ -6,26 +17,258 @@ __all__ = (
     'before_delete_item', 'after_delete_item',
     'before_add_relationship', 'after_add_relationship',
     'before_remove_relationship', 'after_remove_relationship',
+    'after_create_items', 'after_add_relationships', 'after_remove_relationships',
+    'phase_timed',
+    'DeferredDispatcher', 'connect_deferred', 'disconnect_deferred',
 )
 
 _signals = Namespace()
 
+
+class _AfterSignal(NamedSignal):
+    """
+    A signal sent after a change, which is held back within atomic batches until the batch has been committed.
+    """
+
+    def send(self, *sender, **kwargs):
+        if queue_batch_signal(self, sender, kwargs):
+            return []
+        return super(_AfterSignal, self).send(*sender, **kwargs)
+
+
+def _after_signal(name):
+    return _signals.setdefault(name, _AfterSignal(name))
+
+
 before_create_item = _signals.signal('before-create-item')
 
-after_create_item = _signals.signal('after-create-item')
+after_create_item = _after_signal('after-create-item')
 
 before_update_item = _signals.signal('before-update-item')
 
-after_update_item = _signals.signal('after-update-item')
+after_update_item = _after_signal('after-update-item')
 
 before_delete_item = _signals.signal('before-delete-item')
 
-after_delete_item = _signals.signal('after-delete-item')
+after_delete_item = _after_signal('after-delete-item')
 
 before_add_relationship = _signals.signal('before-add-relationship')
 
-after_add_relationship = _signals.signal('after-add-relationship')
+after_add_relationship = _after_signal('after-add-relationship')
 
 before_remove_relationship = _signals.signal('before-remove-relationship')
 
-after_remove_relationship = _signals.signal('after-remove-relationship')
\ No newline at end of file
+after_remove_relationship = _after_signal('after-remove-relationship')
+
+after_create_items = _after_signal('after-create-items')
+
+after_add_relationships = _after_signal('after-add-relationships')
+
+after_remove_relationships = _after_signal('after-remove-relationships')
+
+phase_timed = _signals.signal('phase-timed')
+
+log = logging.getLogger(__name__)
+
+
+class DeferredDispatcher(object):
+    """
+    Calls deferred signal receivers on a pool of background threads.
+
+    Payloads are put on a bounded queue. When the queue is full, the sending thread waits for up to ``timeout``
+    seconds for a free slot, then calls the receiver itself, so that producers are slowed down rather than payloads
+    being lost.
+
+    :param int workers: number of worker threads
+    :param int max_queue_size: maximum number of payloads waiting to be dispatched
+    :param float timeout: seconds to wait for a free slot when the queue is full; ``None`` waits indefinitely
+    """
+
+    def __init__(self, workers=1, max_queue_size=1000, timeout=None):
+        self.workers = workers
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name='presst-deferred-signals')
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _call(self, app, receiver, sender, kwargs):
+        with app.app_context():
+            try:
+                receiver(sender, **kwargs)
+            except Exception:
+                log.exception('Deferred signal receiver {!r} failed'.format(receiver))
+
+    def _work(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                self._call(*payload)
+            finally:
+                self._queue.task_done()
+
+    def dispatch(self, receiver, sender, kwargs):
+        """
+        Queues a call of ``receiver(sender, **kwargs)`` within the current application context.
+        """
+        payload = (current_app._get_current_object(), receiver, sender, kwargs)
+
+        if len(self._threads) < self.workers:
+            self._start()
+
+        try:
+            self._queue.put(payload, timeout=self.timeout)
+        except queue.Full:
+            log.warning('Deferred signal queue is full; calling {!r} synchronously'.format(receiver))
+            self._call(*payload)
+
+    def join(self):
+        """
+        Blocks until all queued payloads have been dispatched.
+        """
+        self._queue.join()
+
+
+default_dispatcher = DeferredDispatcher()
+
+_deferred_receivers = {}
+
+_SESSION_PENDING_KEY = 'presst_deferred_signals'
+_SESSION_UNCOMMITTED_KEY = 'presst_uncommitted'
+
+
+def _item_id(resource, item):
+    if item is None:
+        return None
+
+    try:
+        state = inspect(item)
+    except NoInspectionAvailable:
+        return resource.item_get_id(item)
+
+    # the identity key is available without loading expired or deleted instances:
+    if state.identity is not None and getattr(resource, '_model_id_is_primary_key', False):
+        return state.identity[0]
+    return resource.item_get_id(item)
+
+
+def _make_payload(sender, kwargs):
+    payload = {}
+
+    for key, value in kwargs.items():
+        if key == 'item':
+            payload['item_id'] = _item_id(sender, value)
+        elif key == 'items':
+            payload['item_ids'] = [_item_id(sender, item) for item in value]
+        elif key in ('child', 'children'):
+            route = getattr(sender, 'routes', {}).get(kwargs.get('relationship'))
+            child_resource = getattr(route, 'resource', sender)
+
+            if key == 'child':
+                payload['child_id'] = _item_id(child_resource, value)
+            else:
+                payload['child_ids'] = [_item_id(child_resource, child) for child in value]
+        elif key == 'changes':
+            payload['changed'] = sorted(value.keys())
+        else:
+            payload[key] = value
+    return payload
+
+
+def _get_session(sender):
+    get_session = getattr(sender, '_get_session', None)
+
+    if get_session is None:
+        return None
+    return get_session(write=True)
+
+
+def _has_uncommitted_changes(session):
+    return bool(session.info.get(_SESSION_UNCOMMITTED_KEY) or session.new or session.dirty or session.deleted)
+
+
+def _on_after_flush(session, flush_context):
+    session.info[_SESSION_UNCOMMITTED_KEY] = True
+
+    # resolve ids while attributes are loaded; they may be expired by the time the session is committed:
+    for pending in session.info.get(_SESSION_PENDING_KEY, ()):
+        if pending[-1] is None:
+            pending[-1] = _make_payload(pending[2], pending[3])
+
+
+def _on_after_commit(session):
+    session.info.pop(_SESSION_UNCOMMITTED_KEY, None)
+
+    for dispatcher, receiver, sender, kwargs, payload in session.info.pop(_SESSION_PENDING_KEY, ()):
+        dispatcher.dispatch(receiver, sender, payload if payload is not None else _make_payload(sender, kwargs))
+
+
+def _on_after_rollback(session):
+    session.info.pop(_SESSION_UNCOMMITTED_KEY, None)
+    session.info.pop(_SESSION_PENDING_KEY, None)
+
+
+def _listen_session_events():
+    if not event.contains(Session, 'after_commit', _on_after_commit):
+        event.listen(Session, 'after_flush_postexec', _on_after_flush)
+        event.listen(Session, 'after_commit', _on_after_commit)
+        event.listen(Session, 'after_rollback', _on_after_rollback)
+
+
+def connect_deferred(signal, receiver, sender=ANY, dispatcher=None):
+    """
+    Connects ``receiver`` to one of the ``after_*`` signals so that it is called from a background thread once the
+    changes that triggered the signal have been committed. Changes that are rolled back are never dispatched.
+
+    Deferred receivers are called within an application context but outside of the request, so they are passed ids
+    rather than instances: ``item``, ``items``, ``child`` and ``children`` are replaced with ``item_id``,
+    ``item_ids``, ``child_id`` and ``child_ids``, and ``changes`` with ``changed``, a sorted list of the changed keys.
+
+    >>> def index_article(sender, item_id, **kwargs):
+    ...     search.index(item_id)
+    ...
+    >>> connect_deferred(after_update_item, index_article, sender=ArticleResource)
+
+    :param signal: one of the ``after_*`` signals
+    :param sender: only dispatch signals from this resource
+    :param DeferredDispatcher dispatcher: defaults to a dispatcher with a single worker thread
+    """
+    if not signal.name.startswith('after-'):
+        raise ValueError('Only after_* signals can be deferred, not {}'.format(signal.name))
+
+    if (signal, receiver, sender) in _deferred_receivers:
+        return receiver
+
+    dispatcher = dispatcher or default_dispatcher
+    _listen_session_events()
+
+    def deferred_receiver(sender, **kwargs):
+        session = _get_session(sender)
+
+        if session is not None and _has_uncommitted_changes(session):
+            session.info.setdefault(_SESSION_PENDING_KEY, []).append([dispatcher, receiver, sender, kwargs, None])
+        else:
+            dispatcher.dispatch(receiver, sender, _make_payload(sender, kwargs))
+
+    _deferred_receivers[(signal, receiver, sender)] = deferred_receiver
+    signal.connect(deferred_receiver, sender=sender, weak=False)
+    return receiver
+
+
+def disconnect_deferred(signal, receiver, sender=ANY):
+    """
+    Disconnects a receiver connected with :func:`connect_deferred`.
+
+    :param sender: the sender the receiver was connected with
+    """
+    deferred_receiver = _deferred_receivers.pop((signal, receiver, sender), None)
+
+    if deferred_receiver is not None:
+        signal.disconnect(deferred_receiver, sender=sender)
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from functools import wraps
+from timeit import default_timer
+
+from flask import _request_ctx_stack
+
+from flask_presst.signals import phase_timed
+
+
+class RequestTimings(object):
+    """
+    Durations of the phases of a single request, in seconds.
+
+    Phases are exclusive: time spent in a phase that is timed within another phase, e.g. a ``query`` while
+    marshalling, is only added to the inner phase.
+    """
+
+    def __init__(self):
+        self.durations = OrderedDict()
+        self.active = set()
+        self.timers = []
+
+    def add(self, phase, duration):
+        self.durations[phase] = self.durations.get(phase, 0) + duration
+
+    def server_timing_header(self):
+        """
+        :returns: value for a ``Server-Timing`` header with durations in milliseconds.
+        """
+        return ', '.join('{};dur={:.2f}'.format(phase, duration * 1000)
+                         for phase, duration in self.durations.items())
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+class _PhaseTimer(object):
+    __slots__ = ('phase', 'sender', 'timings', 'start', 'duration')
+
+    def __init__(self, phase, sender, timings):
+        self.phase = phase
+        self.sender = sender
+        self.timings = timings
+        self.duration = 0
+
+    def __enter__(self):
+        timers = self.timings.timers
+        self.start = default_timer()
+
+        # pause the enclosing phase:
+        if timers:
+            outer = timers[-1]
+            outer.duration += self.start - outer.start
+
+        timers.append(self)
+        self.timings.active.add(self.phase)
+        return self
+
+    def __exit__(self, *exc_info):
+        end = default_timer()
+        self.duration += end - self.start
+
+        timers = self.timings.timers
+        timers.pop()
+        self.timings.active.discard(self.phase)
+
+        # resume the enclosing phase:
+        if timers:
+            timers[-1].start = end
+
+        self.timings.add(self.phase, self.duration)
+
+        if phase_timed.receivers:
+            phase_timed.send(self.sender, phase=self.phase, duration=self.duration)
+        return False
+
+
+def get_request_timings():
+    """
+    :returns: the :class:`RequestTimings` of the current request, or ``None`` if timing is not enabled.
+    """
+    ctx = _request_ctx_stack.top
+    return getattr(ctx, 'presst_timings', None)
+
+
+def timed(phase, sender=None):
+    """
+    Returns a context manager that adds the time spent within it to ``phase`` of the current request.
+
+    Timing a phase that is already being timed (e.g. when parsing embedded items) has no effect. When timing is not
+    enabled, a no-op context manager is returned.
+
+    :param str phase: name of the phase, e.g. ``'parse'``, ``'query'`` or ``'marshal'``
+    :param sender: sender for the :data:`flask_presst.signals.phase_timed` signal, usually a resource class
+    """
+    timings = get_request_timings()
+
+    if timings is None or phase in timings.active:
+        return _null_timer
+    return _PhaseTimer(phase, sender, timings)
+
+
+def timed_method(phase):
+    """
+    Decorator for class methods of resources that adds the time spent in the method to ``phase`` of the current
+    request, with the resource class as sender.
+
+    :param str phase: name of the phase
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(cls, *args, **kwargs):
+            with timed(phase, cls):
+                return fn(cls, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request_timings():
+    _request_ctx_stack.top.presst_timings = RequestTimings()
+
+
+def add_server_timing_header(response):
+    timings = get_request_timings()
+
+    if timings is not None and timings.durations:
+        response.headers['Server-Timing'] = timings.server_timing_header()
+    return response
@@ -0,0 +1,144 @@
+from flask_restful import abort
+from flask_sqlalchemy import Pagination
+from sqlalchemy import and_, bindparam, func
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.orm.interfaces import MANYTOMANY, ONETOMANY
+from sqlalchemy.sql import visitors
+from sqlalchemy.util import memoized_property
+
+
+def get_real_session(session):
+    """
+    Returns the :class:`sqlalchemy.orm.Session` of ``session`` if it is a :class:`scoped_session`.
+    """
+    return session() if isinstance(session, scoped_session) else session
+
+
+def get_relationship_order_by(prop):
+    """
+    Returns the ``order_by`` of a relationship, or the primary key of its target so that pages of the relationship
+    are deterministic.
+    """
+    return prop.order_by or prop.mapper.primary_key
+
+
+def make_relationship_criterion(prop):
+    """
+    Builds the criterion selecting the children of a one-to-many or many-to-many relationship, with the columns of
+    the parent replaced by bound parameters, so that the criterion can be part of a cached statement.
+
+    :returns: a ``(criterion, params)`` tuple where ``params`` is a list of ``(parameter name, attribute key)``
+        pairs for reading the parameters from the parent, or ``None`` if the relationship is not supported.
+    """
+    if prop.direction not in (ONETOMANY, MANYTOMANY) or prop.mapper.common_parent(prop.parent):
+        return None
+
+    parent_tables = set(prop.parent.tables)
+    replacements = {}
+    params = []
+
+    for i, (parent_column, _) in enumerate(prop.synchronize_pairs):
+        key = 'presst_parent_{}'.format(i)
+        replacements[parent_column] = bindparam(key)
+        params.append((key, prop.parent.get_property_by_column(parent_column).key))
+
+    remaining = []
+
+    def replace(element):
+        if element in replacements:
+            return replacements[element]
+        if getattr(element, 'table', None) in parent_tables:
+            remaining.append(element)
+        return None
+
+    criterion = visitors.replacement_traverse(prop.primaryjoin, {}, replace)
+
+    # e.g. a primaryjoin with a condition on a parent column other than a foreign key:
+    if remaining:
+        return None
+
+    if prop.secondary is not None:
+        criterion = and_(criterion, prop.secondaryjoin)
+    return criterion, params
+
+
+class BakedRelationshipQuery(object):
+    """
+    The items in a relationship, selected with baked queries that are compiled once per resource and relationship.
+
+    Pagination, limits and iteration use the cached statements. Any other query method, such as :meth:`filter` or
+    :meth:`order_by`, is passed on to an ordinary query built with
+    :meth:`sqlalchemy.orm.query.Query.with_parent`, so the object can be used wherever a query is expected.
+    """
+
+    def __init__(self, bakery, session, item, prop, criterion, params, limit=None):
+        self.session = session
+        self.item = item
+        self.prop = prop
+        self._bakery = bakery
+        self._criterion = criterion
+        self._params = params
+        self._limit = limit
+
+        target, order_by = prop.mapper, get_relationship_order_by(prop)
+
+        # the statements are cached by the code of each step and the arguments of the first:
+        self._baked = bq = bakery(lambda session: session.query(target), item.__class__, prop.key)
+        bq += lambda q: q.filter(criterion).order_by(*order_by)
+
+    @memoized_property
+    def query(self):
+        model = self.prop.mapper.class_
+        query = model.query_class(model, session=self.session).with_parent(self.item, self.prop.key) \
+            .order_by(*get_relationship_order_by(self.prop))
+
+        if self._limit is not None:
+            query = query.limit(self._limit)
+        return query
+
+    def __getattr__(self, name):
+        return getattr(self.query, name)
+
+    def _result(self, bq, **params):
+        params.update((key, getattr(self.item, attribute)) for key, attribute in self._params)
+        return bq(self.session).params(**params)
+
+    def _sliced(self, limit, offset):
+        bq = self._baked.with_criteria(lambda q: q.limit(bindparam('presst_limit')).offset(bindparam('presst_offset')))
+        return self._result(bq, presst_limit=limit, presst_offset=offset).all()
+
+    def limit(self, limit):
+        return BakedRelationshipQuery(self._bakery, self.session, self.item, self.prop, self._criterion,
+                                      self._params, limit=limit if self._limit is None else min(limit, self._limit))
+
+    def all(self):
+        if self._limit is not None:
+            return self._sliced(self._limit, 0)
+        return self._result(self._baked).all()
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def count(self):
+        bq = self._baked.with_criteria(lambda q: q.order_by(None).with_entities(func.count()))
+        return self._result(bq).one()[0]
+
+    def paginate(self, page, per_page=20, error_out=True):
+        """
+        Like :meth:`flask_sqlalchemy.BaseQuery.paginate`, using the cached statements.
+        """
+        if error_out and page < 1:
+            abort(404)
+
+        items = self._sliced(per_page, (page - 1) * per_page)
+
+        if not items and page != 1 and error_out:
+            abort(404)
+
+        # no need to count if the first page is not full:
+        if page == 1 and len(items) < per_page:
+            total = len(items)
+        else:
+            total = self.count()
+
+        return Pagination(self, page, per_page, total, items)
@@ -0,0 +1,159 @@
+from contextlib import contextmanager
+
+from flask import current_app, _request_ctx_stack
+
+
+def safe_item_id(resource, item):
+    """
+    Returns the id of ``item``, or ``None`` if it does not have one yet.
+    """
+    try:
+        return resource.item_get_id(item)
+    except (KeyError, TypeError):
+        return None
+
+
+class _MarshalFrame(object):
+    __slots__ = ('key', 'embedded', 'uses_ancestors')
+
+    def __init__(self, key):
+        self.key = key
+        self.embedded = set()
+        self.uses_ancestors = False
+
+
+class MarshalMemo(object):
+    """
+    Items marshalled within a request, keyed by resource, id and embedding depth.
+
+    An item is only memoized if its output does not depend on the items it is embedded in, i.e. if none of its
+    references fell back to a URI to break a cycle through one of them, and it is only reused where none of the
+    items it embeds is being marshalled further up.
+    """
+
+    def __init__(self, stack):
+        self._stack = stack
+        self._items = {}
+
+    def get(self, resource, id_):
+        stack = self._stack
+        entry = self._items.get((resource, id_, len(stack)))
+
+        if entry is None:
+            return None
+
+        marshaled, embedded = entry
+
+        if any(frame.key in embedded for frame in stack):
+            return None
+
+        if stack:
+            stack[-1].embedded.add((resource, id_))
+            stack[-1].embedded.update(embedded)
+        return marshaled
+
+    def set(self, resource, id_, marshaled, frame):
+        if not frame.uses_ancestors:
+            self._items[(resource, id_, len(self._stack))] = (marshaled, frozenset(frame.embedded))
+
+
+def get_marshal_memo():
+    """
+    Returns the request-scoped :class:`MarshalMemo`, or ``None`` outside of requests.
+    """
+    ctx = _request_ctx_stack.top
+
+    if ctx is None:
+        return None
+
+    memo = getattr(ctx, 'presst_marshal_memo', None)
+
+    if memo is None:
+        memo = ctx.presst_marshal_memo = MarshalMemo(_get_marshal_stack())
+    return memo
+
+
+def clear_marshal_memo():
+    """
+    Clears marshalled items of the current request, which may be out of date after a change.
+    """
+    ctx = _request_ctx_stack.top
+
+    if ctx is not None:
+        ctx.presst_marshal_memo = None
+
+
+def _get_marshal_stack():
+    ctx = _request_ctx_stack.top
+
+    if ctx is None:
+        return None
+
+    stack = getattr(ctx, 'presst_marshal_stack', None)
+
+    if stack is None:
+        stack = ctx.presst_marshal_stack = []
+    return stack
+
+
+def get_embed_depth():
+    """
+    Returns the number of items currently being marshalled in the current request, i.e. ``0`` for a top-level item
+    and ``1`` for an item embedded in it.
+    """
+    stack = _get_marshal_stack()
+    return len(stack) if stack else 0
+
+
+@contextmanager
+def marshalling(resource, id_):
+    """
+    Marks an item as being marshalled for the duration of the context. Yields the frame of the item, which records
+    the items embedded in it, or ``None`` outside of requests.
+    """
+    stack = _get_marshal_stack()
+
+    if stack is None:
+        yield None
+        return
+
+    frame = _MarshalFrame((resource, id_))
+    stack.append(frame)
+
+    try:
+        yield frame
+    finally:
+        stack.pop()
+
+    if stack:
+        stack[-1].embedded.add(frame.key)
+        stack[-1].embedded.update(frame.embedded)
+
+
+def can_embed(resource, item):
+    """
+    Returns ``False`` if embedding ``item`` would exceed the ``PRESST_MAX_EMBED_DEPTH`` or if the item is already
+    being marshalled further up, in which case embedded fields should fall back to the item's URI.
+    """
+    stack = _get_marshal_stack()
+
+    if not stack:
+        return True
+
+    max_depth = current_app.config.get('PRESST_MAX_EMBED_DEPTH', 5)
+
+    if max_depth is not None and len(stack) > max_depth:
+        return False
+
+    id_ = safe_item_id(resource, item)
+
+    if id_ is None:
+        return True
+
+    for i, frame in enumerate(stack):
+        if frame.key == (resource, id_):
+            # the output of the items in between now depends on this one being further up:
+            for descendant in stack[i + 1:]:
+                descendant.uses_ancestors = True
+            return False
+    return True
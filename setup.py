@@ -8,7 +8,7 @@ setup(
     author_email='lays@biosustain.dtu.dk',
     name='Flask-Presst',
     version='0.3.2',
-    packages=find_packages(exclude=['*tests*']),
+    packages=find_packages(exclude=['*tests*', 'benchmarks', 'benchmarks.*']),
     url='https://flask-presst.readthedocs.org/en/latest/',
     license='MIT',
     test_suite='nose.collector',
@@ -22,10 +22,12 @@ setup(
         'Flask>=0.10',
         'Flask-RESTful>=0.2.10',
         'Flask-SQLAlchemy>=1.0',
+        'SQLAlchemy>=1.0.9',
         'jsonschema>=2.3.0',
         'iso8601>=0.1.8',
         'blinker>=1.3',
-        'six>=1.3.0'
+        'six>=1.3.0',
+        'futures>=3.0; python_version < "3"'
     ],
     classifiers=[
         'Development Status :: 4 - Beta',
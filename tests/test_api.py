@@ -83,3 +83,56 @@ class TestAPI(PresstTestCase):
                                  }
                              }
                          }, response.json)
+
+    def test_schema_etag(self):
+        response = self.client.get('/schema')
+        etag = response.headers['ETag']
+
+        response = self.client.get('/schema', headers={'If-None-Match': etag})
+        self.assertStatus(response, 304)
+        self.assertEqual(etag, response.headers['ETag'])
+
+        response = self.client.get('/fruit/schema')
+        self.assert200(response)
+        resource_etag = response.headers['ETag']
+        self.assertNotEqual(etag, resource_etag)
+
+        response = self.client.get('/fruit/schema', headers={'If-None-Match': resource_etag})
+        self.assertStatus(response, 304)
+
+        response = self.client.get('/fruit/schema', headers={'If-None-Match': '"outdated"'})
+        self.assert200(response)
+
+    def test_schema_cache_invalidation(self):
+        schema, etag = self.api.get_cached_schema()
+        self.assertIs(schema, self.api.get_cached_schema()[0])
+
+        class PetResource(ModelResource):
+            class Meta:
+                model = self.Pet
+
+        self.api.add_resource(PetResource)
+
+        schema, new_etag = self.api.get_cached_schema()
+        self.assertNotEqual(etag, new_etag)
+        self.assertIn('pet', schema['properties'])
+
+    def test_resolve_resource_schema_memoized(self):
+        with self.app.test_request_context('/'):
+            url, schema = self.api.resolver_instance.resolve('/fruit/schema#')
+            self.assertEqual(self.api.get_resource_schema(self.FruitResource), schema)
+            self.assertIs(schema, self.api.resolver_instance.resolve('/fruit/schema#')[1])
+
+            class PetResource(ModelResource):
+                class Meta:
+                    model = self.Pet
+
+            self.api.add_resource(PetResource)
+            self.assertIsNot(schema, self.api.resolver_instance.resolve('/fruit/schema#')[1])
+
+    def test_resolver_preloaded_store(self):
+        self.api.resolver_instance.store['/fruit/schema'] = {'type': 'object', 'title': 'Preloaded'}
+
+        with self.app.test_request_context('/'):
+            url, schema = self.api.resolver_instance.resolve('/fruit/schema#')
+            self.assertEqual({'type': 'object', 'title': 'Preloaded'}, schema)
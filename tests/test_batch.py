@@ -0,0 +1,175 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import backref
+from flask_presst import ModelResource, Relationship, fields, signals
+from flask_presst.batch import in_atomic_batch
+from flask_presst.cache import LRUItemCache
+from tests import PresstTestCase
+
+
+class TestBatch(PresstTestCase):
+    def create_app(self):
+        app = super(TestBatch, self).create_app()
+        app.config['PRESST_BATCH'] = True
+        return app
+
+    def setUp(self):
+        super(TestBatch, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+
+        db.create_all()
+
+        class AuthorResource(ModelResource):
+            books = Relationship('book')
+
+            class Meta:
+                model = Author
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author')
+
+            class Meta:
+                model = Book
+
+        self.api.add_resource(AuthorResource)
+        self.api.add_resource(BookResource)
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_batch(self):
+        response = self.client.post('/batch', data=[
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'Jane'}},
+            {'method': 'POST', 'path': '/book', 'body': {'title': 'A', 'author': '/author/1'}},
+            {'method': 'PATCH', 'path': '/book/1', 'body': {'title': 'B'}},
+            {'method': 'GET', 'path': '/author/1/books'},
+            {'method': 'GET', 'path': '/book/2'},
+            {'method': 'DELETE', 'path': '/book/1'},
+        ])
+
+        self.assert200(response)
+        self.assertEqual([200, 200, 200, 200, 404, 204], [r['status'] for r in response.json])
+        self.assertEqual({'_uri': '/author/1', 'name': 'Jane'}, response.json[0]['body'])
+        self.assertEqual([{'_uri': '/book/1', 'title': 'B', 'author': '/author/1'}], response.json[3]['body'])
+        self.assertIn('Link', response.json[3]['headers'])
+        self.assertEqual(None, response.json[5]['body'])
+
+        self.request('GET', '/book', None, [], 200)
+
+    def test_batch_atomic(self):
+        response = self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'Jane'}},
+            {'method': 'POST', 'path': '/book', 'body': {'title': 'A', 'author': '/author/1'}},
+            {'method': 'GET', 'path': '/book/1'},
+        ]})
+
+        self.assert200(response)
+        self.assertEqual({'_uri': '/book/1', 'title': 'A', 'author': '/author/1'}, response.json[2]['body'])
+        self.request('GET', '/book/1', None, {'_uri': '/book/1', 'title': 'A', 'author': '/author/1'}, 200)
+
+    def test_batch_atomic_rollback(self):
+        response = self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'Jane'}},
+            {'method': 'POST', 'path': '/book', 'body': {'title': None}},
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'John'}},
+        ]})
+
+        self.assert400(response)
+        self.assertEqual(1, response.json['index'])
+        self.request('GET', '/author', None, [], 200)
+
+    def test_batch_atomic_cached(self):
+        book_resource = self.api._presst_resources['book']
+        book_resource._item_cache = cache = LRUItemCache()
+        self.addCleanup(setattr, book_resource, '_item_cache', None)
+
+        self.request('POST', '/book', {'title': 'old'}, {'_uri': '/book/1', 'title': 'old', 'author': None}, 200)
+        self.request('GET', '/book/1', None, {'_uri': '/book/1', 'title': 'old', 'author': None}, 200)
+
+        response = self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'PATCH', 'path': '/book/1', 'body': {'title': 'new'}},
+            {'method': 'GET', 'path': '/book/1'},
+        ]})
+
+        self.assert200(response)
+        self.assertEqual(['new', 'new'], [r['body']['title'] for r in response.json])
+
+        # uncommitted changes are not written to the cache:
+        self.assertEqual(None, cache.get('book:1'))
+        self.request('GET', '/book/1', None, {'_uri': '/book/1', 'title': 'new', 'author': None}, 200)
+
+    def _record_signals(self):
+        received = []
+
+        def receiver(sender, item, **kwargs):
+            received.append((sender.resource_name, item.id, in_atomic_batch()))
+
+        signals.after_create_item.connect(receiver)
+        self.addCleanup(signals.after_create_item.disconnect, receiver)
+        return received
+
+    def test_batch_atomic_signals(self):
+        received = self._record_signals()
+
+        self.assert200(self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'Jane'}},
+            {'method': 'POST', 'path': '/book', 'body': {'title': 'A', 'author': '/author/1'}},
+        ]}))
+
+        # the signals are sent once the batch has been committed:
+        self.assertEqual([('author', 1, False), ('book', 1, False)], received)
+
+        del received[:]
+        self.assert400(self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'John'}},
+            {'method': 'POST', 'path': '/book', 'body': {'title': None}},
+        ]}))
+        self.assertEqual([], received)
+
+    def test_batch_atomic_commit_error(self):
+        received = self._record_signals()
+        author_resource = self.api._presst_resources['author']
+
+        def commit(cls):
+            if not in_atomic_batch():
+                raise IntegrityError('COMMIT', {}, Exception())
+            ModelResource.commit.__func__(cls)
+
+        author_resource.commit = classmethod(commit)
+
+        response = self.client.post('/batch', data={'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/author', 'body': {'name': 'Jane'}},
+        ]})
+
+        self.assertEqual(500, response.status_code)
+        self.assertEqual([], received)
+
+        del author_resource.commit
+        self.request('GET', '/author', None, [], 200)
+
+    def test_batch_invalid(self):
+        self.assert400(self.client.post('/batch', data={'method': 'GET', 'path': '/author'}))
+        self.assert400(self.client.post('/batch', data=[{'method': 'GET'}]))
+        self.assert400(self.client.post('/batch', data=[{'method': 'POST', 'path': '/batch', 'body': []}]))
+
+        self.app.config['PRESST_BATCH_MAX_REQUESTS'] = 1
+        self.assert400(self.client.post('/batch', data=[{'path': '/author'}, {'path': '/book'}]))
+
+
+class TestBatchDisabled(PresstTestCase):
+    def test_no_route(self):
+        self.assert404(self.client.post('/batch', data=[]))
@@ -0,0 +1,225 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import backref
+from flask_presst import ModelResource, Relationship, fields, signals
+from flask_presst.cache import LRUItemCache, ItemCache, _get_cache_dependents
+from tests import PresstTestCase
+
+
+class TestLRUItemCache(PresstTestCase):
+    def test_eviction(self):
+        cache = LRUItemCache(max_size=2)
+        cache.set('a:1', 1)
+        cache.set('a:2', 2)
+        self.assertEqual(1, cache.get('a:1'))
+
+        cache.set('a:3', 3)
+        self.assertEqual(None, cache.get('a:2'))
+        self.assertEqual(1, cache.get('a:1'))
+        self.assertEqual(3, cache.get('a:3'))
+
+        cache.delete('a:1')
+        self.assertEqual(None, cache.get('a:1'))
+
+        cache.clear()
+        self.assertEqual(None, cache.get('a:3'))
+
+    def test_timeout(self):
+        cache = LRUItemCache(timeout=-1)
+        cache.set('a:1', 1)
+        self.assertEqual(None, cache.get('a:1'))
+
+
+class RecordingItemCache(LRUItemCache):
+    def __init__(self):
+        super(RecordingItemCache, self).__init__()
+        self.hits = 0
+
+    def get(self, key):
+        value = super(RecordingItemCache, self).get(key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+
+class TestResourceItemCache(PresstTestCase):
+    def setUp(self):
+        super(TestResourceItemCache, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+
+        db.create_all()
+
+        self.author_cache = author_cache = RecordingItemCache()
+
+        class AuthorResource(ModelResource):
+            books = Relationship('book')
+
+            class Meta:
+                model = Author
+                cache = author_cache
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author', embedded=True)
+
+            class Meta:
+                model = Book
+                cache = True
+
+        self.api.add_resource(AuthorResource)
+        self.api.add_resource(BookResource)
+
+        self.AuthorResource = AuthorResource
+        self.BookResource = BookResource
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_meta_cache(self):
+        self.assertIs(self.author_cache, self.AuthorResource._item_cache)
+        self.assertIsInstance(self.BookResource._item_cache, ItemCache)
+
+    def test_read_through(self):
+        self.request('POST', '/author', {'name': 'Jane'}, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('GET', '/author/1', None, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('GET', '/author/1', None, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.assertEqual(2, self.author_cache.hits)
+
+        self.request('POST', '/book', {'title': 'A', 'author': '/author/1'},
+                     {'_uri': '/book/1', 'title': 'A', 'author': {'_uri': '/author/1', 'name': 'Jane'}}, 200)
+        self.assertEqual(3, self.author_cache.hits)
+
+    def test_invalidate_on_update(self):
+        self.request('POST', '/author', {'name': 'Jane'}, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('POST', '/book', {'title': 'A', 'author': '/author/1'},
+                     {'_uri': '/book/1', 'title': 'A', 'author': {'_uri': '/author/1', 'name': 'Jane'}}, 200)
+
+        self.request('PATCH', '/author/1', {'name': 'John'}, {'_uri': '/author/1', 'name': 'John'}, 200)
+        self.request('GET', '/author/1', None, {'_uri': '/author/1', 'name': 'John'}, 200)
+
+        # books embed authors, so the book cache must have been cleared as well:
+        self.request('GET', '/book/1', None,
+                     {'_uri': '/book/1', 'title': 'A', 'author': {'_uri': '/author/1', 'name': 'John'}}, 200)
+
+    def test_invalidate_on_delete(self):
+        self.request('POST', '/author', {'name': 'Jane'}, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('GET', '/author/1', None, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+
+        self.client.delete('/author/1')
+        self.request('GET', '/author/1', None, None, 404)
+
+    def test_invalidate_on_relationship(self):
+        self.request('POST', '/author', {'name': 'Jane'}, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('POST', '/book', {'title': 'A'}, {'_uri': '/book/1', 'title': 'A', 'author': None}, 200)
+
+        self.request('POST', '/author/1/books', '/book/1',
+                     {'_uri': '/book/1', 'title': 'A', 'author': {'_uri': '/author/1', 'name': 'Jane'}}, 200)
+
+        self.request('GET', '/book/1', None,
+                     {'_uri': '/book/1', 'title': 'A', 'author': {'_uri': '/author/1', 'name': 'Jane'}}, 200)
+
+
+class TestTransitiveInvalidation(PresstTestCase):
+    def setUp(self):
+        super(TestTransitiveInvalidation, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Category(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            parent_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+            parent = db.relationship('Category', remote_side=[id])
+
+        class Product(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            category_id = db.Column(db.Integer, db.ForeignKey(Category.id))
+            category = db.relationship(Category)
+
+        class Review(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            product_id = db.Column(db.Integer, db.ForeignKey(Product.id))
+            product = db.relationship(Product)
+
+        db.create_all()
+
+        class CategoryResource(ModelResource):
+            parent = fields.ToOne('self', embedded=True)
+
+            class Meta:
+                model = Category
+                cache = True
+
+        class ProductResource(ModelResource):
+            category = fields.ToOne(CategoryResource, embedded=True)
+
+            class Meta:
+                model = Product
+
+        class ReviewResource(ModelResource):
+            product = fields.ToOne(ProductResource, embedded=True)
+
+            class Meta:
+                model = Review
+                cache = True
+
+        self.api.add_resource(CategoryResource)
+        self.api.add_resource(ProductResource)
+        self.api.add_resource(ReviewResource)
+
+        food = Category(name='Food')
+        db.session.add(Review(product=Product(category=Category(name='Fruit', parent=food))))
+        db.session.commit()
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_self_reference(self):
+        self.request('GET', '/category/2', None, {
+            '_uri': '/category/2',
+            'name': 'Fruit',
+            'parent': {'_uri': '/category/1', 'name': 'Food', 'parent': None}
+        }, 200)
+
+        self.request('PATCH', '/category/1', {'name': 'Groceries'},
+                     {'_uri': '/category/1', 'name': 'Groceries', 'parent': None}, 200)
+
+        self.request('GET', '/category/2', None, {
+            '_uri': '/category/2',
+            'name': 'Fruit',
+            'parent': {'_uri': '/category/1', 'name': 'Groceries', 'parent': None}
+        }, 200)
+
+    def test_transitive(self):
+        self.assertEqual('Fruit', self.client.get('/review/1').json['product']['category']['name'])
+        self.assert200(self.client.patch('/category/2', data={'name': 'Vegetables'}))
+        self.assertEqual('Vegetables', self.client.get('/review/1').json['product']['category']['name'])
+
+
+    def test_cache_dependents(self):
+        resources = self.api._presst_resources
+
+        with self.app.test_request_context('/'):
+            dependents = _get_cache_dependents(self.api)
+
+        self.assertEqual({resources['category'], resources['review']}, set(dependents[resources['category']]))
+        self.assertEqual([resources['review']], dependents[resources['product']])
+        self.assertEqual([], dependents[resources['review']])
+
+        # no receivers are connected, so that resources without receivers of their own skip the after_* signals:
+        self.assertFalse(signals.after_update_item.has_receivers_for(resources['category']))
@@ -0,0 +1,270 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import backref
+from flask_presst import ModelResource, Relationship, action, fields
+from flask_presst.cache import LRUItemCache
+from tests import PresstTestCase, SimpleResource
+
+
+class TestEmbed(PresstTestCase):
+    def setUp(self):
+        super(TestEmbed, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        book_tag = db.Table('book_tag',
+                            db.Column('book_id', db.Integer, db.ForeignKey('book.id')),
+                            db.Column('tag_id', db.Integer, db.ForeignKey('tag.id')))
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Tag(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+            tags = db.relationship(Tag, secondary=book_tag, order_by=Tag.name)
+
+        db.create_all()
+
+        class AuthorResource(ModelResource):
+            books = Relationship('book')
+
+            class Meta:
+                model = Author
+
+        class TagResource(ModelResource):
+            class Meta:
+                model = Tag
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author')
+            tags = fields.ToMany('tag')
+
+            class Meta:
+                model = Book
+
+        self.api.add_resource(AuthorResource)
+        self.api.add_resource(TagResource)
+        self.api.add_resource(BookResource)
+
+        verne, wells = Author(name='Jules Verne'), Author(name='H. G. Wells')
+        classic, travel = Tag(id=1, name='classic'), Tag(id=2, name='travel')
+
+        db.session.add_all([
+            Book(title='Around the World in Eighty Days', author=verne, tags=[classic, travel]),
+            Book(title='Journey to the Center of the Earth', author=verne, tags=[travel]),
+            Book(title='The Time Machine', author=wells, tags=[classic]),
+        ])
+        db.session.commit()
+
+        self.statements = statements = []
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        self.before_cursor_execute = before_cursor_execute
+
+    def tearDown(self):
+        event.remove(self.db.engine, 'before_cursor_execute', self.before_cursor_execute)
+        self.db.drop_all()
+
+    def test_embed_to_one(self):
+        response = self.client.get('/book?embed=author')
+        self.assert200(response)
+
+        self.assertEqual(['/author/1', '/author/1', '/author/2'], [book['author'] for book in response.json['_items']])
+        self.assertEqual({
+            '/author/1': {'_uri': '/author/1', 'name': 'Jules Verne'},
+            '/author/2': {'_uri': '/author/2', 'name': 'H. G. Wells'}
+        }, response.json['_included'])
+
+        # the authors are loaded with a single query and not again when the books are marshalled:
+        self.assertEqual(1, len([statement for statement in self.statements if 'author.name' in statement]))
+
+    def test_embed_to_many(self):
+        response = self.client.get('/book?embed=tags,author')
+        self.assert200(response)
+
+        self.assertEqual([['/tag/1', '/tag/2'], ['/tag/2'], ['/tag/1']],
+                         [book['tags'] for book in response.json['_items']])
+        self.assertEqual({'/author/1', '/author/2', '/tag/1', '/tag/2'}, set(response.json['_included']))
+        self.assertEqual(3, len(self.statements))
+
+    def test_embed_relationship(self):
+        response = self.client.get('/author/1?embed=books')
+        self.assert200(response)
+
+        self.assertEqual(['/book/1', '/book/2'], response.json['books'])
+        self.assertEqual({'/book/1', '/book/2'}, set(response.json['_included']))
+        self.assertEqual({'_uri': '/book/2',
+                          'title': 'Journey to the Center of the Earth',
+                          'author': '/author/1',
+                          'tags': ['/tag/2']}, response.json['_included']['/book/2'])
+
+    def test_embed_joined_target(self):
+        book_resource = self.api._presst_resources['book']
+        book, tag = book_resource._model, self.api._presst_resources['tag']._model
+        book_resource.get_item_list = classmethod(lambda cls: book.query.join(book.tags).filter(tag.name == 'classic'))
+
+        self.assertEqual(['/book/1'], self.client.get('/author/1?embed=books').json['books'])
+        self.assertEqual(['/book/3'], self.client.get('/author/2?embed=books').json['books'])
+
+    def test_embed_relationship_limit(self):
+        self.app.config['PRESST_MAX_PER_PAGE'] = 1
+
+        response = self.client.get('/author/1?embed=books')
+        self.assertEqual(['/book/1'], response.json['books'])
+        self.assertEqual(['/book/1'], list(response.json['_included']))
+
+    def test_embed_invalid(self):
+        self.assert400(self.client.get('/book?embed=title'))
+        self.assert400(self.client.get('/book?embed=unknown'))
+
+    def test_no_embed(self):
+        response = self.client.get('/book/1')
+        self.assertNotIn('_included', response.json)
+        self.assertEqual(3, len(self.client.get('/book').json))
+
+
+class TestEmbedResource(PresstTestCase):
+    def setUp(self):
+        super(TestEmbedResource, self).setUp()
+
+        class Citrus(SimpleResource):
+            items = [{'id': 1, 'name': 'Orange'}, {'id': 2, 'name': 'Lemon'}]
+
+            name = fields.String()
+
+            @action('POST', response_property=fields.One('citrus'))
+            def rename(self, citrus, name):
+                self.marshal_item(citrus)
+                citrus['name'] = name
+                return citrus
+
+            rename.add_argument('name', fields.String(nullable=False))
+
+        class Tree(SimpleResource):
+            items = [{'id': 1, 'fruit': Citrus.items[0]},
+                     {'id': 2, 'fruit': Citrus.items[0]}]
+
+            fruit = fields.ToOne(Citrus)
+
+        self.api.add_resource(Citrus)
+        self.api.add_resource(Tree)
+
+    def test_embed(self):
+        self.request('GET', '/tree?embed=fruit', None, {
+            '_items': [{'_uri': '/tree/1', 'fruit': '/citrus/1'}, {'_uri': '/tree/2', 'fruit': '/citrus/1'}],
+            '_included': {'/citrus/1': {'_uri': '/citrus/1', 'name': 'Orange'}}
+        }, 200)
+
+    def test_action_clears_memo(self):
+        self.request('POST', '/citrus/2/rename', {'name': 'Lime'}, {'_uri': '/citrus/2', 'name': 'Lime'}, 200)
+
+
+class TestEmbedDepth(PresstTestCase):
+    def setUp(self):
+        super(TestEmbedDepth, self).setUp()
+        self.marshaled = marshaled = []
+
+        class Node(SimpleResource):
+            items = [{'id': 1, 'parent': None}]
+
+            parent = fields.ToOne('self', embedded=True)
+
+            @classmethod
+            def _marshal_item(cls, item):
+                marshaled.append(item['id'])
+                return super(Node, cls)._marshal_item(item)
+
+        for id_ in range(2, 6):
+            Node.items.append({'id': id_, 'parent': Node.items[-1]})
+
+        # a cycle:
+        Node.items.append({'id': 6, 'parent': None})
+        Node.items.append({'id': 7, 'parent': Node.items[-1]})
+        Node.items[5]['parent'] = Node.items[6]
+
+        self.api.add_resource(Node)
+
+    def test_max_depth(self):
+        self.app.config['PRESST_MAX_EMBED_DEPTH'] = 2
+
+        self.request('GET', '/node/4', None, {
+            '_uri': '/node/4',
+            'parent': {'_uri': '/node/3', 'parent': {'_uri': '/node/2', 'parent': '/node/1'}}
+        }, 200)
+
+        self.app.config['PRESST_MAX_EMBED_DEPTH'] = 0
+        self.request('GET', '/node/4', None, {'_uri': '/node/4', 'parent': '/node/3'}, 200)
+
+    def test_cycle(self):
+        self.request('GET', '/node/6', None, {
+            '_uri': '/node/6',
+            'parent': {'_uri': '/node/7', 'parent': '/node/6'}
+        }, 200)
+
+    def test_cache(self):
+        Node = self.api._presst_resources['node']
+        Node._item_cache = LRUItemCache()
+        self.addCleanup(setattr, Node, '_item_cache', None)
+
+        self.request('GET', '/node/6', None, {
+            '_uri': '/node/6',
+            'parent': {'_uri': '/node/7', 'parent': '/node/6'}
+        }, 200)
+
+        self.request('GET', '/node/7', None, {
+            '_uri': '/node/7',
+            'parent': {'_uri': '/node/6', 'parent': '/node/7'}
+        }, 200)
+
+        self.app.config['PRESST_MAX_EMBED_DEPTH'] = 1
+        self.request('GET', '/node/3', None, {
+            '_uri': '/node/3',
+            'parent': {'_uri': '/node/2', 'parent': '/node/1'}
+        }, 200)
+
+        self.request('GET', '/node/4', None, {
+            '_uri': '/node/4',
+            'parent': {'_uri': '/node/3', 'parent': '/node/2'}
+        }, 200)
+
+    def test_memo(self):
+        self.app.config['PRESST_MAX_EMBED_DEPTH'] = 1
+
+        response = self.client.get('/node')
+        self.assert200(response)
+        self.assertEqual({'_uri': '/node/3', 'parent': {'_uri': '/node/2', 'parent': '/node/1'}}, response.json[2])
+
+        # each node is marshalled once at the top level and once embedded:
+        self.assertEqual(7 + 6, len(self.marshaled))
+
+    def test_memo_cycle(self):
+        Node = self.api._presst_resources['node']
+        Node.items.append({'id': 8, 'parent': Node.items[6]})
+        node_6, node_7, node_8 = Node.items[5:8]
+
+        from_6 = {'_uri': '/node/6', 'parent': {'_uri': '/node/7', 'parent': '/node/6'}}
+        from_8 = {'_uri': '/node/8', 'parent': {'_uri': '/node/7', 'parent': {'_uri': '/node/6', 'parent': '/node/7'}}}
+
+        # the embedded /node/7 depends on whether /node/6 is further up:
+        with self.app.test_request_context('/node'):
+            self.assertEqual(from_6, Node.marshal_item(node_6))
+            self.assertEqual(from_8, Node.marshal_item(node_8))
+
+        with self.app.test_request_context('/node'):
+            self.assertEqual(from_8, Node.marshal_item(node_8))
+            self.assertEqual(from_6, Node.marshal_item(node_6))
+            self.assertEqual(from_8, Node.marshal_item(node_8))
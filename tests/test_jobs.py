@@ -0,0 +1,86 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+from flask_presst import fields, action
+from flask_presst.jobs import JobQueue
+from tests import PresstTestCase, SimpleResource
+
+
+class TestAsyncAction(PresstTestCase):
+    def setUp(self):
+        super(TestAsyncAction, self).setUp()
+
+        class Citrus(SimpleResource):
+            items = [{'id': 1, 'name': 'Orange', 'sweetness': 3},
+                     {'id': 2, 'name': 'Lemon', 'sweetness': 1}]
+
+            name = fields.String()
+            sweetness = fields.Integer()
+
+            @action('POST', response_property=fields.One('Citrus', nullable=False), async_=True)
+            def sweeten(self, citrus, by):
+                citrus['sweetness'] += by
+                return citrus
+
+            sweeten.add_argument('by', fields.PositiveInteger(nullable=False))
+
+            @action('GET', collection=True, async_=True)
+            def fail(self, item_list):
+                raise RuntimeError()
+
+        self.api.add_resource(Citrus)
+
+    def _wait(self, response):
+        job = self.api.jobs.get(response.json['_uri'].rsplit('/', 1)[1])
+        job.future.result()
+        return self.client.get(response.json['_uri'])
+
+    def test_async_action(self):
+        response = self.client.post('/citrus/1/sweeten', data={'by': 2})
+
+        self.assertStatus(response, 202)
+        self.assertEqual(response.json['_uri'], response.headers['Location'].replace('http://localhost', ''))
+        self.assertIn(response.json['status'], ('pending', 'running', 'completed'))
+
+        response = self._wait(response)
+        self.assert200(response)
+        self.assertEqual({
+            '_uri': response.json['_uri'],
+            'status': 'completed',
+            'status_code': 200,
+            'result': {'_uri': '/citrus/1', 'name': 'Orange', 'sweetness': 5}
+        }, response.json)
+
+    def test_async_action_validation(self):
+        self.assert400(self.client.post('/citrus/1/sweeten', data={'by': -1}))
+        self.assert404(self.client.post('/citrus/3/sweeten', data={'by': 1}))
+
+    def test_async_action_failed(self):
+        self.app.config['PROPAGATE_EXCEPTIONS'] = False
+
+        response = self._wait(self.client.get('/citrus/fail'))
+        self.assertEqual('failed', response.json['status'])
+        self.assertEqual(500, response.json['status_code'])
+
+    def test_executor_error(self):
+        class FailingExecutor(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(TypeError("can't pickle"))
+                return future
+
+        executor, self.api.jobs.executor = self.api.jobs.executor, FailingExecutor()
+        self.addCleanup(setattr, self.api.jobs, 'executor', executor)
+
+        response = self.client.post('/citrus/1/sweeten', data={'by': 2})
+        self.assertStatus(response, 202)
+
+        response = self.client.get(response.json['_uri'])
+        self.assertEqual('failed', response.json['status'])
+        self.assertEqual(500, response.json['status_code'])
+
+    def test_process_pool(self):
+        with self.assertRaises(RuntimeError):
+            JobQueue(self.app, ProcessPoolExecutor(max_workers=1))
+
+    def test_unknown_job(self):
+        self.assert404(self.client.get('/jobs/unknown'))
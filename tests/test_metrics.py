@@ -0,0 +1,116 @@
+import threading
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import backref
+from flask_presst import ModelResource, Relationship
+from flask_presst.metrics import MetricsRegistry
+from tests import PresstTestCase
+
+
+class TestMetricsRegistry(PresstTestCase):
+    def test_export(self):
+        metrics = MetricsRegistry(latency_buckets=(0.1, 1.0))
+        metrics.record('book', 'GET', 200, 0.05, response_size=100, items=2)
+        metrics.record('book', 'GET', 200, 0.5, response_size=300, items=4)
+        metrics.record('book', 'GET', 404, 2.0)
+
+        exported = metrics.export().splitlines()
+
+        for line in (
+                'presst_requests_total{endpoint="book",method="GET",status="200"} 2',
+                'presst_requests_total{endpoint="book",method="GET",status="404"} 1',
+                'presst_request_duration_seconds_bucket{endpoint="book",le="0.1",method="GET"} 1',
+                'presst_request_duration_seconds_bucket{endpoint="book",le="1.0",method="GET"} 2',
+                'presst_request_duration_seconds_bucket{endpoint="book",le="+Inf",method="GET"} 3',
+                'presst_request_duration_seconds_count{endpoint="book",method="GET"} 3',
+                'presst_response_size_bytes_sum{endpoint="book",method="GET"} 400',
+                'presst_response_size_bytes_count{endpoint="book",method="GET"} 2',
+                'presst_response_items_sum{endpoint="book",method="GET"} 6'):
+            self.assertIn(line, exported)
+
+
+    def test_threads(self):
+        metrics = MetricsRegistry(n_shards=4)
+
+        def record():
+            for _ in range(100):
+                metrics.record('book', 'GET', 200, 0.01)
+
+        threads = [threading.Thread(target=record) for _ in range(20)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # threads that have finished do not leave shards behind:
+        self.assertEqual(4, len(metrics._shards))
+        self.assertIn('presst_requests_total{endpoint="book",method="GET",status="200"} 2000',
+                      metrics.export().splitlines())
+
+
+class TestMetricsEndpoint(PresstTestCase):
+    def create_app(self):
+        app = super(TestMetricsEndpoint, self).create_app()
+        app.config['PRESST_METRICS'] = True
+        return app
+
+    def setUp(self):
+        super(TestMetricsEndpoint, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+
+        db.create_all()
+
+        class BookResource(ModelResource):
+            class Meta:
+                model = Book
+
+        class AuthorResource(ModelResource):
+            books = Relationship(BookResource)
+
+            class Meta:
+                model = Author
+
+        self.api.add_resource(BookResource)
+        self.api.add_resource(AuthorResource)
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_metrics(self):
+        self.request('POST', '/author', {'name': 'Jane'}, {'_uri': '/author/1', 'name': 'Jane'}, 200)
+        self.request('POST', '/book', {'title': 'A'}, {'_uri': '/book/1', 'title': 'A'}, 200)
+        self.request('POST', '/author/1/books', '/book/1', {'_uri': '/book/1', 'title': 'A'}, 200)
+        self.client.get('/author/1/books')
+        self.client.get('/author/2')
+
+        response = self.client.get('/metrics')
+        self.assert200(response)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        exported = response.data.decode().splitlines()
+
+        for line in (
+                'presst_requests_total{endpoint="author",method="POST",status="200"} 1',
+                'presst_requests_total{endpoint="book",method="POST",status="200"} 1',
+                'presst_requests_total{endpoint="author",method="GET",status="404"} 1',
+                'presst_requests_total{endpoint="author:books",method="GET",status="200"} 1',
+                'presst_requests_total{endpoint="author:books",method="POST",status="200"} 1',
+                'presst_response_items_sum{endpoint="author:books",method="GET"} 1'):
+            self.assertIn(line, exported)
+
+        self.assertFalse(any('endpoint="metrics"' in line for line in exported))
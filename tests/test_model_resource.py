@@ -1,7 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 import six
-from sqlalchemy.orm import backref
-from flask_presst import ModelResource, fields, Relationship, SchemaParser
+from sqlalchemy import event
+from sqlalchemy.orm import backref, Query
+from sqlalchemy.orm.collections import attribute_mapped_collection
+from werkzeug.exceptions import NotFound
+from flask_presst import ModelResource, fields, Relationship, SchemaParser, signals
+from flask_presst.utils.baked import BakedRelationshipQuery
 from tests import PresstTestCase
 
 
@@ -172,6 +176,48 @@ class TestModelResource(PresstTestCase):
         self.request('DELETE', '/tree/1', {'name': 'Apple tree'}, None, 404)
         self.request('DELETE', '/tree/2', {'name': 'Apple tree'}, None, 404)
 
+    def test_get_item_for_id_identity_map(self):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.test_request_context('/fruit/1'):
+            tree = self.Tree(name='Apple tree')
+            self.db.session.add(tree)
+            self.db.session.flush()
+
+            event.listen(self.db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                self.assertIs(tree, self.TreeResource.get_item_for_id(tree.id))
+                self.assertEqual([], statements)
+
+                with self.assertRaises(NotFound):
+                    self.TreeResource.get_item_for_id(2)
+                self.assertEqual(1, len(statements))
+            finally:
+                event.remove(self.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    def test_warmup(self):
+        self.api.warmup()
+
+        tree_field = self.FruitResource._fields['tree']
+        self.assertIn('schema', tree_field.__dict__)
+        self.assertIn('_validator', tree_field.__dict__)
+        self.assertIs(self.TreeResource, tree_field.__dict__['resource'])
+        self.assertIs(self.FruitResource, self.TreeResource.routes['fruits'].__dict__['resource'])
+
+        self.assertIn(self.TreeResource, self.api._schema_cache)
+        self.assertIn(None, self.api._schema_cache)
+        self.assertIn('/tree/schema', self.api._resolved_schemas)
+
+        self.request('GET', '/tree/schema', None, self.api.get_cached_schema(self.TreeResource)[0], 200)
+
+    def test_warmup_init_app(self):
+        self.api.app = None  # as with PresstApi().init_app(app)
+        self.api.warmup()
+        self.assertIn(self.TreeResource, self.api._schema_cache)
+
     def test_no_model(self):
         class OopsResource(ModelResource):
             class Meta:
@@ -479,4 +525,560 @@ class TestModelResourceFields(PresstTestCase):
                      {'name': 'Press I', '_uri': '/machine/1', 'type': None}, 200)
 
         self.request('POST', '/type', {'name': 'Press', 'machines': ['/machine/1']},
-                     {'name': 'Press', '_uri': '/type/1', 'machines': ['/machine/1']}, 200)
\ No newline at end of file
+                     {'name': 'Press', '_uri': '/type/1', 'machines': ['/machine/1']}, 200)
+
+class TestModelResourceRelationshipQuery(PresstTestCase):
+    def setUp(self):
+        super(TestModelResourceRelationshipQuery, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+        app.config['TESTING'] = True
+
+        self.db = db = SQLAlchemy(app)
+
+        garden_tree = db.Table('garden_tree',
+                               db.Column('garden_id', db.Integer, db.ForeignKey('garden.id')),
+                               db.Column('tree_id', db.Integer, db.ForeignKey('tree.id')))
+
+        class Tree(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            tree_id = db.Column(db.Integer, db.ForeignKey(Tree.id))
+            tree = db.relationship(Tree, backref=backref('fruits', order_by=name.desc()))
+
+        class Garden(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            trees = db.relationship(Tree, secondary=garden_tree)
+
+        db.create_all()
+
+        class TreeResource(ModelResource):
+            class Meta:
+                model = Tree
+
+            fruits = Relationship('Fruit')
+
+        class FruitResource(ModelResource):
+            class Meta:
+                model = Fruit
+
+        class GardenResource(ModelResource):
+            class Meta:
+                model = Garden
+
+            trees = Relationship(TreeResource)
+
+        self.api.add_resource(TreeResource)
+        self.api.add_resource(FruitResource)
+        self.api.add_resource(GardenResource)
+
+        self.Tree = Tree
+        self.Garden = Garden
+        self.TreeResource = TreeResource
+        self.GardenResource = GardenResource
+
+        apple, pear = Tree(name='Apple'), Tree(name='Pear')
+        db.session.add_all([apple, pear, Garden(trees=[apple, pear]), Garden(trees=[pear])])
+        db.session.add_all([Fruit(name='Fruit {}'.format(i), tree=apple) for i in range(1, 6)])
+        db.session.add(Fruit(name='Pear', tree=pear))
+        db.session.commit()
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_get_relationship_query(self):
+        with self.app.test_request_context('/tree/1/fruits'):
+            tree = self.Tree.query.get(1)
+            query = self.TreeResource.get_relationship(tree, 'fruits')
+
+            self.assertNotIn('fruits', tree.__dict__)
+            self.assertEqual(5, query.count())
+
+    def test_relationship_order_by(self):
+        response = self.client.get('/tree/1/fruits')
+        self.assertEqual(['Fruit 5', 'Fruit 4', 'Fruit 3', 'Fruit 2', 'Fruit 1'],
+                         [fruit['name'] for fruit in response.json])
+
+    def test_relationship_pagination(self):
+        response = self.client.get('/tree/1/fruits?per_page=2&page=2')
+        self.assert200(response)
+        self.assertEqual(['Fruit 3', 'Fruit 2'], [fruit['name'] for fruit in response.json])
+        self.assertIn('rel="last"', response.headers['Link'])
+
+    def test_relationship_filter_sort(self):
+        response = self.client.get('/tree/1/fruits?where={"name": {"$in": ["Fruit 1", "Fruit 3", "Pear"]}}'
+                                   '&sort={"name": false}')
+        self.assertEqual(['Fruit 1', 'Fruit 3'], [fruit['name'] for fruit in response.json])
+
+    def test_secondary_relationship(self):
+        self.request('GET', '/garden/1/trees', None,
+                     [{'_uri': '/tree/1', 'name': 'Apple'}, {'_uri': '/tree/2', 'name': 'Pear'}], 200)
+        self.request('GET', '/garden/2/trees?per_page=1', None, [{'_uri': '/tree/2', 'name': 'Pear'}], 200)
+
+    def test_baked_relationship_query(self):
+        with self.app.test_request_context('/garden/1/trees'):
+            garden = self.Garden.query.get(1)
+            query = self.GardenResource.get_relationship(garden, 'trees')
+
+            self.assertIsInstance(query, BakedRelationshipQuery)
+            self.assertEqual(2, query.count())
+            self.assertEqual(['Apple', 'Pear'], sorted(tree.name for tree in query))
+            self.assertEqual(1, len(query.limit(1).all()))
+            self.assertEqual(['Pear'], [tree.name for tree in query.filter(self.Tree.name == 'Pear')])
+
+    def test_baked_statement_cache(self):
+        compiled = []
+
+        @event.listens_for(Query, 'before_compile')
+        def before_compile(query):
+            compiled.append(query)
+
+        self.client.get('/tree/1/fruits?per_page=2&page=2')
+        self.client.get('/fruit/1')
+        self.assertNotEqual([], compiled)
+
+        del compiled[:]
+        self.assert404(self.client.get('/tree/2/fruits?per_page=2&page=2'))
+        self.request('GET', '/tree/2/fruits?per_page=2', None, [{'_uri': '/fruit/6', 'name': 'Pear'}], 200)
+        self.request('GET', '/tree/1/fruits?per_page=2&page=3', None, [{'_uri': '/fruit/1', 'name': 'Fruit 1'}], 200)
+        self.request('GET', '/fruit/2', None, {'_uri': '/fruit/2', 'name': 'Fruit 2'}, 200)
+        self.assert404(self.client.get('/fruit/7'))
+        self.assertEqual([], compiled)
+
+        event.remove(Query, 'before_compile', before_compile)
+
+    def test_secondary_relationship_add_remove(self):
+        statements = []
+
+        @event.listens_for(self.db.engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement.split(' ', 1)[0])
+
+        self.request('POST', '/garden/2/trees', ['/tree/1', '/tree/2'],
+                     [{'_uri': '/tree/1', 'name': 'Apple'}, {'_uri': '/tree/2', 'name': 'Pear'}], 200)
+        self.assertEqual(1, statements.count('INSERT'))
+
+        self.request('GET', '/garden/2/trees?sort={"name": 1}', None,
+                     [{'_uri': '/tree/1', 'name': 'Apple'}, {'_uri': '/tree/2', 'name': 'Pear'}], 200)
+
+        del statements[:]
+        self.request('DELETE', '/garden/2/trees', ['/tree/1', '/tree/2'], None, 204)
+        self.assertEqual(1, statements.count('DELETE'))
+
+        self.request('GET', '/garden/2/trees', None, [], 200)
+        self.request('GET', '/garden/1/trees', None,
+                     [{'_uri': '/tree/1', 'name': 'Apple'}, {'_uri': '/tree/2', 'name': 'Pear'}], 200)
+
+        event.remove(self.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    def test_secondary_relationship_expire(self):
+        with self.app.test_request_context('/garden/2/trees', method='POST'):
+            garden = self.Garden.query.get(2)
+            apple = self.Tree.query.get(1)
+            self.assertEqual(['Pear'], [tree.name for tree in garden.trees])
+
+            added = []
+
+            def on_add(sender, item, relationship, child):
+                added.append((item, relationship, child))
+
+            signals.after_add_relationship.connect(on_add, self.GardenResource)
+            self.GardenResource.add_items_to_relationship(garden, 'trees', [apple])
+            signals.after_add_relationship.disconnect(on_add)
+
+            self.assertEqual([(garden, 'trees', apple)], added)
+            self.assertEqual({'Apple', 'Pear'}, set(tree.name for tree in garden.trees))
+
+            self.GardenResource.remove_items_from_relationship(garden, 'trees', garden.trees)
+            self.assertEqual([], garden.trees)
+
+
+class TestModelResourceRelationshipCount(PresstTestCase):
+    def setUp(self):
+        super(TestModelResourceRelationshipCount, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+        app.config['TESTING'] = True
+
+        self.db = db = SQLAlchemy(app)
+
+        garden_tree = db.Table('garden_tree',
+                               db.Column('garden_id', db.Integer, db.ForeignKey('garden.id')),
+                               db.Column('tree_id', db.Integer, db.ForeignKey('tree.id')))
+
+        node_link = db.Table('node_link',
+                             db.Column('source_id', db.Integer, db.ForeignKey('node.id')),
+                             db.Column('target_id', db.Integer, db.ForeignKey('node.id')))
+
+        class Tree(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            tree_id = db.Column(db.Integer, db.ForeignKey(Tree.id))
+            tree = db.relationship(Tree, backref='fruits')
+
+        class Garden(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            trees = db.relationship(Tree, secondary=garden_tree)
+
+        class Node(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            parent_id = db.Column(db.Integer, db.ForeignKey('node.id'))
+            children = db.relationship('Node', backref=backref('parent', remote_side=[id]))
+            links = db.relationship('Node',
+                                    secondary=node_link,
+                                    primaryjoin=id == node_link.c.source_id,
+                                    secondaryjoin=id == node_link.c.target_id)
+
+        db.create_all()
+
+        class TreeResource(ModelResource):
+            class Meta:
+                model = Tree
+
+            fruits = Relationship('fruit', count=True)
+
+        class FruitResource(ModelResource):
+            class Meta:
+                model = Fruit
+                exclude_fields = ['tree']
+
+        class GardenResource(ModelResource):
+            class Meta:
+                model = Garden
+
+            trees = Relationship(TreeResource, count=True)
+
+        class NodeResource(ModelResource):
+            class Meta:
+                model = Node
+                exclude_fields = ['parent']
+
+            children = Relationship('node', count=True)
+            links = Relationship('node', count=True)
+
+        for resource in (TreeResource, FruitResource, GardenResource, NodeResource):
+            self.api.add_resource(resource)
+
+        apple, pear = Tree(name='Apple'), Tree(name='Pear')
+        db.session.add_all([apple, pear, Garden(trees=[apple, pear]), Garden(trees=[pear])])
+        db.session.add_all([Fruit(tree=apple) for _ in range(5)] + [Fruit(tree=pear)])
+
+        root = Node()
+        first, second = Node(parent=root), Node(parent=root)
+        root.links = [first, second]
+        first.links = [second]
+        db.session.add_all([root, first, second])
+        db.session.commit()
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def test_relationship_count(self):
+        statements = []
+
+        @event.listens_for(self.db.engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        self.request('GET', '/garden', None, [{'_uri': '/garden/1', 'trees_count': 2},
+                                              {'_uri': '/garden/2', 'trees_count': 1}], 200)
+        event.remove(self.db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        # the counts are selected with the page of items:
+        self.assertEqual(1, len(statements))
+
+        self.request('GET', '/tree?where={"name": "Pear"}', None,
+                     [{'_uri': '/tree/2', 'name': 'Pear', 'fruits_count': 1}], 200)
+        self.request('GET', '/garden/1/trees', None,
+                     [{'_uri': '/tree/1', 'name': 'Apple', 'fruits_count': 5},
+                      {'_uri': '/tree/2', 'name': 'Pear', 'fruits_count': 1}], 200)
+
+        self.assertEqual({'type': 'integer', 'minimum': 0, 'readOnly': True},
+                         self.client.get('/garden/schema').json['properties']['trees_count'])
+
+    def test_self_referential_count(self):
+        self.request('GET', '/node', None, [
+            {'_uri': '/node/1', 'children_count': 2, 'links_count': 2},
+            {'_uri': '/node/2', 'children_count': 0, 'links_count': 1},
+            {'_uri': '/node/3', 'children_count': 0, 'links_count': 0}
+        ], 200)
+
+        self.request('GET', '/node/1/children', None, [
+            {'_uri': '/node/2', 'children_count': 0, 'links_count': 1},
+            {'_uri': '/node/3', 'children_count': 0, 'links_count': 0}
+        ], 200)
+
+
+class TestModelResourceCollectionLimit(PresstTestCase):
+    def setUp(self):
+        super(TestModelResourceCollectionLimit, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+        app.config['TESTING'] = True
+
+        self.db = db = SQLAlchemy(app)
+
+        class Street(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Address(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            number = db.Column(db.String(10), nullable=False)
+            street_id = db.Column(db.Integer, db.ForeignKey(Street.id))
+            street = db.relationship(Street, backref=backref('addresses', order_by=id))
+
+        Street.all_addresses = db.relationship(Address, order_by=Address.id, viewonly=True)
+        Street.addresses_by_number = db.relationship(Address, collection_class=attribute_mapped_collection('number'))
+
+        db.create_all()
+
+        class AddressResource(ModelResource):
+            class Meta:
+                model = Address
+                exclude_fields = ['street']
+
+        class StreetResource(ModelResource):
+            addresses = fields.ToMany(AddressResource, max_items=3, embedded_page_size=2)
+            all_addresses = fields.ToMany(AddressResource, embedded=True, max_items=3, embedded_page_size=2)
+            addresses_by_number = fields.ToManyKV(AddressResource, max_items=2)
+
+            address_list = Relationship(AddressResource, attribute='addresses')
+            all_address_list = Relationship(AddressResource, attribute='all_addresses')
+
+            class Meta:
+                model = Street
+
+        self.api.add_resource(AddressResource)
+        self.api.add_resource(StreetResource)
+
+        db.session.add(Street(name='Main Street', addresses=[Address(number=str(i)) for i in range(1, 6)]))
+        db.session.add(Street(name='Side Street', addresses=[Address(number='1')]))
+        db.session.commit()
+
+        self.statements = statements = []
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+
+        self.before_cursor_execute = before_cursor_execute
+
+    def tearDown(self):
+        event.remove(self.db.engine, 'before_cursor_execute', self.before_cursor_execute)
+        self.db.drop_all()
+
+    def test_truncated(self):
+        response = self.client.get('/street/1')
+        self.assert200(response)
+
+        self.assertEqual({
+            '_items': ['/address/1', '/address/2', '/address/3'],
+            '_next': '/street/1/addresses?page=2&per_page=3'
+        }, response.json['addresses'])
+
+        self.assertEqual({
+            '_items': [{'_uri': '/address/1', 'number': '1'}, {'_uri': '/address/2', 'number': '2'}],
+            '_next': '/street/1/all_addresses?page=2&per_page=2'
+        }, response.json['all_addresses'])
+
+        self.assertEqual({
+            '_items': {'1': '/address/1', '2': '/address/2'},
+            '_next': None
+        }, response.json['addresses_by_number'])
+
+        # every collection is loaded with a LIMIT:
+        address_queries = [parameters for statement, parameters in self.statements if 'FROM address' in statement]
+        self.assertEqual([(1, 4, 0), (1, 3, 0), (1, 3, 0)], sorted(address_queries, reverse=True))
+
+    def test_not_truncated(self):
+        response = self.client.get('/street/2')
+        self.assertEqual(['/address/6'], response.json['addresses'])
+        self.assertEqual([{'_uri': '/address/6', 'number': '1'}], response.json['all_addresses'])
+        self.assertEqual({'1': '/address/6'}, response.json['addresses_by_number'])
+
+    def test_next_page(self):
+        self.request('GET', '/street/1/addresses?page=2&per_page=3', None,
+                     [{'_uri': '/address/4', 'number': '4'}, {'_uri': '/address/5', 'number': '5'}], 200)
+
+    def test_next_page_max_per_page(self):
+        self.app.config['PRESST_MAX_PER_PAGE'] = 2
+
+        response = self.client.get('/street/1')
+        self.assertEqual('/street/1/addresses?page=4&per_page=1', response.json['addresses']['_next'])
+        self.assertEqual('/street/1/all_addresses?page=2&per_page=2', response.json['all_addresses']['_next'])
+
+        self.request('GET', '/street/1/addresses?page=4&per_page=1', None, [{'_uri': '/address/4', 'number': '4'}], 200)
+
+    def test_truncated_schema(self):
+        response = self.client.get('/street/1')
+        field = self.api._presst_resources['street']._fields['addresses']
+
+        self.assertEqual(['/address/1', '/address/2', '/address/3'], response.json['addresses']['_items'])
+        field._validator.validate(response.json['addresses'])
+        field._validator.validate(['/address/1'])
+
+        self.request('PATCH', '/street/1', {'addresses': response.json['addresses']}, None, 400)
+
+    def test_default_order(self):
+        street = self.api._presst_resources['street']
+
+        with self.app.test_request_context('/street/1'):
+            item = street._model.query.get(1)
+            del self.statements[:]
+
+            collection, truncated = street.get_collection_slice(item, 'addresses_by_number', 2)
+            self.assertEqual((['1', '2'], True), (sorted(collection), truncated))
+            self.assertIn('ORDER BY address.id', self.statements[-1][0])
+
+
+class TestModelResourceBindKey(PresstTestCase):
+    def create_app(self):
+        app = super(TestModelResourceBindKey, self).create_app()
+        app.config['SQLALCHEMY_BINDS'] = {'users': 'sqlite://'}
+        return app
+
+    def setUp(self):
+        super(TestModelResourceBindKey, self).setUp()
+
+        self.db = db = SQLAlchemy(self.app)
+
+        class Author(db.Model):
+            __bind_key__ = 'users'
+
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author, backref=backref('books', lazy='dynamic'))
+
+        class AuthorResource(ModelResource):
+            books = Relationship('book')
+
+            class Meta:
+                model = Author
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author')
+
+            class Meta:
+                model = Book
+
+        db.create_all(bind='__all__')
+
+        self.api.add_resource(AuthorResource)
+        self.api.add_resource(BookResource)
+
+        verne, wells = Author(name='Jules Verne'), Author(name='H. G. Wells')
+        db.session.add_all([
+            Book(title='Around the World in Eighty Days', author=verne),
+            Book(title='Journey to the Center of the Earth', author=verne),
+            Book(title='The Time Machine', author=wells),
+        ])
+        db.session.commit()
+
+        self.statements = statements = []
+
+        for bind in (None, 'users'):
+            event.listen(db.get_engine(self.app, bind), 'before_cursor_execute', self._record(bind))
+
+    def _record(self, bind):
+        def before_cursor_execute(conn, cursor, statement, *args):
+            self.statements.append((bind, statement.split(' ', 1)[0]))
+        return before_cursor_execute
+
+    def tearDown(self):
+        self.db.drop_all(bind='__all__')
+
+    def test_bind_key(self):
+        self.assertEqual('users', self.api._presst_resources['author']._bind_key)
+        self.assertIsNone(self.api._presst_resources['book']._bind_key)
+        self.assertEqual([('Jules Verne',), ('H. G. Wells',)],
+                         list(self.db.get_engine(self.app, 'users').execute('SELECT name FROM author')))
+        self.assertEqual([], list(self.db.engine.execute("SELECT name FROM sqlite_master WHERE name='author'")))
+
+        self.request('POST', '/author', {'name': 'Mary Shelley'}, {'_uri': '/author/3', 'name': 'Mary Shelley'}, 200)
+        self.request('GET', '/author/3', None, {'_uri': '/author/3', 'name': 'Mary Shelley'}, 200)
+        self.request('GET', '/author/1/books', None, [
+            {'_uri': '/book/1', 'title': 'Around the World in Eighty Days', 'author': '/author/1'},
+            {'_uri': '/book/2', 'title': 'Journey to the Center of the Earth', 'author': '/author/1'}
+        ], 200)
+
+    def test_batched_references(self):
+        response = self.client.get('/book')
+        self.assertEqual(['/author/1', '/author/1', '/author/2'], [book['author'] for book in response.json])
+
+        # the authors of all books are selected with one query in the other database:
+        self.assertEqual([(None, 'SELECT'), ('users', 'SELECT')], self.statements)
+
+    def test_embed_across_binds(self):
+        response = self.client.get('/book?embed=author')
+        self.assert200(response)
+        self.assertEqual({'/author/1', '/author/2'}, set(response.json['_included']))
+        self.assertEqual([(None, 'SELECT'), ('users', 'SELECT')], self.statements)
+
+
+class TestModelResourceExpireOnCommit(PresstTestCase):
+    def setUp(self):
+        super(TestModelResourceExpireOnCommit, self).setUp()
+
+        self.db = db = SQLAlchemy(self.app)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            sweetness = db.Column(db.Integer, server_default='5')
+
+        db.create_all()
+
+        class FruitResource(ModelResource):
+            class Meta:
+                model = Fruit
+
+        self.api.add_resource(FruitResource)
+
+        self.statements = statements = []
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement.split(' ', 1)[0])
+
+        self.before_cursor_execute = before_cursor_execute
+
+    def tearDown(self):
+        event.remove(self.db.engine, 'before_cursor_execute', self.before_cursor_execute)
+        self.db.drop_all()
+
+    def test_expire_on_commit(self):
+        self.request('POST', '/fruit', {'name': 'Apple'}, {'_uri': '/fruit/1', 'name': 'Apple', 'sweetness': 5}, 200)
+        self.assertEqual(['INSERT', 'SELECT'], self.statements)
+
+    def test_no_expire_on_commit(self):
+        self.app.config['PRESST_EXPIRE_ON_COMMIT'] = False
+
+        self.request('POST', '/fruit', {'name': 'Apple', 'sweetness': 3},
+                     {'_uri': '/fruit/1', 'name': 'Apple', 'sweetness': 3}, 200)
+        self.assertEqual(['INSERT'], self.statements)
+
+        # server defaults are loaded before the commit:
+        del self.statements[:]
+        self.request('POST', '/fruit', {'name': 'Pear'}, {'_uri': '/fruit/2', 'name': 'Pear', 'sweetness': 5}, 200)
+        self.assertEqual(['INSERT', 'SELECT'], self.statements)
+
+        del self.statements[:]
+        self.request('PATCH', '/fruit/1', {'name': 'Crab apple'},
+                     {'_uri': '/fruit/1', 'name': 'Crab apple', 'sweetness': 3}, 200)
+        self.assertEqual(['SELECT', 'UPDATE'], self.statements)
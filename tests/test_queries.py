@@ -0,0 +1,79 @@
+import logging
+from flask_sqlalchemy import SQLAlchemy
+from flask_presst import ModelResource, fields
+from tests import PresstTestCase
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super(RecordingHandler, self).__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestQueryCounter(PresstTestCase):
+    def create_app(self):
+        app = super(TestQueryCounter, self).create_app()
+        app.config['PRESST_QUERY_COUNTER'] = True
+        return app
+
+    def setUp(self):
+        super(TestQueryCounter, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Author(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Book(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(60), nullable=False)
+            author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+            author = db.relationship(Author)
+
+        db.create_all()
+
+        class AuthorResource(ModelResource):
+            class Meta:
+                model = Author
+
+        class BookResource(ModelResource):
+            author = fields.ToOne('author', embedded=True)
+
+            class Meta:
+                model = Book
+
+        self.api.add_resource(AuthorResource)
+        self.api.add_resource(BookResource)
+
+        self.handler = RecordingHandler()
+        self.app.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.app.logger.removeHandler(self.handler)
+        self.db.drop_all()
+
+    def test_query_count_header(self):
+        response = self.client.get('/author')
+        self.assertEqual('1', response.headers['X-Query-Count'])
+
+    def test_n_plus_one_warning(self):
+        for i in range(1, 4):
+            self.client.post('/author', data={'name': 'Author {}'.format(i)})
+            self.client.post('/book', data={'title': 'Book {}'.format(i), 'author': '/author/{}'.format(i)})
+
+        self.handler.messages = []
+
+        response = self.client.get('/author')
+        self.assertEqual([], self.handler.messages)
+
+        response = self.client.get('/book')
+        self.assertEqual('4', response.headers['X-Query-Count'])
+        self.assertEqual(['Possible N+1 queries: field "author" of resource "book" issued 3 queries while '
+                          'marshalling 3 items'], self.handler.messages)
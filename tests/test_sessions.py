@@ -0,0 +1,189 @@
+import time
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import backref
+from flask_presst import ModelResource, Relationship, fields
+from flask_presst.cache import LRUItemCache
+from flask_presst.sessions import ReplicaSessionRouter
+from tests import PresstTestCase
+
+
+class TestReplicaSessionRouter(PresstTestCase):
+    def create_app(self):
+        app = super(TestReplicaSessionRouter, self).create_app()
+        app.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+        app.config['PRESST_SESSION_ROUTER'] = self.router = ReplicaSessionRouter('replica', sticky_seconds=5)
+        return app
+
+    def setUp(self):
+        super(TestReplicaSessionRouter, self).setUp()
+
+        self.db = db = SQLAlchemy(self.app)
+
+        class Tree(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            tree_id = db.Column(db.Integer, db.ForeignKey(Tree.id))
+            tree = db.relationship(Tree, backref=backref('fruits'))
+
+        db.create_all()
+        db.Model.metadata.create_all(db.get_engine(self.app, 'replica'))
+
+        class TreeResource(ModelResource):
+            fruits = Relationship('fruit')
+
+            class Meta:
+                model = Tree
+
+        class FruitResource(ModelResource):
+            class Meta:
+                model = Fruit
+
+        self.api.add_resource(TreeResource)
+        self.Tree = Tree
+        self.TreeResource = TreeResource
+        self.api.add_resource(FruitResource)
+
+        db.session.add(Tree(name='Apple', fruits=[Fruit(name='Apple')]))
+        db.session.commit()
+
+        # the replica lags behind and does not have the fruit yet:
+        replica = db.get_engine(self.app, 'replica')
+        replica.execute(Tree.__table__.insert(), {'id': 1, 'name': 'Apple (replica)'})
+
+    def tearDown(self):
+        self.db.drop_all()
+        self.db.Model.metadata.drop_all(self.db.get_engine(self.app, 'replica'))
+
+    def test_read_from_replica(self):
+        self.request('GET', '/tree/1', None, {'_uri': '/tree/1', 'name': 'Apple (replica)'}, 200)
+        self.request('GET', '/tree', None, [{'_uri': '/tree/1', 'name': 'Apple (replica)'}], 200)
+        self.request('GET', '/tree/1/fruits', None, [], 200)
+        self.request('GET', '/fruit/1', None, None, 404)
+
+    def test_write_to_primary(self):
+        self.request('PATCH', '/tree/1', {'name': 'Pear'}, {'_uri': '/tree/1', 'name': 'Pear'}, 200)
+        self.assertEqual('Pear', self.Tree.query.get(1).name)
+
+    def test_read_your_writes(self):
+        with self.app.test_client() as client:
+            response = client.post('/fruit', data={'name': 'Pear'})
+            self.assert200(response)
+            self.assertIn('presst_last_write=', response.headers['Set-Cookie'])
+
+            # the client reads from the primary for a while after its write:
+            self.assertEqual({'_uri': '/fruit/2', 'name': 'Pear'}, client.get('/fruit/2').json)
+            self.assertEqual(['Apple'], [fruit['name'] for fruit in client.get('/tree/1/fruits').json])
+
+            self.router.sticky_seconds = 0
+            self.assert404(client.get('/fruit/2'))
+
+        # other clients read from the replica:
+        self.router.sticky_seconds = 5
+
+        with self.app.app_context():
+            self.assert404(self.app.test_client().get('/fruit/2'))
+
+    def test_item_cache(self):
+        self.TreeResource._item_cache = cache = LRUItemCache()
+
+        # items read from the replica are not cached:
+        self.request('GET', '/tree/1', None, {'_uri': '/tree/1', 'name': 'Apple (replica)'}, 200)
+        self.assertIsNone(cache.get('tree:1'))
+
+        with self.app.test_client() as client:
+            client.set_cookie('localhost', self.router.cookie_name, '{:.3f}'.format(time.time()))
+            self.assertEqual('Apple', client.get('/tree/1').json['name'])
+
+        self.assertEqual('Apple', cache.get('tree:1')['name'])
+
+        with self.app.app_context():
+            self.assertEqual('Apple', self.app.test_client().get('/tree/1').json['name'])
+
+
+class TestReadOnlySessions(PresstTestCase):
+    def create_app(self):
+        app = super(TestReadOnlySessions, self).create_app()
+        app.config['PRESST_READ_ONLY_SESSIONS'] = True
+        return app
+
+    def setUp(self):
+        super(TestReadOnlySessions, self).setUp()
+
+        self.db = db = SQLAlchemy(self.app)
+
+        class Tree(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+            tree_id = db.Column(db.Integer, db.ForeignKey(Tree.id))
+            tree = db.relationship(Tree, backref=backref('fruits', lazy='dynamic'))
+
+        db.create_all()
+
+        class TreeResource(ModelResource):
+            fruits = Relationship('fruit')
+
+            class Meta:
+                model = Tree
+
+        class FruitResource(ModelResource):
+            tree = fields.ToOne('tree')
+
+            class Meta:
+                model = Fruit
+
+        self.api.add_resource(TreeResource)
+        self.api.add_resource(FruitResource)
+        self.TreeResource = TreeResource
+
+        db.session.add(Tree(name='Apple', fruits=[Fruit(name='Apple'), Fruit(name='Crab apple')]))
+        db.session.add(Tree(name='Pear'))
+        db.session.commit()
+
+        self.loaded = loaded = []
+
+        @event.listens_for(db.Model, 'load', propagate=True)
+        def on_load(target, context):
+            loaded.append(type(target).__name__)
+
+        self.on_load = on_load
+
+    def tearDown(self):
+        event.remove(self.db.Model, 'load', self.on_load)
+        self.db.drop_all()
+
+    def test_read_only_session(self):
+        with self.app.test_request_context('/tree/1'):
+            session = self.TreeResource._get_session()
+            self.assertIsNot(self.db.session, session)
+            self.assertFalse(session.autoflush)
+            self.assertIs(self.db.session, self.TreeResource._get_session(write=True))
+
+        with self.app.test_request_context('/tree/1', method='PATCH'):
+            self.assertIs(self.db.session, self.TreeResource._get_session())
+
+    def test_load_rows(self):
+        self.request('GET', '/tree', None, [{'_uri': '/tree/1', 'name': 'Apple'},
+                                            {'_uri': '/tree/2', 'name': 'Pear'}], 200)
+        self.assertEqual([], self.loaded)
+
+    def test_load_instances(self):
+        # references and side-loaded items need instances:
+        self.request('GET', '/tree/1/fruits', None, [{'_uri': '/fruit/1', 'name': 'Apple', 'tree': '/tree/1'},
+                                                     {'_uri': '/fruit/2', 'name': 'Crab apple', 'tree': '/tree/1'}],
+                     200)
+        self.assertIn('Fruit', self.loaded)
+
+    def test_write(self):
+        self.request('POST', '/tree', {'name': 'Plum'}, {'_uri': '/tree/3', 'name': 'Plum'}, 200)
+        self.request('PATCH', '/tree/3', {'name': 'Cherry'}, {'_uri': '/tree/3', 'name': 'Cherry'}, 200)
+        self.request('GET', '/tree/3', None, {'_uri': '/tree/3', 'name': 'Cherry'}, 200)
@@ -83,7 +83,10 @@ class TestResourceMethod(PresstTestCase):
             signals.before_add_relationship,
             signals.after_add_relationship,
             signals.before_remove_relationship,
-            signals.after_remove_relationship]:
+            signals.after_remove_relationship,
+            signals.after_create_items,
+            signals.after_add_relationships,
+            signals.after_remove_relationships]:
 
             signal.connect(record.callback_for(signal.name.replace('-', '_')), LocationResource)
 
@@ -127,4 +130,168 @@ class TestResourceMethod(PresstTestCase):
         self.request('GET', '/flag', None, [], 200)
 
     def test_relationship(self):
-        pass
\ No newline at end of file
+        pass
+
+    def test_bulk(self):
+        self.request('POST', '/location', [{'name': 'Yard'}, {'name': 'House'}],
+                     [{'name': 'Yard', '_uri': '/location/1'}, {'name': 'House', '_uri': '/location/2'}], 200)
+
+        name, sender, kwargs = self.recorder.last_action
+        self.assertEqual(('after_create_items', self.LocationResource), (name, sender))
+        self.assertEqual(['Yard', 'House'], [item.name for item in kwargs['items']])
+        self.assertEqual(2, len([action for action in self.recorder.actions if action[0] == 'after_create_item']))
+
+        self.request('POST', '/flag', [{'location': '/location/2'}, {'location': '/location/2'}],
+                     [{'location': '/location/2', '_uri': '/flag/1'},
+                      {'location': '/location/2', '_uri': '/flag/2'}], 200)
+
+        self.request('POST', '/location/1/flags', ['/flag/1', '/flag/2'],
+                     [{'location': '/location/1', '_uri': '/flag/1'},
+                      {'location': '/location/1', '_uri': '/flag/2'}], 200)
+
+        name, sender, kwargs = self.recorder.last_action
+        self.assertEqual('after_add_relationships', name)
+        self.assertEqual(('flags', [1, 2]), (kwargs['relationship'], [flag.id for flag in kwargs['children']]))
+
+        self.request('DELETE', '/location/1/flags', ['/flag/1', '/flag/2'], None, 204)
+
+        name, sender, kwargs = self.recorder.last_action
+        self.assertEqual('after_remove_relationships', name)
+        self.assertEqual([1, 2], [flag.id for flag in kwargs['children']])
+
+        self.request('POST', '/location', [], [], 200)
+        self.assertEqual('after_remove_relationships', self.recorder.last_action[0])
+
+
+class TestDeferredSignals(PresstTestCase):
+    def setUp(self):
+        super(TestDeferredSignals, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Location(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        class Flag(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            location_id = db.Column(db.Integer, db.ForeignKey(Location.id))
+            location = db.relationship(Location, backref=backref('flags', lazy='dynamic'))
+
+        db.create_all()
+
+        class FlagResource(ModelResource):
+            location = fields.ToOne('location')
+
+            class Meta:
+                model = Flag
+
+        class LocationResource(ModelResource):
+            flags = Relationship(FlagResource)
+
+            class Meta:
+                model = Location
+
+        self.api.add_resource(FlagResource)
+        self.api.add_resource(LocationResource)
+        self.LocationResource = LocationResource
+        self.FlagResource = FlagResource
+
+        self.dispatcher = signals.DeferredDispatcher(max_queue_size=2)
+        self.actions = actions = []
+
+        def receiver(sender, **kwargs):
+            actions.append((sender.resource_name, kwargs))
+
+        self.receiver = receiver
+        self.connected = [signals.after_create_item,
+                          signals.after_update_item,
+                          signals.after_delete_item,
+                          signals.after_add_relationship]
+
+        for signal in self.connected:
+            signals.connect_deferred(signal, receiver, dispatcher=self.dispatcher)
+
+    def tearDown(self):
+        for signal in self.connected:
+            signals.disconnect_deferred(signal, self.receiver)
+        self.db.drop_all()
+
+    def test_deferred(self):
+        self.request('POST', '/location', {'name': 'Yard'}, {'name': 'Yard', '_uri': '/location/1'}, 200)
+        self.request('PATCH', '/location/1', {'name': 'House'}, {'name': 'House', '_uri': '/location/1'}, 200)
+        self.request('POST', '/flag', {}, {'location': None, '_uri': '/flag/1'}, 200)
+        self.request('POST', '/location/1/flags', '/flag/1', {'location': '/location/1', '_uri': '/flag/1'}, 200)
+        self.request('DELETE', '/location/1', None, None, 204)
+
+        self.dispatcher.join()
+        self.assertEqual([
+            ('location', {'item_id': 1}),
+            ('location', {'item_id': 1, 'changed': ['name'], 'partial': True}),
+            ('flag', {'item_id': 1}),
+            ('location', {'item_id': 1, 'relationship': 'flags', 'child_id': 1}),
+            ('location', {'item_id': 1}),
+        ], self.actions)
+
+    def test_deferred_until_commit(self):
+        self.request('POST', '/flag', {'location': {'name': 'Yard'}},
+                     {'location': '/location/1', '_uri': '/flag/1'}, 200)
+
+        self.dispatcher.join()
+        self.assertEqual([('location', {'item_id': 1}), ('flag', {'item_id': 1})], self.actions)
+
+    def test_rollback(self):
+        with self.app.test_request_context():
+            self.LocationResource.create_item({'name': 'Yard'}, commit=False)
+            self.db.session.rollback()
+
+        self.dispatcher.join()
+        self.assertEqual([], self.actions)
+
+    def test_deferred_per_sender(self):
+        signals.disconnect_deferred(signals.after_create_item, self.receiver)
+        self.connected.remove(signals.after_create_item)
+
+        for resource in (self.LocationResource, self.FlagResource):
+            signals.connect_deferred(signals.after_create_item, self.receiver, sender=resource,
+                                     dispatcher=self.dispatcher)
+
+        signals.disconnect_deferred(signals.after_create_item, self.receiver, sender=self.LocationResource)
+
+        self.request('POST', '/location', {'name': 'Yard'}, {'name': 'Yard', '_uri': '/location/1'}, 200)
+        self.request('POST', '/flag', {}, {'location': None, '_uri': '/flag/1'}, 200)
+
+        signals.disconnect_deferred(signals.after_create_item, self.receiver, sender=self.FlagResource)
+
+        self.dispatcher.join()
+        self.assertEqual([('flag', {'item_id': 1})], self.actions)
+
+    def test_before_signal(self):
+        with self.assertRaises(ValueError):
+            signals.connect_deferred(signals.before_create_item, self.receiver)
+
+    def test_deferred_bulk(self):
+        for signal in (signals.after_create_items, signals.after_add_relationships):
+            signals.connect_deferred(signal, self.receiver, dispatcher=self.dispatcher)
+            self.connected.append(signal)
+
+        self.request('POST', '/flag', [{}, {}], [{'location': None, '_uri': '/flag/1'},
+                                                 {'location': None, '_uri': '/flag/2'}], 200)
+        self.request('POST', '/location', {'name': 'Yard'}, {'name': 'Yard', '_uri': '/location/1'}, 200)
+        self.request('POST', '/location/1/flags', ['/flag/1', '/flag/2'],
+                     [{'location': '/location/1', '_uri': '/flag/1'},
+                      {'location': '/location/1', '_uri': '/flag/2'}], 200)
+
+        self.dispatcher.join()
+        self.assertEqual([
+            ('flag', {'item_id': 1}),
+            ('flag', {'item_id': 2}),
+            ('flag', {'item_ids': [1, 2]}),
+            ('location', {'item_id': 1}),
+            ('location', {'item_id': 1, 'relationship': 'flags', 'child_id': 1}),
+            ('location', {'item_id': 1, 'relationship': 'flags', 'child_id': 2}),
+            ('location', {'item_id': 1, 'relationship': 'flags', 'child_ids': [1, 2]}),
+        ], self.actions)
@@ -0,0 +1,83 @@
+import time
+
+from flask_sqlalchemy import SQLAlchemy
+from flask_presst import ModelResource, signals
+from flask_presst.timing import get_request_timings, start_request_timings, timed
+from tests import PresstTestCase
+
+
+class TestServerTiming(PresstTestCase):
+    def create_app(self):
+        app = super(TestServerTiming, self).create_app()
+        app.config['PRESST_SERVER_TIMING'] = True
+        return app
+
+    def setUp(self):
+        super(TestServerTiming, self).setUp()
+
+        app = self.app
+        app.config['SQLALCHEMY_ENGINE'] = 'sqlite://'
+
+        self.db = db = SQLAlchemy(app)
+
+        class Fruit(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(60), nullable=False)
+
+        db.create_all()
+
+        class FruitResource(ModelResource):
+            class Meta:
+                model = Fruit
+
+        self.api.add_resource(FruitResource)
+        self.FruitResource = FruitResource
+
+    def tearDown(self):
+        self.db.drop_all()
+
+    def _phases(self, response):
+        return [timing.split(';')[0] for timing in response.headers['Server-Timing'].split(', ')]
+
+    def test_server_timing_header(self):
+        response = self.client.post('/fruit', data={'name': 'Apple'})
+        self.assertEqual({'parse', 'write', 'marshal', 'encode'}, set(self._phases(response)))
+
+        response = self.client.get('/fruit?where={"name": "Apple"}')
+        self.assertEqual({'filter', 'query', 'marshal', 'encode'}, set(self._phases(response)))
+
+        response = self.client.get('/fruit/1')
+        self.assertEqual({'query', 'marshal', 'encode'}, set(self._phases(response)))
+
+    def test_phase_timed_signal(self):
+        timings = []
+
+        def receiver(sender, phase, duration):
+            timings.append((sender, phase))
+
+        with signals.phase_timed.connected_to(receiver):
+            self.client.get('/fruit')
+
+        self.assertIn((self.FruitResource, 'query'), timings)
+        self.assertIn((self.FruitResource, 'marshal'), timings)
+        self.assertIn((None, 'encode'), timings)
+
+    def test_nested_phases_exclusive(self):
+        with self.app.test_request_context('/fruit'):
+            start_request_timings()
+
+            with timed('marshal'):
+                with timed('query'):
+                    time.sleep(0.05)
+
+            durations = get_request_timings().durations
+
+        self.assertGreaterEqual(durations['query'], 0.05)
+        self.assertLess(durations['marshal'], 0.05)
+
+
+class TestServerTimingDisabled(PresstTestCase):
+    def test_no_header(self):
+        response = self.client.get('/schema')
+        self.assert200(response)
+        self.assertNotIn('Server-Timing', response.headers)